@@ -9,21 +9,118 @@ Copyright: (c) 2024 Anthony Tropeano
 """
 
 import os
-import csv
-import json
 import time
-import pickle
-import requests
-from typing import Literal
-
-from .utils import getOuiFromMac
+import threading
+from typing import TYPE_CHECKING, Any, Iterable, Literal, Sequence
+
+from .utils import getMacPrefix, macFromBuffer
+from .validators import MacAddress
+from .registries import MA_L, REGISTRIES, Registry
+from .aggregates import OuiAggregates
+from .searchIndex import TrigramIndex
+from .query import (
+    And,
+    ByAssignment,
+    ByIoT,
+    ByOrganization,
+    ByRegistry,
+    Not,
+    Or,
+    Predicate,
+    QueryEngine,
+)
+from .store import OuiRecord, OuiStore, OuiStoreBuilder
+from .snapshot import SnapshotError, openSnapshot
+from .iotClassifier import IOT_KEYWORDS, extendIotFlags, iotFlags, normalizeKeywords
+from .changes import ChangeSet, Subscriber, diffStores
+from .artifacts import BINARY, DEFAULT_ARTIFACTS, ArtifactWriter, artifactFileName
+from .lookupCache import NOT_FOUND, LookupCache
+from .sharedIndex import SharedIndex, generationFileName
+from .ingest import CsvIngest, readCsv
+from .instrumentation import (
+    FETCH,
+    LOAD,
+    PARSE,
+    PERSIST,
+    Instrumentation,
+    Tracer,
+    memoryReport,
+    sizeOf,
+)
 
 _24_HOURS = 24 * 60 * 60
 NO_UPDATED_NEEDED = "No Update Needed"
 ORGANIZATION_NAME = "Organization Name"
 FAILED_TO_GET_CSV_FILE = "Failed to get the csv file"
-OUI_CSV_URL = "https://standards-oui.ieee.org/oui/oui.csv"
-CSV_FILE_NAME = os.path.expanduser("~/NG_OUI_DB/iee_oui.csv")
+UNKNOWN = "Unknown"
+OUI_CSV_URL = MA_L.url
+CSV_FILE_NAME = MA_L.fileName
+SHARED_INDEX_FILE_NAME = CSV_FILE_NAME.removesuffix(".csv") + ".shared"
+
+# the methods whose calls are timed when the database is instrumented
+INSTRUMENTED_METHODS: tuple[str, ...] = (
+    "getOrganizationName",
+    "getOrganizationAddress",
+    "getAssignment",
+    "getRegistry",
+    "getOrganization",
+    "getOrganizationFromBuffer",
+    "isIoT",
+    "getOrganizationNames",
+    "getOrganizationAddresses",
+    "getAssignments",
+    "getRegistries",
+    "getOrganizationRecords",
+    "getOrganizationsMac",
+    "getOrganizations",
+    "getOrganizationsCount",
+    "getOrganizationsMacCount",
+    "getOrganizationsMacCountByOrganization",
+    "getOrganizationsMacCountByAssignment",
+    "getOrganizationsMacCountByRegistry",
+    "getOrganizationsByAssignment",
+    "getOrganizationsByRegistry",
+    "getOrganizationsByOrganization",
+    "getOrganizationsByOrganizationAndAssignment",
+    "getOrganizationsByOrganizationAndRegistry",
+    "getOrganizationsByAssignmentAndRegistry",
+    "getOrganizationsByOrganizationAssignmentAndRegistry",
+    "query",
+    "queryCount",
+    "summary",
+)
+
+if TYPE_CHECKING:
+    # collections.abc.Buffer is only there from Python 3.12
+    from collections.abc import Buffer
+
+    import numpy as np
+
+# submodules imported on first access as attributes of the package, so that
+# importing it never loads asyncio, numpy, http.server or multiprocessing
+_LAZY_SUBMODULES: tuple[str, ...] = (
+    "asyncIeeOuiDb",
+    "batch",
+    "cli",
+    "download",
+    "extractIotManufacturers",
+    "frames",
+    "isIoT",
+    "server",
+    "stream",
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_SUBMODULES:
+        import importlib
+
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_SUBMODULES))
 
 
 class IeeOuiDb:
@@ -33,8 +130,39 @@ class IeeOuiDb:
 
     Attributes:
     - url (str): The URL of the IEEE OUI database
+    - registries (tuple[Registry, ...]): The IEEE registries that are ingested
     - csvFilename (str): The filename of the IEEE OUI database in CSV format
-    - dbDict (dict): The IEEE OUI database as a dictionary
+    - csvFilenames (dict[str, str]): The filename of each registry's CSV file
+    - iotKeywords (tuple[str, ...]): The keywords of suspected IoT manufacturers
+    - lookupCache (LookupCache | None): The cache of MAC address lookups, if a
+        cacheSize was given
+    - dbDict (dict): The IEEE OUI database as a dictionary, built once per store
+    - instrumentation (Instrumentation): The timers and counters of the database
+
+    Note:
+        The database is held in a compact columnar OuiStore, lookups return
+        OuiRecord views that behave like the dictionaries of getDb(). MAC
+        addresses are accepted in any notation of validators.normalizeMac,
+        including Cisco dotted and bare hex strings, raw bytes and integers.
+
+        After the CSV files are parsed the configured artifacts ("binary", "json"
+        and "ndjson", see artifacts.py) are written on a background thread, so
+        construction returns as soon as the database is in memory.
+
+        With cacheSize set, the rows of the most recently looked up MAC addresses
+        are kept in a LookupCache, see lookupCache.py, which is emptied whenever
+        a refresh swaps in a new database.
+
+        With lazy=True construction does no I/O. The first query loads the
+        local files, and if they are older than 24 hours they are served while
+        a background thread downloads and loads the new database.
+
+        One process can share its database with the others of the host through
+        shareIndex(), the others attach() to it read-only, see sharedIndex.py.
+
+        The fetch, parse, persist and load phases are always timed, see
+        instrumentation.py. With instrument=True every call of the methods of
+        INSTRUMENTED_METHODS is also counted into a latency histogram.
 
     Methods:
     - getDb(): Returns the IEEE OUI database as a dictionary
@@ -44,6 +172,20 @@ class IeeOuiDb:
     - getAssignment(mac: str): Returns the assignment of a MAC address
     - getRegistry(mac: str): Returns the registry of a MAC address
     - getOrganization(mac: str): Returns the organization of a MAC address
+    - getOrganizationFromBuffer(buffer: Buffer, offset: int): Returns the organization
+        of a MAC address held as 6 octets in a buffer, such as an Ethernet frame
+    - isIoT(mac: str): Returns if a MAC address belongs to a suspected IoT manufacturer
+    - setIotKeywords(keywords: Iterable): Replaces the keywords of IoT manufacturers
+    - addIotKeywords(keywords: Iterable): Adds keywords of IoT manufacturers
+    - getOrganizationNames(macs: Sequence): Returns the organization names of a batch
+        of MAC addresses
+    - getOrganizationAddresses(macs: Sequence): Returns the organization addresses of
+        a batch of MAC addresses
+    - getAssignments(macs: Sequence): Returns the assignments of a batch of MAC
+        addresses
+    - getRegistries(macs: Sequence): Returns the registries of a batch of MAC addresses
+    - getOrganizationRecords(macs: Sequence): Returns the organizations of a batch of
+        MAC addresses
     - getOrganizationsMac(organization: str): Returns a list of MAC addresses of an
         organization
     - getOrganizations(): Returns a list of organizations
@@ -70,95 +212,329 @@ class IeeOuiDb:
     - getOrganizationsByOrganizationAssignmentAndRegistry(organization: str, assignment:
         str, registry: str): Returns a list of organizations by organization, assignment,
         and registry
+    - query(predicate: Predicate): Returns the organizations matching any combination
+        of ByOrganization, ByAssignment, ByRegistry and ByIoT predicates
+    - queryCount(predicate: Predicate): Returns the number of organizations matching a
+        predicate
+    - summary(): Returns the number of MAC addresses of every registry and organization
+    - refresh(): Downloads the expired CSV files and returns the changes to the database
+    - subscribe(subscriber: Callable): Calls a function with the changes of every refresh
+    - unsubscribe(subscriber: Callable): Stops calling a function on refresh
+    - waitForRefresh(timeout: float | None): Waits for a background refresh to finish
+    - waitForArtifacts(timeout: float | None): Waits for the artifacts to be written
+    - load(): Loads the database and builds what lookups need ahead of the first one
+    - shareIndex(fileName: str): Shares the database with the other processes
+    - attach(fileName: str): Returns a database reading the one another process shares
+    - stats(): Returns the time spent in every phase and the latencies of the calls
+    - memoryReport(): Returns the bytes held by every structure of the database
+    - addTracer(tracer: Callable): Calls a function with every phase and call recorded
+    - removeTracer(tracer: Callable): Stops calling a function with the events
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        registries: Iterable[Registry] = REGISTRIES,
+        lazy: bool = False,
+        artifacts: Iterable[str] = DEFAULT_ARTIFACTS,
+        iotKeywords: Iterable[str] = IOT_KEYWORDS,
+        cacheSize: int = 0,
+        instrument: bool = False,
+    ) -> None:
         self.url: str = OUI_CSV_URL
-        self.csvFilename: str = self._getIeeOuiDbAsCsv(self.url)
-        self.dbDict: dict = self._convertCsvToDict(self.csvFilename)
+        self.registries: tuple[Registry, ...] = tuple(registries)
+        self.iotKeywords: tuple[str, ...] = normalizeKeywords(iotKeywords)
+        self.lookupCache: LookupCache | None = (
+            LookupCache(cacheSize) if cacheSize > 0 else None
+        )
+        self.instrumentation: Instrumentation = Instrumentation()
+        if instrument:
+            for name in INSTRUMENTED_METHODS:
+                setattr(
+                    self, name, self.instrumentation.timed(name, getattr(self, name))
+                )
+        self._artifactWriter: ArtifactWriter = ArtifactWriter(
+            artifacts, self.instrumentation
+        )
+        self.csvFilenames: dict[str, str] = {}
+        self.csvFilename: str = ""
+        self._current: OuiStore | None = None
+        self._loadLock: threading.Lock = threading.Lock()
+        self._refreshThread: threading.Thread | None = None
+        self._refreshLock: threading.Lock = threading.Lock()
+        self._subscribers: list[Subscriber] = []
+        self._sharedIndex: SharedIndex | None = None
+        self._generation: int = 0
+        if not lazy:
+            self._current = self._refresh()
+
+    @property
+    def _store(self) -> OuiStore:
+        """The store of the database, loaded on first use in lazy mode"""
+        store: OuiStore | None = self._current
+        sharedIndex: SharedIndex | None = self._sharedIndex
+        if sharedIndex is not None and sharedIndex.generation() != self._generation:
+            store = self._attachGeneration(sharedIndex)
+        elif store is None:
+            with self._loadLock:
+                if self._current is None:
+                    self._current = self._loadLocal()
+                store = self._current
+        return store
+
+    @property
+    def dbDict(self) -> dict[str, dict[str, str]]:
+        """The IEEE OUI database as a dictionary, see getDb()
+
+        Note:
+            The dictionary is built once per store and shared by every access,
+            so iterating over it and indexing it stays linear. It is rebuilt
+            after the store is replaced, getDb() returns a copy of your own.
+        """
+        return self._store.derived("dbDict", OuiStore.toDict)
 
-    def getDb(self) -> dict:
+    def getDb(self) -> dict[str, dict[str, str]]:
         """Returns the IEEE OUI database as a dictionary
 
         Returns:
             dict: The IEEE OUI database as a dictionary
+
+        Note:
+            The dictionary is built from the columnar store on every call and is
+            meant for compatibility, lookups never allocate it.
         """
-        return self.dbDict
+        return self._store.toDict()
 
     def getDbUrl(self) -> str:
         """Returns the URL of the IEEE OUI database"""
         return self.url
 
-    def getOrganizationName(self, mac: str) -> str | Literal["Unknown"]:
+    def getOrganizationName(self, mac: MacAddress) -> str | Literal["Unknown"]:
         """Returns the organization name of a MAC address
 
         Args:
-            mac (str): The MAC address to get the organization name of
+            mac (MacAddress): The MAC address to get the organization name of
         Returns:
             str | Literal["Unknown"]: The organization name of a MAC address or "Unknown"
         """
+        store: OuiStore = self._store
         try:
-            oui = getOuiFromMac(mac=mac)
-            return self.dbDict[oui][ORGANIZATION_NAME]
+            return store.organizationName(self._lookup(store, mac=mac))
         except KeyError:
             return "Unknown"
 
-    def getOrganizationAddress(self, mac: str) -> str | Literal["Unknown"]:
+    def getOrganizationAddress(self, mac: MacAddress) -> str | Literal["Unknown"]:
         """Returns the organization address of a MAC address
 
         Args:
-            mac (str): The MAC address to get the organization address of
+            mac (MacAddress): The MAC address to get the organization address of
         Returns:
             str | Literal["Unknown"]: The organization address of a MAC address or "Unknown"
         """
+        store: OuiStore = self._store
         try:
-            oui = getOuiFromMac(mac=mac)
-            return self.dbDict[oui]["Organization Address"]
+            return store.organizationAddress(self._lookup(store, mac=mac))
         except KeyError:
             return "Unknown"
 
-    def getAssignment(self, mac: str) -> str | Literal["Unknown"]:
+    def getAssignment(self, mac: MacAddress) -> str | Literal["Unknown"]:
         """Returns the assignment of a MAC address
 
         Args:
-            mac (str): The MAC address to get the assignment of
+            mac (MacAddress): The MAC address to get the assignment of
         Returns:
             str | Literal["Unknown"]: The assignment of a MAC address or "Unknown"
         """
+        store: OuiStore = self._store
         try:
-            oui = getOuiFromMac(mac=mac)
-            return self.dbDict[oui]["Assignment"]
+            return store.assignment(self._lookup(store, mac=mac))
         except KeyError:
             return "Unknown"
 
-    def getRegistry(self, mac: str) -> str | Literal["Unknown"]:
+    def getRegistry(self, mac: MacAddress) -> str | Literal["Unknown"]:
         """Returns the registry of a MAC address
 
         Args:
-            mac (str): The MAC address to get the registry of
+            mac (MacAddress): The MAC address to get the registry of
         Returns:
             str | Literal["Unknown"]: The registry of a MAC address or "Unknown"
         """
+        store: OuiStore = self._store
         try:
-            oui = getOuiFromMac(mac=mac)
-            return self.dbDict[oui]["Registry"]
+            return store.registry(self._lookup(store, mac=mac))
         except KeyError:
             return "Unknown"
 
-    def getOrganization(self, mac: str) -> str | Literal["Unknown"]:
+    def getOrganization(self, mac: MacAddress) -> OuiRecord | Literal["Unknown"]:
         """Returns the organization of a MAC address
 
         Args:
-            mac (str): The MAC address to get the organization of
+            mac (MacAddress): The MAC address to get the organization of
+        Returns:
+            OuiRecord | Literal["Unknown"]: The organization of a MAC address or "Unknown"
+        """
+        store: OuiStore = self._store
+        try:
+            return store.record(self._lookup(store, mac=mac))
+        except KeyError:
+            return "Unknown"
+
+    def getOrganizationFromBuffer(
+        self, buffer: "Buffer", offset: int = 0
+    ) -> OuiRecord | Literal["Unknown"]:
+        """Returns the organization of a MAC address held in a buffer
+
+        Args:
+            buffer (Buffer): A buffer holding the 6 octets of the MAC address, such as
+                a memoryview of an Ethernet frame
+            offset (int, optional): The offset of the first octet. Defaults to 0.
+
         Returns:
-            str | Literal["Unknown"]: The organization of a MAC address or "Unknown"
+            OuiRecord | Literal["Unknown"]: The organization of the MAC address or
+            "Unknown"
+
+        Note:
+            The octets are read straight into the integer key of the lookup, no
+            string is formatted or parsed.
         """
+        store: OuiStore = self._store
         try:
-            oui = getOuiFromMac(mac=mac)
-            return self.dbDict[oui]
+            return store.record(store.lookup(mac=macFromBuffer(buffer, offset)))
         except KeyError:
             return "Unknown"
 
+    def isIoT(self, mac: MacAddress) -> bool:
+        """Returns if a MAC address belongs to a suspected IoT manufacturer
+
+        Args:
+            mac (MacAddress): The MAC address, or a leading part of it such as an
+                OUI
+
+        Returns:
+            bool: True if the organization name of the MAC address contains one of
+            the iotKeywords, False if it does not or the MAC address is unknown
+
+        Note:
+            Every block is classified once per database and set of keywords, see
+            iotClassifier.py, so this is a single lookup with no file I/O.
+        """
+        store: OuiStore = self._store
+        try:
+            flags = iotFlags(store, self.iotKeywords)
+            return flags[self._lookup(store, mac=mac)] == 1
+        except KeyError:
+            return False
+
+    def setIotKeywords(self, keywords: Iterable[str]) -> None:
+        """Replaces the keywords of suspected IoT manufacturers
+
+        Args:
+            keywords (Iterable[str]): The keywords, matched ignoring case
+
+        Note:
+            The database is classified again with the keywords on the next IoT
+            query, unless it was already classified with the same keywords.
+        """
+        self.iotKeywords = normalizeKeywords(keywords)
+
+    def addIotKeywords(self, keywords: Iterable[str]) -> None:
+        """Adds keywords of suspected IoT manufacturers
+
+        Args:
+            keywords (Iterable[str]): The keywords to add, matched ignoring case
+
+        Note:
+            Only the organizations no previous keyword matched are classified,
+            against the added keywords.
+        """
+        keywords = tuple(keywords)
+        store: OuiStore | None = self._current
+        if store is not None:
+            extendIotFlags(store, self.iotKeywords, keywords)
+        self.iotKeywords = normalizeKeywords((*self.iotKeywords, *keywords))
+
+    def getOrganizationNames(self, macs: Sequence[Any] | "np.ndarray") -> "np.ndarray":
+        """Returns the organization names of a batch of MAC addresses
+
+        Args:
+            macs (Sequence[Any] | np.ndarray): MAC address strings or their 48 bit
+                integer values
+
+        Returns:
+            np.ndarray: The organization name of each MAC address or "Unknown"
+
+        Note:
+            Batch lookups are vectorized with NumPy, which must be installed.
+        """
+        from . import batch
+
+        return batch.organizationNames(self._store, batch.lookupRows(self._store, macs))
+
+    def getOrganizationAddresses(
+        self, macs: Sequence[Any] | "np.ndarray"
+    ) -> "np.ndarray":
+        """Returns the organization addresses of a batch of MAC addresses
+
+        Args:
+            macs (Sequence[Any] | np.ndarray): MAC address strings or their 48 bit
+                integer values
+
+        Returns:
+            np.ndarray: The organization address of each MAC address or "Unknown"
+        """
+        from . import batch
+
+        return batch.fromUniqueRows(
+            batch.lookupRows(self._store, macs), self._store.organizationAddress
+        )
+
+    def getAssignments(self, macs: Sequence[Any] | "np.ndarray") -> "np.ndarray":
+        """Returns the assignments of a batch of MAC addresses
+
+        Args:
+            macs (Sequence[Any] | np.ndarray): MAC address strings or their 48 bit
+                integer values
+
+        Returns:
+            np.ndarray: The assignment of each MAC address or "Unknown"
+        """
+        from . import batch
+
+        return batch.fromUniqueRows(
+            batch.lookupRows(self._store, macs), self._store.assignment
+        )
+
+    def getRegistries(self, macs: Sequence[Any] | "np.ndarray") -> "np.ndarray":
+        """Returns the registries of a batch of MAC addresses
+
+        Args:
+            macs (Sequence[Any] | np.ndarray): MAC address strings or their 48 bit
+                integer values
+
+        Returns:
+            np.ndarray: The registry of each MAC address or "Unknown"
+        """
+        from . import batch
+
+        return batch.registries(self._store, batch.lookupRows(self._store, macs))
+
+    def getOrganizationRecords(
+        self, macs: Sequence[Any] | "np.ndarray"
+    ) -> "np.ndarray":
+        """Returns the organizations of a batch of MAC addresses
+
+        Args:
+            macs (Sequence[Any] | np.ndarray): MAC address strings or their 48 bit
+                integer values
+
+        Returns:
+            np.ndarray: The OuiRecord of each MAC address or "Unknown"
+        """
+        from . import batch
+
+        return batch.fromUniqueRows(
+            batch.lookupRows(self._store, macs), self._store.record
+        )
+
     def getOrganizationsMac(self, organization: str) -> list[str]:
         """Returns a list of MAC addresses of an organization
 
@@ -168,29 +544,23 @@ class IeeOuiDb:
         Returns:
             list[str]: A list of MAC addresses registered to the organization
         """
-        orgsMacs: list[str] = []
-        for mac in self.dbDict:
-            if organization.lower() in self.dbDict[mac][ORGANIZATION_NAME].lower():
-                orgsMacs.append(mac)
-        return orgsMacs
+        return [
+            self._store.assignment(row)
+            for row in self._rowsByOrganization(organization=organization)
+        ]
 
     def getOrganizations(self) -> list[str]:
         """Returns a list of organizations registered in the database"""
 
-        organizations: set = set()
-        for mac in self.dbDict:
-            organizations.add(self.dbDict[mac][ORGANIZATION_NAME])
-        myList: list[str] = list(organizations)
-        myList.sort()
-        return myList
+        return list(self._aggregates().organizations())
 
     def getOrganizationsCount(self) -> int:
         """Returns the number of organizations registered in the database"""
-        return len(self.getOrganizations())
+        return len(self._aggregates().organizations())
 
     def getOrganizationsMacCount(self) -> int:
         """Returns the number of MAC addresses registered in the database"""
-        return len(self.dbDict)
+        return len(self._store)
 
     def getOrganizationsMacCountByOrganization(self, organization: str) -> int:
         """Returns the number of MAC addresses registered to an organization
@@ -201,11 +571,7 @@ class IeeOuiDb:
         Returns:
             int: The number of MAC addresses registered to the organization
         """
-        count: int = 0
-        for oui in self.dbDict:
-            if organization.lower() in self.dbDict[oui][ORGANIZATION_NAME].lower():
-                count += 1
-        return count
+        return self._searchIndex().count(organization)
 
     def getOrganizationsMacCountByAssignment(self, assignment: str) -> int:
         """Returns the number of MAC addresses registered to an assignment
@@ -216,11 +582,7 @@ class IeeOuiDb:
         Returns:
             int: The number of MAC addresses registered to the assignment
         """
-        count: int = 0
-        for oui in self.dbDict:
-            if self.dbDict[oui]["Assignment"] == assignment:
-                count += 1
-        return count
+        return len(self._rowsByAssignment(assignment=assignment))
 
     def getOrganizationsMacCountByRegistry(self, registry: str) -> int:
         """Returns the number of MAC addresses registered to a registry
@@ -231,11 +593,7 @@ class IeeOuiDb:
         Returns:
             int: The number of MAC addresses registered to the registry
         """
-        count: int = 0
-        for oui in self.dbDict:
-            if self.dbDict[oui]["Registry"] == registry:
-                count += 1
-        return count
+        return self._aggregates().registryCount(registry)
 
     def getOrganizationsByAssignment(self, assignment: str) -> list[str]:
         """Returns a list of organizations by assignment
@@ -246,11 +604,7 @@ class IeeOuiDb:
         Returns:
             list[str]: A list of organizations by assignment
         """
-        organizations: list[str] = []
-        for oui in self.dbDict:
-            if self.dbDict[oui]["Assignment"] == assignment:
-                organizations.append(self.dbDict[oui][ORGANIZATION_NAME])
-        return organizations
+        return self._organizationNames(ByAssignment(assignment))
 
     def getOrganizationsByRegistry(self, registry: str) -> list[str]:
         """Returns a list of organizations by registry
@@ -261,30 +615,22 @@ class IeeOuiDb:
         Returns:
             list[str]: A list of organizations contained in the registry
         """
-        organizations: list[str] = []
-        for oui in self.dbDict:
-            if self.dbDict[oui]["Registry"] == registry:
-                organizations.append(self.dbDict[oui][ORGANIZATION_NAME])
-        return organizations
+        return self._organizationNames(ByRegistry(registry))
 
-    def getOrganizationsByOrganization(self, organization: str) -> list[dict[str, str]]:
+    def getOrganizationsByOrganization(self, organization: str) -> list[OuiRecord]:
         """Returns a list of organizations registered to an organization
 
         Args:
             organization (str): The name of the organization to get the organizations of
 
         Returns:
-            list[dict[str,str]]: A list of organizations registered to the organization
+            list[OuiRecord]: A list of organizations registered to the organization
         """
-        organizations: list[dict[str, str]] = []
-        for oui in self.dbDict:
-            if organization.lower() in self.dbDict[oui][ORGANIZATION_NAME].lower():
-                organizations.append(self.dbDict[oui])
-        return organizations
+        return self.query(ByOrganization(organization))
 
     def getOrganizationsByOrganizationAndAssignment(
         self, organization: str, assignment: str
-    ) -> list[str]:
+    ) -> list[OuiRecord]:
         """Returns a list of organizations by organization and assignment
 
         Args:
@@ -292,20 +638,13 @@ class IeeOuiDb:
             assignment (str): The assignment to look for
 
         Returns:
-            list[str]: A list of organizations by organization and assignment
+            list[OuiRecord]: A list of organizations by organization and assignment
         """
-        organizations: list[str] = []
-        for oui in self.dbDict:
-            if (
-                organization.lower() in self.dbDict[oui][ORGANIZATION_NAME].lower()
-                and self.dbDict[oui]["Assignment"] == assignment
-            ):
-                organizations.append(self.dbDict[oui])
-        return organizations
+        return self.query(ByOrganization(organization) & ByAssignment(assignment))
 
     def getOrganizationsByOrganizationAndRegistry(
         self, organization: str, registry: str
-    ) -> list[str]:
+    ) -> list[OuiRecord]:
         """Returns a list of organizations by organization and registry
 
         Args:
@@ -313,16 +652,10 @@ class IeeOuiDb:
             registry (str): The name of the registry
 
         Returns:
-            list[str]: A list of organizations within the registry matching the organization name
+            list[OuiRecord]: A list of organizations within the registry matching the
+            organization name
         """
-        organizations: list[str] = []
-        for oui in self.dbDict:
-            if (
-                organization.lower() in self.dbDict[oui][ORGANIZATION_NAME].lower()
-                and self.dbDict[oui]["Registry"] == registry
-            ):
-                organizations.append(self.dbDict[oui])
-        return organizations
+        return self.query(ByOrganization(organization) & ByRegistry(registry))
 
     def getOrganizationsByAssignmentAndRegistry(
         self, assignment: str, registry: str
@@ -336,18 +669,11 @@ class IeeOuiDb:
         Returns:
             list[str]: A list of organizations within the registry matching the assignment
         """
-        organizations: list[str] = []
-        for oui in self.dbDict:
-            if (
-                self.dbDict[oui]["Assignment"] == assignment
-                and self.dbDict[oui]["Registry"] == registry
-            ):
-                organizations.append(self.dbDict[oui][ORGANIZATION_NAME])
-        return organizations
+        return self._organizationNames(ByAssignment(assignment) & ByRegistry(registry))
 
     def getOrganizationsByOrganizationAssignmentAndRegistry(
         self, organization: str, assignment: str, registry: str
-    ) -> list[str]:
+    ) -> list[OuiRecord]:
         """Returns a list of organizations by organization, assignment, and registry
 
         Args:
@@ -356,25 +682,486 @@ class IeeOuiDb:
             registry (str): The name of the registry
 
         Returns:
-            list[str]: A list of organizations within the registry matching the
+            list[OuiRecord]: A list of organizations within the registry matching the
             organization name, assignment, and registry
         """
-        organizations: list[str] = []
-        for oui in self.dbDict:
-            if (
-                organization.lower() in self.dbDict[oui][ORGANIZATION_NAME].lower()
-                and self.dbDict[oui]["Assignment"] == assignment
-                and self.dbDict[oui]["Registry"] == registry
-            ):
-                organizations.append(self.dbDict[oui])
+        return self.query(
+            ByOrganization(organization)
+            & ByAssignment(assignment)
+            & ByRegistry(registry)
+        )
+
+    def query(self, predicate: Predicate) -> list[OuiRecord]:
+        """Returns the organizations matching a predicate
+
+        Args:
+            predicate (Predicate): ByOrganization, ByAssignment, ByRegistry and ByIoT
+                predicates combined with & (and), | (or) and ~ (not)
+
+        Returns:
+            list[OuiRecord]: The matching organizations in the order they were read
+
+        Note:
+            Every predicate is a bitmap over the database, the bitmaps of registries,
+            IoT manufacturers and recent organization searches are cached, so a
+            combination is evaluated without scanning the database.
+
+        Example:
+            ieeOuiDb.query(ByOrganization("sony") & ~ByRegistry("MA-L"))
+        """
+        return self._queryEngine().records(predicate)
+
+    def queryCount(self, predicate: Predicate) -> int:
+        """Returns the number of organizations matching a predicate
+
+        Args:
+            predicate (Predicate): The predicate to match, see query()
+
+        Returns:
+            int: The number of matching organizations
+        """
+        return self._queryEngine().count(predicate)
+
+    def summary(self) -> dict:
+        """Returns the number of MAC addresses of every registry and organization
+
+        Returns:
+            dict: The number of records and organizations in the database, with the
+            number of records of every registry ("Registry") and of every
+            organization ("Organization Name")
+
+        Note:
+            The counts are read from group-bys materialized once per database, the
+            database is not scanned again.
+        """
+        return self._aggregates().summary()
+
+    def _aggregates(self) -> OuiAggregates:
+        """Returns the rows of the store grouped by registry and organization name"""
+        return self._store.derived("aggregates", OuiAggregates)
+
+    def _queryEngine(self) -> QueryEngine:
+        """Returns the filter engine over the store, kept for the life of the store
+        and the IoT keywords
+        """
+        keywords: tuple[str, ...] = self.iotKeywords
+        return self._store.derived(
+            ("query", keywords), lambda store: QueryEngine(store, keywords)
+        )
+
+    def _organizationNames(self, predicate: Predicate) -> list[str]:
+        """Returns the organization names of the rows matching a predicate"""
+        return [
+            self._store.organizationName(row)
+            for row in self._queryEngine().rows(predicate)
+        ]
+
+    def _searchIndex(self) -> TrigramIndex:
+        """Returns the trigram index over the organization names of the store
+
+        Note:
+            The index is built on the first search and kept for the life of the
+            store, so every later search only intersects posting lists.
+        """
+        return self._store.derived("searchIndex", TrigramIndex)
+
+    def _rowsByOrganization(self, organization: str) -> list[int]:
+        """Returns the rows whose organization name contains a string, ignoring case"""
+        return self._searchIndex().rows(organization)
+
+    def _rowsByAssignment(self, assignment: str) -> list[int]:
+        """Returns the row of an assignment, or no rows if it is not registered"""
+        try:
+            return [self._store.find(assignment)]
+        except KeyError:
+            return []
+
+    def refresh(self) -> ChangeSet:
+        """Downloads the expired CSV files and returns the changes to the database
+
+        Returns:
+            ChangeSet: The blocks added, removed and modified since the database
+            was loaded or last refreshed
+
+        Note:
+            The refreshed database is compared to the current one block by block
+            with a hash of each record. If nothing changed the current database is
+            kept along with every index built over it. Otherwise the suspected
+            IoT manufacturers of the refreshed database are classified, then it
+            replaces the current one and the changes are passed to the
+            subscribers.
+
+            A database attached to a shared index downloads nothing, it switches
+            to the latest generation the sharing process published.
+        """
+        if self._sharedIndex is not None:
+            previous: OuiStore | None = self._current
+            store: OuiStore = self._store
+            if previous is None or store is previous:
+                return ChangeSet()
+            return diffStores(previous, store)
+        with self._refreshLock:
+            return self._publish(self._refresh())
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """Calls a function with the changes of every refresh that changes the database
+
+        Args:
+            subscriber (Callable[[ChangeSet], None]): Called with the ChangeSet after
+                the refreshed database replaces the current one, on the refreshing
+                thread
+        """
+        self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Stops calling a function on refresh, see subscribe()"""
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+    def waitForRefresh(self, timeout: float | None = None) -> bool:
+        """Waits for a background refresh of a lazy database to finish
+
+        Args:
+            timeout (float | None, optional): The maximum number of seconds to wait.
+                Defaults to None, waiting until the refresh is done.
+
+        Returns:
+            bool: True if no refresh is running anymore, False if it timed out
+        """
+        thread: threading.Thread | None = self._refreshThread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def waitForArtifacts(self, timeout: float | None = None) -> bool:
+        """Waits for the artifacts of the last parse to be written
+
+        Args:
+            timeout (float | None, optional): The maximum number of seconds to wait.
+                Defaults to None, waiting until every artifact is written.
+
+        Returns:
+            bool: True if every artifact is written, False if it timed out
+        """
+        return self._artifactWriter.wait(timeout)
+
+    def load(self) -> None:
+        """Loads the database and builds what lookups need ahead of the first one
+
+        Note:
+            In lazy mode the local files are loaded if they were not yet, and the
+            suspected IoT manufacturers are classified with the iotKeywords, so
+            neither is left to the first lookup. Call it from a worker thread to
+            keep that work off a thread that must stay responsive.
+        """
+        iotFlags(self._store, self.iotKeywords)
+
+    def shareIndex(self, fileName: str = SHARED_INDEX_FILE_NAME) -> SharedIndex:
+        """Shares the database with the other processes of the host
+
+        Args:
+            fileName (str, optional): The path of the shared index. Defaults to
+                SHARED_INDEX_FILE_NAME.
+
+        Returns:
+            SharedIndex: The shared index, its generation is the one just published
+
+        Note:
+            The database is published as a new generation of the shared index, and
+            again after every refresh that changes it, so the processes attached
+            to it switch to the refreshed database on their next query.
+        """
+        sharedIndex: SharedIndex = SharedIndex(fileName)
+        self._publishShared(sharedIndex)
+        self.subscribe(lambda changes: self._publishShared(sharedIndex))
+        return sharedIndex
+
+    def _publishShared(self, sharedIndex: SharedIndex) -> None:
+        """Publishes the store as the next generation of a shared index"""
+        with self.instrumentation.phase(PERSIST) as phase:
+            store: OuiStore = self._store
+            generation: int = sharedIndex.publish(store)
+            phase.rows = len(store)
+            phase.bytes = os.path.getsize(
+                generationFileName(sharedIndex.fileName, generation)
+            )
+
+    @classmethod
+    def attach(
+        cls,
+        fileName: str = SHARED_INDEX_FILE_NAME,
+        iotKeywords: Iterable[str] = IOT_KEYWORDS,
+        cacheSize: int = 0,
+    ) -> "IeeOuiDb":
+        """Returns a database reading the one another process shares, see shareIndex()
+
+        Args:
+            fileName (str, optional): The path of the shared index. Defaults to
+                SHARED_INDEX_FILE_NAME.
+            iotKeywords (Iterable[str], optional): See IeeOuiDb. Defaults to
+                IOT_KEYWORDS.
+            cacheSize (int, optional): See IeeOuiDb. Defaults to 0.
+
+        Returns:
+            IeeOuiDb: The database, its store is mapped read-only from the current
+            generation of the shared index
+
+        Raises:
+            FileNotFoundError: If no database was shared yet
+            SnapshotError: If the shared index is not valid
+
+        Note:
+            Nothing is downloaded or parsed, and the mapped pages are shared with
+            every other process attached. Every query reads the generation counter
+            of the shared index, and switches to the latest generation once the
+            sharing process has published a refreshed database.
+        """
+        database: IeeOuiDb = cls(
+            registries=(),
+            lazy=True,
+            artifacts=(),
+            iotKeywords=iotKeywords,
+            cacheSize=cacheSize,
+        )
+        database._sharedIndex = SharedIndex(fileName)
+        database._attachGeneration(database._sharedIndex)
+        return database
+
+    @property
+    def generation(self) -> int:
+        """The generation of the shared index the database reads, 0 if not attached"""
+        return self._generation
+
+    def stats(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Returns the time spent in every phase and the latencies of the calls
 
-        return organizations
+        Returns:
+            dict[str, dict[str, dict[str, Any]]]: The "phases", "fetch", "parse",
+            "persist" and "load" with their "count", "seconds", "rows" and
+            "bytes", and the "calls", the count and latency histogram of every
+            method called, empty unless the database is instrumented
+
+        Note:
+            Persisting runs in the background, waitForArtifacts() before reading
+            its totals. See instrumentation.py.
+        """
+        return self.instrumentation.stats()
+
+    def memoryReport(self) -> dict[str, Any]:
+        """Returns the bytes held by every structure of the database
+
+        Returns:
+            dict[str, Any]: The bytes of the "columns" of the store and of every
+            "derived" structure built over it, such as the search index and the
+            IoT flags, the "lookupCache", the "total" bytes allocated and the
+            "mapped" bytes of a snapshot, see instrumentation.memoryReport()
+        """
+        report: dict[str, Any] = memoryReport(self._store)
+        cache: LookupCache | None = self.lookupCache
+        report["lookupCache"] = 0 if cache is None else sizeOf(cache._rows)
+        report["total"] += report["lookupCache"]
+        return report
+
+    def addTracer(self, tracer: Tracer) -> None:
+        """Calls a function with every phase and call recorded
+
+        Args:
+            tracer (Callable[[TraceEvent], None]): Called with the TraceEvent of
+                every phase, and of every call if the database is instrumented,
+                on the thread that recorded it
+        """
+        self.instrumentation.addTracer(tracer)
+
+    def removeTracer(self, tracer: Tracer) -> None:
+        """Stops calling a function with the events, see addTracer()"""
+        self.instrumentation.removeTracer(tracer)
+
+    def _refresh(self) -> OuiStore:
+        """Downloads the expired CSV files and returns the store built from them
+
+        Note:
+            The downloaded files are parsed while they download, see ingest.py.
+        """
+        ingest: CsvIngest = CsvIngest()
+        try:
+            csvFilenames: dict[str, str] = {
+                registry.name: self._fetch(registry, ingest)
+                for registry in self.registries
+            }
+            store: OuiStore = self._convertCsvToStore(csvFilenames, ingest)
+        finally:
+            ingest.close()
+        self.csvFilenames = csvFilenames
+        self.csvFilename = csvFilenames[self.registries[0].name]
+        return store
+
+    def _fetch(self, registry: Registry, ingest: CsvIngest) -> str:
+        """Gets the CSV file of a registry, timing the download, and hands it to
+        the ingest
+        """
+        with self.instrumentation.phase(FETCH) as phase:
+            status: str = self._getIeeOuiDbAsCsv(
+                registry.url, registry.fileName, ingest=ingest
+            )
+            if status == registry.fileName:
+                phase.bytes = os.path.getsize(status)
+        # a file that was not streamed to the ingest is read from the filesystem
+        ingest.end(None if status == FAILED_TO_GET_CSV_FILE else registry.fileName)
+        return status
+
+    def _loadLocal(self) -> OuiStore:
+        """Returns the store of the local files, refreshing them in the background
+
+        Note:
+            The store is loaded from the files already on the filesystem, even if
+            they are older than 24 hours, so the first query never waits for the
+            network. Expired or missing files are then downloaded by a background
+            thread that swaps in the new store once it is built. If no file is on
+            the filesystem there is nothing to serve and the database is
+            downloaded before returning.
+        """
+        expired: bool = False
+        csvFilenames: dict[str, str] = {}
+        for registry in self.registries:
+            if not os.path.exists(registry.fileName):
+                csvFilenames[registry.name] = FAILED_TO_GET_CSV_FILE
+                expired = True
+                continue
+            csvFilenames[registry.name] = NO_UPDATED_NEEDED
+            if time.time() - os.path.getmtime(registry.fileName) > _24_HOURS:
+                expired = True
+
+        if all(status == FAILED_TO_GET_CSV_FILE for status in csvFilenames.values()):
+            return self._refresh()
+
+        store: OuiStore = self._convertCsvToStore(csvFilenames)
+        self.csvFilenames = csvFilenames
+        self.csvFilename = csvFilenames[self.registries[0].name]
+
+        if expired:
+            self._refreshThread = threading.Thread(
+                target=self._refreshInBackground, name="IeeOuiDbRefresh", daemon=True
+            )
+            self._refreshThread.start()
+        return store
+
+    def _attachGeneration(self, sharedIndex: SharedIndex) -> OuiStore:
+        """Switches to the latest generation of a shared index and notifies the
+        subscribers of the changes
+        """
+        with self._loadLock:
+            previous: OuiStore | None = self._current
+            if previous is not None and sharedIndex.generation() == self._generation:
+                return previous
+            try:
+                with self.instrumentation.phase(LOAD) as phase:
+                    self._generation, store = sharedIndex.open()
+                    phase.rows = len(store)
+            except (OSError, SnapshotError):
+                if previous is None:
+                    raise
+                # keep reading the current generation until the next publish
+                self._generation = sharedIndex.generation()
+                return previous
+            self._current = store
+
+        if previous is not None and self._subscribers:
+            changes: ChangeSet = diffStores(previous, store)
+            if changes:
+                for subscriber in tuple(self._subscribers):
+                    subscriber(changes)
+        return store
+
+    def _refreshInBackground(self) -> None:
+        """Refreshes the database and swaps in the new store once it is built"""
+        with self._refreshLock:
+            self._publish(self._refresh())
+
+    def _publish(self, store: OuiStore) -> ChangeSet:
+        """Swaps in a refreshed store if it changed and notifies the subscribers
+
+        Note:
+            The suspected IoT manufacturers of the store are classified before it
+            is swapped in, so no lookup of another thread classifies them.
+        """
+        previous: OuiStore | None = self._current
+        if previous is None:
+            iotFlags(store, self.iotKeywords)
+            self._current = store
+            return ChangeSet()
+        # a refresh that found no file at all keeps the current store
+        if len(store) == 0:
+            return ChangeSet()
+
+        changes: ChangeSet = diffStores(previous, store)
+        if changes:
+            iotFlags(store, self.iotKeywords)
+            self._current = store
+            for subscriber in tuple(self._subscribers):
+                subscriber(changes)
+        return changes
+
+    def _lookup(self, store: OuiStore, mac: MacAddress) -> int:
+        """Returns the row of the most specific block containing a MAC address
 
-    def _getIeeOuiDbAsCsv(self, url: str) -> str:
+        Args:
+            store (OuiStore): The store to look the MAC address up in, read once
+                by the caller so the row is read from the store it was found in,
+                whatever refresh swaps in the meantime
+            mac (MacAddress): The MAC address, or a leading part of it such as an
+                OUI
+
+        Returns:
+            int: The row of the MA-S/IAB, MA-M or MA-L/CID block containing the
+            MAC address, in that order of preference
+
+        Raises:
+            KeyError: If the MAC address is invalid or not assigned
+
+        Note:
+            With a lookupCache the row is cached under the MAC address as it was
+            given, along with the MAC addresses that are invalid or not assigned.
+        """
+        cache: LookupCache | None = self.lookupCache
+        if cache is None:
+            return self._lookupIn(store, mac)
+
+        try:
+            row: int | None = cache.get(store, mac)
+        except TypeError:
+            # unhashable MAC addresses, such as a bytearray, are not cached
+            return self._lookupIn(store, mac)
+        if row is None:
+            try:
+                row = self._lookupIn(store, mac)
+            except KeyError:
+                row = NOT_FOUND
+            cache.put(store, mac, row)
+        if row == NOT_FOUND:
+            raise KeyError(mac)
+        return row
+
+    @staticmethod
+    def _lookupIn(store: OuiStore, mac: MacAddress) -> int:
+        """Returns the row of the most specific block of a store containing a MAC"""
+        try:
+            value, knownBits = getMacPrefix(mac=mac)
+        except ValueError:
+            raise KeyError(mac) from None
+        return store.lookup(mac=value, knownBits=knownBits)
+
+    def _getIeeOuiDbAsCsv(
+        self, url: str, fileName: str = CSV_FILE_NAME, ingest: CsvIngest | None = None
+    ) -> str:
         """Get the IEEE OUI database as a CSV file and save it to the filesystem
 
         Args:
             url (str): The URL of the IEEE OUI database
+            fileName (str, optional): The filename to save the CSV file to.
+                Defaults to CSV_FILE_NAME.
+            ingest (CsvIngest | None, optional): Parses the file while it
+                downloads. Defaults to None.
 
         Returns:
             str: The filename of the CSV file or relevant error message
@@ -382,82 +1169,195 @@ class IeeOuiDb:
         Note:
             The IEEE OUI database is saved to the filesystem for future use if
             it is not present on the filesystem or if it has not been updated
-            in the last 24 hours.
+            in the last 24 hours. The download is conditional, if the server
+            reports the file has not changed it is kept and no update is needed.
 
-            Data is saved to the ~/homeSecurityAppliance/ directory.
+            Data is saved to the ~/homeSecurityAppliance/ directory. The network
+            stack is only imported once a file needs to be downloaded.
         """
+        exists: bool = os.path.exists(fileName)
+        if exists and time.time() - os.path.getmtime(fileName) <= _24_HOURS:
+            return NO_UPDATED_NEEDED
+
+        from .download import DOWNLOADED, FAILED, NOT_MODIFIED, downloadFile
+
+        status: str = downloadFile(
+            url, fileName, onChunk=None if ingest is None else ingest.write
+        )
+        # an unchanged file costs a 304 and keeps the cached store
+        if status == NOT_MODIFIED:
+            return NO_UPDATED_NEEDED
+        if status == FAILED and not exists:
+            return FAILED_TO_GET_CSV_FILE
+        if status == DOWNLOADED and ingest is not None:
+            ingest.complete()
+        return fileName
+
+    def _convertCsvToStore(
+        self, csvFilenames: dict[str, str], ingest: CsvIngest | None = None
+    ) -> OuiStore:
+        """Convert the IEEE OUI database from its CSV files to a columnar store
 
-        def fetch() -> None | Literal["Failed to get the csv file"]:
-            response: requests.Response = requests.get(
-                url, headers={"User-Agent": "Mozilla/5.0"}
-            )
-            if response.status_code != 200:
-                return FAILED_TO_GET_CSV_FILE
+        Args:
+            csvFilenames (dict[str, str]): The status returned by _getIeeOuiDbAsCsv
+                for each registry, keyed by registry name
+            ingest (CsvIngest | None, optional): The ingest the files were handed
+                to as they were fetched. Defaults to None, reading the files.
 
-            if not os.path.exists(os.path.dirname(CSV_FILE_NAME)):
-                os.makedirs(os.path.dirname(CSV_FILE_NAME))
+        Returns:
+            OuiStore: The IEEE OUI database as a columnar store
 
-            with open(CSV_FILE_NAME, "wb") as file:
-                file.write(response.content)
+        Note:
+            The CSV data is read from the file system and converted to a store.
+            The configured artifacts, by default a binary snapshot of the store
+            and the database as a JSON file, are then written in the background
+            for future use. If no update is needed the snapshot is mapped into
+            memory instead, as long as it was built from the same registries,
+            so nothing is parsed. The parse phase of a refresh only times the
+            rows the ingest had not parsed once the last download completed.
+
+            Data is saved to the ~/NG_OUI_DB/ directory.
+        """
+        sources: tuple[str, ...] = tuple(registry.name for registry in self.registries)
+        snapshotFileName: str = artifactFileName(CSV_FILE_NAME, BINARY)
+
+        # if an update is not needed, map the snapshot, unless snapshots are not
+        # written anymore and it may be older than the csv files
+        if BINARY in self._artifactWriter.artifacts and all(
+            status == NO_UPDATED_NEEDED for status in csvFilenames.values()
+        ):
+            try:
+                with self.instrumentation.phase(LOAD) as phase:
+                    store = openSnapshot(snapshotFileName)
+                    if store.sources != sources:
+                        raise SnapshotError("The snapshot is of other registries")
+                    phase.rows = len(store)
+                    phase.bytes = os.path.getsize(snapshotFileName)
+                return store
+            except (OSError, SnapshotError):
+                pass
+
+        # else read the csv files into the store, skipping the ones that failed
+        with self.instrumentation.phase(PARSE) as phase:
+            builder: OuiStoreBuilder | None = None
+            if ingest is not None:
+                builder = ingest.finish()
+                phase.bytes = ingest.bytes
+            # without an ingest, or if a download failed midway, read the files
+            if builder is None:
+                builder = OuiStoreBuilder()
+                phase.bytes = 0
+                for registry in self.registries:
+                    if csvFilenames[registry.name] == FAILED_TO_GET_CSV_FILE:
+                        continue
+
+                    with open(registry.fileName, "r", encoding="utf-8") as file:
+                        readCsv(file, builder)
+                        phase.bytes += os.fstat(file.fileno()).st_size
+            store: OuiStore = builder.build(sources=sources)
+            phase.rows = len(store)
+
+        # if none of the files were found, do not cache the empty store
+        if len(store) == 0:
+            return store
+
+        # if the downloaded files hold the same blocks as the snapshot, keep the
+        # snapshot rather than rewriting every artifact
+        if BINARY in self._artifactWriter.artifacts:
+            try:
+                previous: OuiStore = openSnapshot(snapshotFileName)
+                if previous.sources == sources and not diffStores(previous, store):
+                    return previous
+            except (OSError, SnapshotError):
+                pass
+
+        # persist the artifacts off the caller's thread
+        self._artifactWriter.submit(store, CSV_FILE_NAME)
+
+        return store
+
+
+_sharedDbs: dict[tuple, IeeOuiDb] = {}
+_sharedLocks: dict[tuple, threading.Lock] = {}
+_sharedLock: threading.Lock = threading.Lock()
+
+
+def getSharedDb(
+    registries: Iterable[Registry] = REGISTRIES,
+    lazy: bool = False,
+    artifacts: Iterable[str] = DEFAULT_ARTIFACTS,
+    cacheSize: int = 0,
+    instrument: bool = False,
+) -> IeeOuiDb:
+    """Returns the database of the process for a configuration, built on first use
+
+    Args:
+        registries (Iterable[Registry], optional): The IEEE registries to ingest.
+            Defaults to REGISTRIES.
+        lazy (bool, optional): If the database is loaded on its first query.
+            Defaults to False.
+        artifacts (Iterable[str], optional): The artifacts written after a parse.
+            Defaults to DEFAULT_ARTIFACTS.
+        cacheSize (int, optional): The most MAC address lookups cached. Defaults
+            to 0, no cache.
+        instrument (bool, optional): If the calls of the database are timed.
+            Defaults to False.
+
+    Returns:
+        IeeOuiDb: The same database for every call with the same configuration
+
+    Note:
+        The database of a configuration is built once, even when several threads
+        ask for it at the same time, while databases of other configurations are
+        built concurrently. The module level helpers, such as isIoT and
+        getIotManufacturers, use the default configuration.
+    """
+    key: tuple = (
+        tuple(registries),
+        lazy,
+        tuple(dict.fromkeys(artifacts)),
+        max(cacheSize, 0),
+        instrument,
+    )
+    database: IeeOuiDb | None = _sharedDbs.get(key)
+    if database is not None:
+        return database
+
+    with _sharedLock:
+        lock: threading.Lock = _sharedLocks.setdefault(key, threading.Lock())
+    with lock:
+        database = _sharedDbs.get(key)
+        if database is None:
+            database = IeeOuiDb(
+                registries=key[0],
+                lazy=lazy,
+                artifacts=key[2],
+                cacheSize=key[3],
+                instrument=instrument,
+            )
+            _sharedDbs[key] = database
+    return database
 
-        if os.path.exists(CSV_FILE_NAME):
-            if time.time() - os.path.getmtime(CSV_FILE_NAME) > _24_HOURS:
-                fetch()
-            else:
-                return NO_UPDATED_NEEDED
-        else:
-            fetch()
-        return CSV_FILE_NAME
 
-    def _convertCsvToDict(self, fileName: str) -> dict[str, dict[str, str]]:
-        """Convert the IEEE OUI database from a CSV file to a dictionary
+def clearSharedDbs() -> None:
+    """Forgets the databases of getSharedDb, the next call builds a new one"""
+    with _sharedLock:
+        _sharedDbs.clear()
+        _sharedLocks.clear()
 
-        Args:
-            fileName (str): The filename of the CSV file
 
-        Returns:
-            dict[str, dict[str, str]]: The IEEE OUI database as a dictionary
+def lookupResult(database: IeeOuiDb, mac: str) -> dict[str, Any]:
+    """Returns the answer of the service and the streaming commands for a MAC address
 
-        Note:
-            The CSV data is read from the file system and converted to a dictionary.
-            The dictionary is then saved as a JSON and pickle file for future use.
-
-            Data is saved to the ~/homeSecurityAppliance/ directory.
-        """
-        index: int = 0
-        d: dict[str, dict[str, str]] = {}
-        jsonFileName: str = fileName.replace(".csv", ".json")
-        pickleFileName: str = fileName.replace(".csv", ".pkl")
-
-        # if the file is not found, return an empty dictionary
-        if fileName == FAILED_TO_GET_CSV_FILE:
-            return d
-
-        # if an update is not needed, load the pickle file
-        if fileName == NO_UPDATED_NEEDED:
-            pickleFileName = CSV_FILE_NAME.replace(".csv", ".pkl")
-            with open(pickleFileName, "rb") as file:
-                return pickle.load(file)
-
-        # else read the csv file and convert it to a dictionary
-        with open(fileName, "r", encoding="utf-8") as file:
-            reader = csv.reader(file, quotechar='"', delimiter=",")
-            for line in reader:
-                if index > 0:
-                    d[line[1].replace("-", "")] = {
-                        "Registry": line[0].strip(),
-                        "Assignment": line[1].strip(),
-                        "Organization Name": line[2].strip(),
-                        "Organization Address": line[3].strip(),
-                    }
-
-                index += 1
-
-        # save the dictionary as a json and pickle file
-        with open(jsonFileName, "w", encoding="utf-8") as file:
-            file.write(json.dumps(d, indent=4))
-
-        with open(pickleFileName, "wb") as file:
-            pickle.dump(d, file)
-
-        return d
+    Args:
+        database (IeeOuiDb): The database
+        mac (str): The MAC address in any notation of validators.normalizeMac
+
+    Returns:
+        dict[str, Any]: The MAC address with the fields of its organization and
+        isIoT, or with an error if it is invalid or not assigned
+    """
+    record = database.getOrganization(mac)
+    if isinstance(record, str):
+        return {"mac": mac, "error": UNKNOWN}
+    return {"mac": mac, **record, "isIoT": database.isIoT(mac)}
@@ -1,4 +1,4 @@
 if __name__ == "__main__":
-    from NG_OUI_DB.cli import runAsCLI
+    from NG_OUI_DB.cli import main
 
-    runAsCLI()
+    main()
@@ -0,0 +1,132 @@
+"""
+Description: Materialized group-bys over an OuiStore.
+
+The rows of the store are grouped once by registry and by organization name,
+so counts are read straight from the group sizes and the rows of a group are
+returned without scanning the store. Assignments need no group, each one is a
+single row found through the store's sorted key index.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+from array import array
+from typing import Sequence
+
+from .store import OuiStore
+
+
+def _groupRows(keys: Sequence[int], groups: int) -> tuple[array, array]:
+    """Groups row numbers by key with a counting sort, keeping them in row order
+
+    Args:
+        keys (Sequence[int]): The group of every row
+        groups (int): The number of groups
+
+    Returns:
+        tuple[array, array]: The offsets of each group and the grouped rows, the rows
+        of group g are rows[offsets[g] : offsets[g + 1]]
+    """
+    offsets: array = array("I", bytes(4 * (groups + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for group in range(groups):
+        offsets[group + 1] += offsets[group]
+
+    rows: array = array("I", bytes(4 * len(keys)))
+    cursor: array = array("I", offsets)
+    for row, key in enumerate(keys):
+        rows[cursor[key]] = row
+        cursor[key] += 1
+    return offsets, rows
+
+
+class OuiAggregates:
+    """Rows and row counts of an OuiStore grouped by registry and organization name
+
+    Methods:
+    - registryRows(registry: str): Returns the rows of a registry
+    - registryCount(registry: str): Returns the number of rows of a registry
+    - nameRows(nameId: int): Returns the rows of an organization name
+    - nameCount(nameId: int): Returns the number of rows of an organization name
+    - organizations(): Returns the organization names that have rows, sorted
+    - summary(): Returns the row counts of every registry and organization
+    """
+
+    __slots__ = (
+        "_store",
+        "_registryOffsets",
+        "_registryRows",
+        "_nameOffsets",
+        "_nameRows",
+        "_organizations",
+    )
+
+    def __init__(self, store: OuiStore) -> None:
+        self._store: OuiStore = store
+        self._registryOffsets, self._registryRows = _groupRows(
+            store.registryCodes(), len(store.registryNames())
+        )
+        self._nameOffsets, self._nameRows = _groupRows(
+            store.nameIds(), len(store.nameTable())
+        )
+
+        nameTable: Sequence[str] = store.nameTable()
+        self._organizations: tuple[str, ...] = tuple(
+            sorted(
+                nameTable[nameId]
+                for nameId in range(len(nameTable))
+                if self.nameCount(nameId) > 0
+            )
+        )
+
+    def registryRows(self, registry: str) -> array:
+        """Returns the rows of a registry in the order they were read"""
+        code: int = self._store.registryCode(registry)
+        if code == 0:
+            return array("I")
+        return self._registryRows[
+            self._registryOffsets[code] : self._registryOffsets[code + 1]
+        ]
+
+    def registryCount(self, registry: str) -> int:
+        """Returns the number of rows of a registry"""
+        code: int = self._store.registryCode(registry)
+        if code == 0:
+            return 0
+        return self._registryOffsets[code + 1] - self._registryOffsets[code]
+
+    def nameRows(self, nameId: int) -> array:
+        """Returns the rows of an organization name in the order they were read"""
+        return self._nameRows[self._nameOffsets[nameId] : self._nameOffsets[nameId + 1]]
+
+    def nameCount(self, nameId: int) -> int:
+        """Returns the number of rows of an organization name"""
+        return self._nameOffsets[nameId + 1] - self._nameOffsets[nameId]
+
+    def organizations(self) -> tuple[str, ...]:
+        """Returns the organization names that have at least one row, sorted"""
+        return self._organizations
+
+    def summary(self) -> dict:
+        """Returns the row counts of the store grouped by registry and organization
+
+        Returns:
+            dict: The number of records and organizations, with the number of
+            records of every registry and of every organization name
+        """
+        registryNames: tuple[str, ...] = self._store.registryNames()
+        nameTable: Sequence[str] = self._store.nameTable()
+        return {
+            "Records": len(self._store),
+            "Organizations": len(self._organizations),
+            "Registry": {
+                registryNames[code]: self._registryOffsets[code + 1]
+                - self._registryOffsets[code]
+                for code in range(1, len(registryNames))
+            },
+            "Organization Name": {
+                nameTable[nameId]: self.nameCount(nameId)
+                for nameId in range(len(nameTable))
+                if self.nameCount(nameId) > 0
+            },
+        }
@@ -0,0 +1,174 @@
+"""
+Description: Writers of the files persisted after the CSV files are parsed.
+
+Each artifact is written from the OuiStore record by record, so the whole
+database is never serialized into memory at once:
+
+- "binary": the memory-mappable snapshot reloaded on the next start
+- "json": a dictionary of every record keyed by assignment, as getDb() returns
+- "ndjson": one JSON object per line for every record
+
+Writes are submitted to a single background thread, so a parse returns as soon
+as the store is built. Every artifact is written to a temporary file that is
+renamed into place once complete. With an Instrumentation every write is
+recorded as a "persist" phase.
+
+json and the thread pool are imported on the first write, a process mapping
+its snapshot never loads them.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import os
+from typing import TYPE_CHECKING, Callable, Iterable, TextIO
+
+from .utils import atomicFile
+from .store import OuiStore
+from .snapshot import writeSnapshot
+from .instrumentation import PERSIST, Instrumentation
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+BINARY = "binary"
+JSON = "json"
+NDJSON = "ndjson"
+ARTIFACTS: tuple[str, ...] = (BINARY, JSON, NDJSON)
+
+# the artifacts written unless configured otherwise
+DEFAULT_ARTIFACTS: tuple[str, ...] = (BINARY, JSON)
+
+EXTENSIONS: dict[str, str] = {
+    BINARY: ".snapshot",
+    JSON: ".json",
+    NDJSON: ".ndjson",
+}
+
+
+def artifactFileName(baseFileName: str, artifact: str) -> str:
+    """Returns the path of an artifact, next to the CSV file it was parsed from
+
+    Args:
+        baseFileName (str): The path of the CSV file, such as CSV_FILE_NAME
+        artifact (str): BINARY, JSON or NDJSON
+
+    Returns:
+        str: The path with the extension of the artifact
+    """
+    return baseFileName.removesuffix(".csv") + EXTENSIONS[artifact]
+
+
+def _writeRecords(file: TextIO, store: OuiStore) -> None:
+    """Writes the records of a store as json.dumps(store.toDict(), indent=4) would"""
+    import json
+
+    separator: str = "{\n"
+    for row in store.rows():
+        record: str = json.dumps(dict(store.record(row)), indent=4)
+        file.write(f'{separator}    "{store.assignment(row)}": ')
+        file.write(record.replace("\n", "\n    "))
+        separator = ",\n"
+    file.write("{}" if separator == "{\n" else "\n}")
+
+
+def writeJson(store: OuiStore, fileName: str) -> None:
+    """Writes the records of a store as one JSON dictionary keyed by assignment"""
+    with atomicFile(fileName, "w", encoding="utf-8") as file:
+        _writeRecords(file, store)
+
+
+def writeNdjson(store: OuiStore, fileName: str) -> None:
+    """Writes the records of a store as one JSON object per line"""
+    import json
+
+    with atomicFile(fileName, "w", encoding="utf-8") as file:
+        for row in store.rows():
+            file.write(json.dumps(dict(store.record(row))))
+            file.write("\n")
+
+
+WRITERS: dict[str, Callable[[OuiStore, str], None]] = {
+    BINARY: writeSnapshot,
+    JSON: writeJson,
+    NDJSON: writeNdjson,
+}
+
+
+class ArtifactWriter:
+    """Writes the configured artifacts of a store on a background thread
+
+    Methods:
+    - submit(store: OuiStore, baseFileName: str): Schedules the artifacts of a store
+    - wait(timeout: float | None): Waits for the scheduled artifacts to be written
+    """
+
+    def __init__(
+        self,
+        artifacts: Iterable[str] = DEFAULT_ARTIFACTS,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        self.artifacts: tuple[str, ...] = tuple(dict.fromkeys(artifacts))
+        for artifact in self.artifacts:
+            if artifact not in WRITERS:
+                raise ValueError(
+                    f"Unknown artifact {artifact!r}, expected one of {ARTIFACTS}"
+                )
+        self._executor: "ThreadPoolExecutor | None" = None
+        self._pending: list["Future"] = []
+        self._instrumentation: Instrumentation | None = instrumentation
+
+    def submit(self, store: OuiStore, baseFileName: str) -> list["Future"]:
+        """Schedules the configured artifacts of a store to be written
+
+        Args:
+            store (OuiStore): The store to write, it is not modified while written
+            baseFileName (str): The path of the CSV file the artifacts are named after
+
+        Returns:
+            list[Future]: A future for every artifact, holding its error if the
+            write failed
+        """
+        if not self.artifacts:
+            return []
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="IeeOuiDbArtifacts"
+            )
+
+        futures: list["Future"] = [
+            self._executor.submit(
+                self._write, artifact, store, artifactFileName(baseFileName, artifact)
+            )
+            for artifact in self.artifacts
+        ]
+        self._pending = [f for f in self._pending if not f.done()] + futures
+        return futures
+
+    def _write(self, artifact: str, store: OuiStore, fileName: str) -> None:
+        """Writes an artifact, recording the write if instrumented"""
+        if self._instrumentation is None:
+            WRITERS[artifact](store, fileName)
+            return
+        with self._instrumentation.phase(PERSIST) as phase:
+            WRITERS[artifact](store, fileName)
+            phase.rows = len(store)
+            phase.bytes = os.path.getsize(fileName)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits for the scheduled artifacts to be written
+
+        Args:
+            timeout (float | None, optional): The maximum number of seconds to wait.
+                Defaults to None, waiting until every artifact is written.
+
+        Returns:
+            bool: True if every scheduled artifact is done, False if it timed out
+        """
+        if not self._pending:
+            return True
+        from concurrent.futures import wait
+
+        notDone = wait(self._pending, timeout=timeout).not_done
+        return not notDone
@@ -0,0 +1,275 @@
+"""
+Description: An asyncio front end to the IEEE OUI database.
+
+Everything that blocks, the download of the CSV files, their parsing and the
+building of the indexes, runs in an executor, so opening and refreshing the
+database are awaited without stalling the event loop. Lookups only read the
+database in memory and take microseconds, so they run on the loop itself:
+handing one to a thread would cost more than the lookup. Batches of lookups
+give the loop back after every chunk of MAC addresses.
+
+    database = await AsyncIeeOuiDb.open()
+    await database.getOrganizationName("d8:ec:5e:12:34:56")
+    changes = await database.refresh()
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, Iterable, Literal, TypeVar
+
+from NG_OUI_DB import IeeOuiDb
+from .registries import REGISTRIES, Registry
+from .artifacts import DEFAULT_ARTIFACTS
+from .iotClassifier import IOT_KEYWORDS
+from .changes import ChangeSet
+from .query import Predicate
+from .store import OuiRecord
+from .validators import MacAddress
+
+# the number of MAC addresses a batch looks up before giving the loop back
+BATCH_CHUNK_SIZE = 256
+
+T = TypeVar("T")
+
+
+class AsyncIeeOuiDb:
+    """The IEEE OUI database for asyncio applications
+
+    Attributes:
+    - database (IeeOuiDb): The database, for its synchronous methods
+    - chunkSize (int): The number of MAC addresses a batch looks up before giving
+        the loop back
+
+    Note:
+        Refreshes swap in the new database only once it is fully built, and the
+        suspected IoT manufacturers of a new database are classified on the
+        refreshing thread before it is swapped in, see IeeOuiDb.refresh().
+
+        The executor is the default executor of the loop unless one is given.
+        Parsing in a thread still shares the GIL with the loop, which takes it
+        back at every switch interval of the interpreter, see
+        sys.setswitchinterval().
+
+    Methods:
+    - open(...): Builds the database in the executor, the arguments of IeeOuiDb
+    - load(): Loads the database and builds what lookups need in the executor
+    - refresh(): Downloads the expired CSV files and returns the changes
+    - waitForRefresh(timeout: float | None): Waits for a background refresh
+    - run(function: Callable, *args): Runs any blocking function in the executor
+    - getOrganizationName(mac: MacAddress): Returns the organization name
+    - getOrganizationAddress(mac: MacAddress): Returns the organization address
+    - getAssignment(mac: MacAddress): Returns the assignment
+    - getRegistry(mac: MacAddress): Returns the registry
+    - getOrganization(mac: MacAddress): Returns the organization
+    - isIoT(mac: MacAddress): Returns if a MAC address belongs to a suspected IoT
+        manufacturer
+    - getOrganizationNames(macs: Iterable): Returns the organization names of a batch
+    - getOrganizationAddresses(macs: Iterable): Returns the organization addresses of
+        a batch
+    - getAssignments(macs: Iterable): Returns the assignments of a batch
+    - getRegistries(macs: Iterable): Returns the registries of a batch
+    - getOrganizationRecords(macs: Iterable): Returns the organizations of a batch
+    - areIoT(macs: Iterable): Returns if each MAC address of a batch belongs to a
+        suspected IoT manufacturer
+    - query(predicate: Predicate): Returns the organizations matching a predicate
+    - queryCount(predicate: Predicate): Returns the number of organizations matching
+        a predicate
+    - summary(): Returns the number of MAC addresses of every registry and
+        organization
+    """
+
+    def __init__(
+        self,
+        database: IeeOuiDb,
+        executor: Executor | None = None,
+        chunkSize: int = BATCH_CHUNK_SIZE,
+    ) -> None:
+        """Wraps a database, await load() before the first lookup if it is lazy
+
+        Args:
+            database (IeeOuiDb): The database
+            executor (Executor | None, optional): The executor the blocking work
+                runs in. Defaults to None, the default executor of the loop.
+            chunkSize (int, optional): The number of MAC addresses a batch looks up
+                before giving the loop back. Defaults to BATCH_CHUNK_SIZE.
+        """
+        if chunkSize < 1:
+            raise ValueError(f"The chunk size must be at least 1, got {chunkSize}")
+        self.database: IeeOuiDb = database
+        self.chunkSize: int = chunkSize
+        self._executor: Executor | None = executor
+
+    @classmethod
+    async def open(
+        cls,
+        registries: Iterable[Registry] = REGISTRIES,
+        lazy: bool = False,
+        artifacts: Iterable[str] = DEFAULT_ARTIFACTS,
+        iotKeywords: Iterable[str] = IOT_KEYWORDS,
+        cacheSize: int = 0,
+        executor: Executor | None = None,
+        chunkSize: int = BATCH_CHUNK_SIZE,
+    ) -> "AsyncIeeOuiDb":
+        """Builds the database in the executor, ready for lookups on the loop
+
+        Args:
+            registries, lazy, artifacts, iotKeywords, cacheSize: See IeeOuiDb
+            executor (Executor | None, optional): The executor the blocking work
+                runs in. Defaults to None, the default executor of the loop.
+            chunkSize (int, optional): The number of MAC addresses a batch looks up
+                before giving the loop back. Defaults to BATCH_CHUNK_SIZE.
+
+        Returns:
+            AsyncIeeOuiDb: The database, downloaded, parsed and indexed
+
+        Note:
+            With lazy=True the local files are loaded and served while a
+            background thread downloads the new database, if they are older than
+            24 hours.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        database: IeeOuiDb = await loop.run_in_executor(
+            executor,
+            partial(IeeOuiDb, registries, lazy, artifacts, iotKeywords, cacheSize),
+        )
+        asyncDatabase = cls(database, executor, chunkSize)
+        await asyncDatabase.load()
+        return asyncDatabase
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        """Runs a blocking function in the executor
+
+        Args:
+            function (Callable): The function, such as a method of the database
+            *args (Any): The arguments of the function
+
+        Returns:
+            Any: The result of the function
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(function, *args))
+
+    async def load(self) -> None:
+        """Loads the database and builds what lookups need in the executor"""
+        await self.run(self.database.load)
+
+    async def refresh(self) -> ChangeSet:
+        """Downloads the expired CSV files and returns the changes to the database
+
+        Returns:
+            ChangeSet: The changes since the database was loaded or last refreshed,
+            see IeeOuiDb.refresh()
+        """
+        return await self.run(self.database.refresh)
+
+    async def waitForRefresh(self, timeout: float | None = None) -> bool:
+        """Waits for a background refresh of a lazy database to finish
+
+        Args:
+            timeout (float | None, optional): The maximum number of seconds to wait.
+                Defaults to None, waiting until the refresh is done.
+
+        Returns:
+            bool: True if no refresh is running anymore, False if it timed out
+        """
+        return await self.run(self.database.waitForRefresh, timeout)
+
+    async def getOrganizationName(self, mac: MacAddress) -> str | Literal["Unknown"]:
+        """Returns the organization name of a MAC address, see IeeOuiDb"""
+        return self.database.getOrganizationName(mac)
+
+    async def getOrganizationAddress(self, mac: MacAddress) -> str | Literal["Unknown"]:
+        """Returns the organization address of a MAC address, see IeeOuiDb"""
+        return self.database.getOrganizationAddress(mac)
+
+    async def getAssignment(self, mac: MacAddress) -> str | Literal["Unknown"]:
+        """Returns the assignment of a MAC address, see IeeOuiDb"""
+        return self.database.getAssignment(mac)
+
+    async def getRegistry(self, mac: MacAddress) -> str | Literal["Unknown"]:
+        """Returns the registry of a MAC address, see IeeOuiDb"""
+        return self.database.getRegistry(mac)
+
+    async def getOrganization(self, mac: MacAddress) -> OuiRecord | Literal["Unknown"]:
+        """Returns the organization of a MAC address, see IeeOuiDb"""
+        return self.database.getOrganization(mac)
+
+    async def isIoT(self, mac: MacAddress) -> bool:
+        """Returns if a MAC address belongs to a suspected IoT manufacturer"""
+        return self.database.isIoT(mac)
+
+    async def getOrganizationNames(
+        self, macs: Iterable[MacAddress]
+    ) -> list[str | Literal["Unknown"]]:
+        """Returns the organization names of a batch of MAC addresses
+
+        Args:
+            macs (Iterable[MacAddress]): The MAC addresses
+
+        Returns:
+            list[str]: The organization name of each MAC address or "Unknown"
+        """
+        return await self._batch(self.database.getOrganizationName, macs)
+
+    async def getOrganizationAddresses(
+        self, macs: Iterable[MacAddress]
+    ) -> list[str | Literal["Unknown"]]:
+        """Returns the organization addresses of a batch of MAC addresses"""
+        return await self._batch(self.database.getOrganizationAddress, macs)
+
+    async def getAssignments(
+        self, macs: Iterable[MacAddress]
+    ) -> list[str | Literal["Unknown"]]:
+        """Returns the assignments of a batch of MAC addresses"""
+        return await self._batch(self.database.getAssignment, macs)
+
+    async def getRegistries(
+        self, macs: Iterable[MacAddress]
+    ) -> list[str | Literal["Unknown"]]:
+        """Returns the registries of a batch of MAC addresses"""
+        return await self._batch(self.database.getRegistry, macs)
+
+    async def getOrganizationRecords(
+        self, macs: Iterable[MacAddress]
+    ) -> list[OuiRecord | Literal["Unknown"]]:
+        """Returns the organizations of a batch of MAC addresses"""
+        return await self._batch(self.database.getOrganization, macs)
+
+    async def areIoT(self, macs: Iterable[MacAddress]) -> list[bool]:
+        """Returns if each MAC address of a batch belongs to a suspected IoT
+        manufacturer
+        """
+        return await self._batch(self.database.isIoT, macs)
+
+    async def query(self, predicate: Predicate) -> list[OuiRecord]:
+        """Returns the organizations matching a predicate, see IeeOuiDb.query()
+
+        Note:
+            The first evaluation of a predicate builds its bitmaps, so queries run
+            in the executor.
+        """
+        return await self.run(self.database.query, predicate)
+
+    async def queryCount(self, predicate: Predicate) -> int:
+        """Returns the number of organizations matching a predicate"""
+        return await self.run(self.database.queryCount, predicate)
+
+    async def summary(self) -> dict:
+        """Returns the number of MAC addresses of every registry and organization"""
+        return await self.run(self.database.summary)
+
+    async def _batch(
+        self, lookup: Callable[[MacAddress], T], macs: Iterable[MacAddress]
+    ) -> list[T]:
+        """Looks up a batch of MAC addresses, giving the loop back between chunks"""
+        results: list[T] = []
+        append = results.append
+        chunkSize: int = self.chunkSize
+        for count, mac in enumerate(macs, 1):
+            append(lookup(mac))
+            if count % chunkSize == 0:
+                await asyncio.sleep(0)
+        return results
@@ -0,0 +1,265 @@
+"""
+Description: Vectorized batch lookups against an OuiStore using NumPy.
+
+MAC addresses are parsed, reduced to their prefixes and joined against the
+sorted key array of the store as whole arrays, so the cost of a batch grows
+with its size rather than with one interpreter round trip per address. Batches
+are processed in chunks to bound the size of the intermediate arrays.
+
+NumPy is an optional dependency, install it with `pip install NG_OUI_DB[numpy]`.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+from typing import Any, Sequence
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError(
+        "Batch lookups require NumPy, install it with: pip install NG_OUI_DB[numpy]"
+    ) from error
+
+from .store import OuiStore
+from .prefixIndex import PREFIX_LENGTHS
+from .utils import getMacPrefix
+
+UNKNOWN = "Unknown"
+
+_CHUNK_SIZE = 1 << 16
+_MAC_DIGITS = 12
+_MAC_MAX = (1 << 48) - 1
+
+# maps every byte to its hex value, the separators getMacPrefix() skips to
+# _SKIP, and the NUL padding of fixed width NumPy strings to _PAD
+_SKIP = 16
+_INVALID = 17
+_PAD = 18
+_HEX_VALUES = np.full(256, _INVALID, dtype=np.uint8)
+for _char in b"0123456789":
+    _HEX_VALUES[_char] = _char - ord("0")
+for _char in b"abcdef":
+    _HEX_VALUES[_char] = _char - ord("a") + 10
+    _HEX_VALUES[_char - 32] = _char - ord("a") + 10
+for _char in b":-.":
+    _HEX_VALUES[_char] = _SKIP
+_HEX_VALUES[0] = _PAD
+
+# the pairs notation of normalizeMac() has 5 separators and may drop the leading
+# zeros of a pair, as in 0:11:22:3:44:55
+_PAIRS_SEPARATORS = 5
+
+_NIBBLE_SHIFTS = np.arange(44, -1, -4, dtype=np.uint64)
+
+
+def parseMacs(macs: Sequence[Any] | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Parses MAC addresses into their integer values
+
+    Args:
+        macs (Sequence[Any] | np.ndarray): MAC addresses in any of the notations of
+            getMacPrefix(), or their 48 bit integer values
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The 48 bit integer value of each MAC address,
+        padded with zeros if only part of it was given, and the number of bits that
+        were given. Invalid MAC addresses, including integers outside of 48 bits,
+        have 0 known bits.
+
+    Note:
+        Every MAC address is parsed as getMacPrefix() parses it on its own. The
+        colon, dash and dot notations and their leading parts are parsed as whole
+        arrays, any other notation, such as 0x001122334455 or 00 11 22 33 44 55,
+        one at a time by getMacPrefix().
+    """
+    if not isinstance(macs, np.ndarray):
+        # np.asarray() would turn a mix of integers and strings into strings
+        macs = list(macs)
+        macs = np.fromiter(macs, dtype=object, count=len(macs))
+    macs = macs.ravel()
+    if macs.dtype.kind in "iu":
+        return _parseIntegers(macs)
+    if macs.dtype.kind == "U":
+        return _parseStrings(macs)
+    # bytes are raw octets or ASCII text, and anything else is invalid, as for
+    # getMacPrefix()
+    return _parseObjects(macs.astype(object))
+
+
+def _parseIntegers(macs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Parses an integer array, see parseMacs()"""
+    valid: np.ndarray = (macs >= 0) & (macs <= _MAC_MAX)
+    values: np.ndarray = np.where(valid, macs, 0).astype(np.uint64)
+    return values, np.where(valid, 48, 0).astype(np.int8)
+
+
+def _parseObjects(macs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Parses an object array element by element, see parseMacs()
+
+    Note:
+        The integers and the strings are each parsed as one array, so a mix of
+        both is parsed as fast as either. Any other object is parsed on its own.
+    """
+    values: np.ndarray = np.zeros(len(macs), dtype=np.uint64)
+    knownBits: np.ndarray = np.zeros(len(macs), dtype=np.int8)
+
+    integers: list[int] = []
+    integerRows: list[int] = []
+    strings: list[str] = []
+    stringRows: list[int] = []
+    for row, mac in enumerate(macs):
+        if isinstance(mac, (int, np.integer)):
+            # Python integers may not even fit in 64 bits
+            integers.append(int(mac) if 0 <= mac <= _MAC_MAX else -1)
+            integerRows.append(row)
+        elif isinstance(mac, str):
+            strings.append(mac)
+            stringRows.append(row)
+        else:
+            values[row], knownBits[row] = _parseOne(mac)
+
+    if integers:
+        parsed = _parseIntegers(np.array(integers, dtype=np.int64))
+        values[integerRows], knownBits[integerRows] = parsed
+    if strings:
+        parsed = _parseStrings(np.array(strings, dtype="U"))
+        values[stringRows], knownBits[stringRows] = parsed
+    return values, knownBits
+
+
+def _parseOne(mac: Any) -> tuple[int, int]:
+    """Parses a MAC address with getMacPrefix(), 0 known bits if it is invalid"""
+    try:
+        return getMacPrefix(mac=mac)
+    except (ValueError, TypeError):
+        return 0, 0
+
+
+def _parseStrings(macs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Parses a one dimensional string array, see parseMacs()"""
+    values: np.ndarray = np.zeros(len(macs), dtype=np.uint64)
+    knownBits: np.ndarray = np.zeros(len(macs), dtype=np.int8)
+
+    # read the characters as code points
+    width: int = macs.dtype.itemsize // np.dtype(np.uint32).itemsize
+    if width == 0:
+        return values, knownBits
+
+    for start in range(0, len(macs), _CHUNK_SIZE):
+        chunk: np.ndarray = macs[start : start + _CHUNK_SIZE]
+        codes: np.ndarray = chunk.view(np.uint32).reshape(len(chunk), width)
+        characters: np.ndarray = _HEX_VALUES[np.minimum(codes, 255)]
+        characters[codes > 255] = _INVALID
+        isDigit: np.ndarray = characters < _SKIP
+
+        if (isDigit == isDigit[0]).all():
+            # every MAC address uses the same notation, take the digit columns
+            digits: np.ndarray = characters[:, np.flatnonzero(isDigit[0])]
+        else:
+            # move the hex digits of every row to the front, keeping their order
+            order: np.ndarray = np.argsort(~isDigit, axis=1, kind="stable")
+            digits = np.take_along_axis(characters, order, axis=1)
+        digits = digits[:, :_MAC_DIGITS].astype(np.uint64)
+
+        count: np.ndarray = np.minimum(isDigit.sum(axis=1), _MAC_DIGITS)
+        digits[np.arange(digits.shape[1]) >= count[:, None]] = 0
+
+        # the rows getMacPrefix() may read otherwise: other characters, NULs
+        # inside the string, and pairs missing their leading zeros
+        isPad: np.ndarray = characters == _PAD
+        other: np.ndarray = (
+            (characters == _INVALID).any(axis=1)
+            | (isPad[:, :-1] & ~isPad[:, 1:]).any(axis=1)
+            | (
+                (count < _MAC_DIGITS)
+                & ((characters == _SKIP).sum(axis=1) >= _PAIRS_SEPARATORS)
+            )
+        )
+
+        values[start : start + len(chunk)] = np.bitwise_or.reduce(
+            digits << _NIBBLE_SHIFTS[: digits.shape[1]], axis=1
+        )
+        knownBits[start : start + len(chunk)] = count * 4
+        for row in (np.flatnonzero(other) + start).tolist():
+            values[row], knownBits[row] = _parseOne(str(macs[row]))
+
+    return values, knownBits
+
+
+def lookupRows(store: OuiStore, macs: Sequence[Any] | np.ndarray) -> np.ndarray:
+    """Returns the row of the most specific block containing each MAC address
+
+    Args:
+        store (OuiStore): The store to look the MAC addresses up in
+        macs (Sequence[Any] | np.ndarray): MAC address strings or integer values
+
+    Returns:
+        np.ndarray: The row of each MAC address, or -1 if it is not assigned
+    """
+    values, knownBits = parseMacs(macs)
+    sortedKeys, positions = store.derived("batchIndex", _buildIndex)
+
+    rows: np.ndarray = np.full(len(values), -1, dtype=np.int64)
+    if len(sortedKeys) == 0:
+        return rows
+
+    for bits in PREFIX_LENGTHS:
+        shift = np.uint64(48 - bits)
+        probes: np.ndarray = (values >> shift << shift) | np.uint64(bits << 48)
+        found: np.ndarray = np.minimum(
+            np.searchsorted(sortedKeys, probes), len(sortedKeys) - 1
+        )
+        hit: np.ndarray = (
+            (rows < 0) & (knownBits >= bits) & (sortedKeys[found] == probes)
+        )
+        rows[hit] = positions[found[hit]]
+
+    return rows
+
+
+def organizationNames(store: OuiStore, rows: np.ndarray) -> np.ndarray:
+    """Returns the organization name of each row, or "Unknown" for -1"""
+    nameIds, names = store.derived("batchNames", _buildNames)
+    if len(nameIds) == 0:
+        return np.full(len(rows), UNKNOWN, dtype=object)
+    return names[np.where(rows < 0, len(names) - 1, nameIds[rows])]
+
+
+def registries(store: OuiStore, rows: np.ndarray) -> np.ndarray:
+    """Returns the registry of each row, or "Unknown" for -1"""
+    codes: np.ndarray = np.frombuffer(store.registryCodes(), dtype=np.uint8)
+    names: np.ndarray = np.array(store.registryNames() + (UNKNOWN,), dtype=object)
+    if len(codes) == 0:
+        return np.full(len(rows), UNKNOWN, dtype=object)
+    return names[np.where(rows < 0, len(names) - 1, codes[rows])]
+
+
+def fromUniqueRows(rows: np.ndarray, getter) -> np.ndarray:
+    """Applies a per row getter once for every distinct row, "Unknown" for -1
+
+    Args:
+        rows (np.ndarray): The rows returned by lookupRows
+        getter (Callable[[int], Any]): Returns the value of a row
+
+    Returns:
+        np.ndarray: An object array holding the value of each row
+    """
+    uniqueRows, inverse = np.unique(rows, return_inverse=True)
+    values: np.ndarray = np.empty(len(uniqueRows), dtype=object)
+    for i, row in enumerate(uniqueRows.tolist()):
+        values[i] = UNKNOWN if row < 0 else getter(row)
+    return values[inverse.ravel()]
+
+
+def _buildIndex(store: OuiStore) -> tuple[np.ndarray, np.ndarray]:
+    index = store.prefixIndex()
+    return (
+        np.frombuffer(index.sortedKeys(), dtype=np.uint64),
+        np.frombuffer(index.positions(), dtype=np.uint32),
+    )
+
+
+def _buildNames(store: OuiStore) -> tuple[np.ndarray, np.ndarray]:
+    names: np.ndarray = np.empty(len(store.nameTable()) + 1, dtype=object)
+    names[:-1] = list(store.nameTable())
+    names[-1] = UNKNOWN
+    return np.frombuffer(store.nameIds(), dtype=np.uint32), names
@@ -0,0 +1,7 @@
+"""
+Description: Offline benchmarks of the database against synthetic registries.
+
+    python -m NG_OUI_DB.benchmarks --scales 1 10 100
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
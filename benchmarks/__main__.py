@@ -0,0 +1,92 @@
+"""
+Description: Runs the benchmark suite and compares it with the stored baseline.
+
+The exit status is 1 if any benchmark regressed, so the suite can gate a build.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import sys
+import argparse
+
+from .suite import (
+    BASELINE_FILE_NAME,
+    DEFAULT_TOLERANCE,
+    SCALES,
+    BenchmarkResult,
+    compare,
+    loadBaseline,
+    runSuite,
+    saveBaseline,
+)
+
+_COLUMNS = "{:<64} {:>7} {:>14} {:>11} {:>11} {:>11} {:>11}"
+
+
+def printResult(result: BenchmarkResult) -> None:
+    print(
+        _COLUMNS.format(
+            result.name,
+            result.calls,
+            f"{result.throughput:,.0f}",
+            f"{result.p50:,.1f}",
+            f"{result.p95:,.1f}",
+            f"{result.p99:,.1f}",
+            f"{result.peakMemory / 1024:,.0f}",
+        ),
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m NG_OUI_DB.benchmarks",
+        description="Benchmarks the database offline against synthetic registries",
+    )
+    parser.add_argument(
+        "--scales",
+        type=float,
+        nargs="+",
+        default=SCALES,
+        help="The sizes of the registries relative to the real ones",
+    )
+    parser.add_argument("--baseline", default=BASELINE_FILE_NAME)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="The growth of the median latency or peak memory that is a regression",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the results as the baseline instead of comparing them",
+    )
+    arguments = parser.parse_args(argv)
+
+    print(
+        _COLUMNS.format(
+            "benchmark", "calls", "ops/s", "p50 us", "p95 us", "p99 us", "peak KiB"
+        )
+    )
+    results: list[BenchmarkResult] = runSuite(arguments.scales, report=printResult)
+
+    if arguments.update_baseline:
+        saveBaseline(results, arguments.baseline)
+        print(f"\nBaseline written to {arguments.baseline}")
+        return 0
+
+    regressions: list[str] = compare(
+        results, loadBaseline(arguments.baseline), arguments.tolerance
+    )
+    if regressions:
+        print(f"\n{len(regressions)} regressions against {arguments.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nNo regressions against {arguments.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+"""
+Description: The offline benchmark suite of the database.
+
+Every benchmark calls one path of the database with a list of arguments and
+times each call, reporting the throughput, the 50th, 95th and 99th percentile
+latencies and the peak memory allocated by the path, traced with tracemalloc in
+a separate run so tracing does not slow the timed calls down. The suite runs
+against synthetic registries (see synthetic.py) in a temporary directory, the
+database files and the IoT manufacturer files of the user are not touched and
+nothing is downloaded.
+
+Results are compared with a baseline, a JSON file of earlier results, and a
+benchmark regresses when its median latency or its peak memory grew by more
+than a tolerance.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import os
+import json
+import random
+import tempfile
+import platform
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import Any, Callable, Iterator, NamedTuple, Sequence
+
+import NG_OUI_DB
+from NG_OUI_DB import IeeOuiDb
+from .. import extractIotManufacturers
+from ..registries import Registry
+from ..artifacts import BINARY
+from .synthetic import writeRegistries
+
+# the scales of the real registry sizes the suite runs at
+SCALES: tuple[float, ...] = (1, 10, 100)
+
+# the baseline stored with the suite
+BASELINE_FILE_NAME = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# the growth of the median latency or peak memory reported as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# the number of calls of the lookup and search benchmarks, the searches scan the
+# database so fewer of them are made at larger scales
+LOOKUPS = 20_000
+SEARCHES = 200
+MIN_SEARCHES = 20
+BATCH_SIZE = 10_000
+
+# the calls traced for the peak memory, the peak of a path does not grow with
+# the number of calls
+TRACED_CALLS = 100
+TRACED_SEARCHES = 10
+
+
+class BenchmarkResult(NamedTuple):
+    """The measurements of a benchmark
+
+    Attributes:
+    - name (str): The name of the benchmark, "<scale>x/<path>"
+    - calls (int): The number of timed calls
+    - throughput (float): The operations per second, a batch call counts each MAC
+    - p50 (float): The median latency of a call in microseconds
+    - p95 (float): The 95th percentile latency of a call in microseconds
+    - p99 (float): The 99th percentile latency of a call in microseconds
+    - peakMemory (int): The peak bytes allocated while calling the path
+    """
+
+    name: str
+    calls: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    peakMemory: int
+
+
+def measure(
+    name: str,
+    call: Callable[[Any], Any],
+    arguments: Sequence[Any],
+    operationsPerCall: int = 1,
+    tracedCalls: int = TRACED_CALLS,
+) -> BenchmarkResult:
+    """Times a path called with every argument and traces its peak memory
+
+    Args:
+        name (str): The name of the benchmark
+        call (Callable[[Any], Any]): Calls the path with one argument
+        arguments (Sequence[Any]): The argument of every timed call
+        operationsPerCall (int, optional): The operations of a call, such as the
+            MAC addresses of a batch. Defaults to 1.
+        tracedCalls (int, optional): The calls traced for the peak memory, with
+            the first arguments. Defaults to TRACED_CALLS.
+
+    Returns:
+        BenchmarkResult: The measurements of the benchmark
+    """
+    latencies: list[int] = []
+    append = latencies.append
+    for argument in arguments:
+        start: int = perf_counter_ns()
+        call(argument)
+        append(perf_counter_ns() - start)
+
+    tracemalloc.start()
+    try:
+        for argument in arguments[:tracedCalls]:
+            call(argument)
+        peakMemory: int = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return BenchmarkResult(
+        name=name,
+        calls=len(latencies),
+        throughput=len(latencies) * operationsPerCall * 1e9 / max(sum(latencies), 1),
+        p50=_percentile(latencies, 0.50) / 1000,
+        p95=_percentile(latencies, 0.95) / 1000,
+        p99=_percentile(latencies, 0.99) / 1000,
+        peakMemory=peakMemory,
+    )
+
+
+def runSuite(
+    scales: Sequence[float] = SCALES,
+    directory: str | None = None,
+    report: Callable[[BenchmarkResult], None] | None = None,
+) -> list[BenchmarkResult]:
+    """Runs every benchmark at every scale
+
+    Args:
+        scales (Sequence[float], optional): The scales of the real registry sizes.
+            Defaults to SCALES.
+        directory (str | None, optional): Where the synthetic registries and the
+            database files are written. Defaults to None, a temporary directory
+            removed afterwards.
+        report (Callable[[BenchmarkResult], None] | None, optional): Called with
+            every result as soon as it is measured. Defaults to None.
+
+    Returns:
+        list[BenchmarkResult]: The results, in the order they were measured
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory(prefix="NG_OUI_DB-benchmarks-") as temporary:
+            return runSuite(scales, temporary, report)
+
+    results: list[BenchmarkResult] = []
+    for scale in scales:
+        scaleDirectory: str = os.path.join(directory, f"{scale:g}x")
+        registries: tuple[Registry, ...] = writeRegistries(scaleDirectory, scale)
+        with _isolated(scaleDirectory):
+            for result in _benchmarks(scale, registries):
+                results.append(result)
+                if report is not None:
+                    report(result)
+    return results
+
+
+def compare(
+    results: Sequence[BenchmarkResult],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """Returns the regressions of results against a baseline
+
+    Args:
+        results (Sequence[BenchmarkResult]): The results
+        baseline (dict[str, dict[str, float]]): The baseline results by name, see
+            loadBaseline()
+        tolerance (float, optional): The growth tolerated, 0.25 for 25%. Defaults
+            to DEFAULT_TOLERANCE.
+
+    Returns:
+        list[str]: A description of every regression, benchmarks that are not in
+        the baseline are skipped
+    """
+    regressions: list[str] = []
+    for result in results:
+        previous: dict[str, float] | None = baseline.get(result.name)
+        if previous is None:
+            continue
+        for metric in ("p50", "peakMemory"):
+            before: float = previous[metric]
+            after: float = getattr(result, metric)
+            if before > 0 and after > before * (1 + tolerance):
+                regressions.append(
+                    f"{result.name} {metric}: {before:g} -> {after:g} "
+                    f"(+{(after / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def loadBaseline(fileName: str = BASELINE_FILE_NAME) -> dict[str, dict[str, float]]:
+    """Returns the results of a baseline file by benchmark name, empty if missing"""
+    try:
+        with open(fileName, "r", encoding="utf-8") as file:
+            return json.load(file)["results"]
+    except FileNotFoundError:
+        return {}
+
+
+def saveBaseline(
+    results: Sequence[BenchmarkResult], fileName: str = BASELINE_FILE_NAME
+) -> None:
+    """Writes results as the baseline, replacing the ones of the same benchmarks"""
+    stored: dict[str, dict[str, float]] = loadBaseline(fileName)
+    for result in results:
+        stored[result.name] = {
+            metric: round(value, 3) if isinstance(value, float) else value
+            for metric, value in result._asdict().items()
+            if metric != "name"
+        }
+    with open(fileName, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": dict(sorted(stored.items())),
+            },
+            file,
+            indent=4,
+        )
+        file.write("\n")
+
+
+def _benchmarks(
+    scale: float, registries: tuple[Registry, ...]
+) -> Iterator[BenchmarkResult]:
+    """Yields the results of every benchmark at one scale"""
+    prefix: str = f"{scale:g}x"
+    # the database is built once per construction, too slow to repeat at 100x
+    constructions: range = range(3 if scale <= 10 else 1)
+
+    # without the binary artifact no snapshot is looked for, the files are parsed
+    yield measure(
+        f"{prefix}/construction.cold",
+        lambda _: IeeOuiDb(registries=registries, artifacts=()),
+        constructions,
+        tracedCalls=1,
+    )
+
+    # with it the snapshot written by the first construction is mapped
+    IeeOuiDb(registries=registries, artifacts=(BINARY,)).waitForArtifacts()
+    yield measure(
+        f"{prefix}/construction.warm",
+        lambda _: IeeOuiDb(registries=registries, artifacts=(BINARY,)),
+        constructions,
+        tracedCalls=1,
+    )
+
+    statuses: dict[str, str] = {
+        registry.name: registry.fileName for registry in registries
+    }
+    parser = IeeOuiDb(registries=registries, lazy=True, artifacts=())
+    yield measure(
+        f"{prefix}/parse",
+        lambda _: parser._convertCsvToStore(statuses),
+        constructions,
+        tracedCalls=1,
+    )
+
+    database = IeeOuiDb(registries=registries, artifacts=())
+    generator: random.Random = random.Random(0)
+    searchCount: int = max(MIN_SEARCHES, round(SEARCHES / max(scale, 1)))
+    assignments: list[str] = [
+        database.getAssignment(mac) for mac in _macs(database, generator, searchCount)
+    ]
+    macs: list[str] = _macs(database, generator, LOOKUPS)
+    names: list[str] = database.getOrganizations()
+    # a word of a name, such as "Smart", matches it and the names sharing it
+    organizations: list[str] = [
+        generator.choice(names).split()[0] for _ in range(searchCount)
+    ]
+    registryNames: list[str] = [
+        generator.choice(registries).name for _ in range(searchCount)
+    ]
+    searches = list(zip(organizations, assignments, registryNames))
+
+    yield measure(f"{prefix}/lookup.single", database.getOrganizationName, macs)
+    try:
+        import numpy  # noqa: F401
+
+        batches: list[list[str]] = [
+            macs[start : start + BATCH_SIZE] for start in range(0, LOOKUPS, BATCH_SIZE)
+        ]
+        yield measure(
+            f"{prefix}/lookup.batch",
+            database.getOrganizationNames,
+            batches,
+            operationsPerCall=BATCH_SIZE,
+        )
+    except ImportError:
+        pass
+
+    for name, search in (
+        (
+            "getOrganizationsByAssignment",
+            lambda arguments: database.getOrganizationsByAssignment(arguments[1]),
+        ),
+        (
+            "getOrganizationsByRegistry",
+            lambda arguments: database.getOrganizationsByRegistry(arguments[2]),
+        ),
+        (
+            "getOrganizationsByOrganization",
+            lambda arguments: database.getOrganizationsByOrganization(arguments[0]),
+        ),
+        (
+            "getOrganizationsByOrganizationAndAssignment",
+            lambda arguments: database.getOrganizationsByOrganizationAndAssignment(
+                arguments[0], arguments[1]
+            ),
+        ),
+        (
+            "getOrganizationsByOrganizationAndRegistry",
+            lambda arguments: database.getOrganizationsByOrganizationAndRegistry(
+                arguments[0], arguments[2]
+            ),
+        ),
+        (
+            "getOrganizationsByAssignmentAndRegistry",
+            lambda arguments: database.getOrganizationsByAssignmentAndRegistry(
+                arguments[1], arguments[2]
+            ),
+        ),
+        (
+            "getOrganizationsByOrganizationAssignmentAndRegistry",
+            lambda arguments: (
+                database.getOrganizationsByOrganizationAssignmentAndRegistry(*arguments)
+            ),
+        ),
+    ):
+        yield measure(
+            f"{prefix}/search.{name}", search, searches, tracedCalls=TRACED_SEARCHES
+        )
+
+    yield measure(f"{prefix}/iot.isIoT", database.isIoT, macs)
+    yield measure(
+        f"{prefix}/iot.getIotManufacturers",
+        lambda _: extractIotManufacturers.getIotManufacturers(fromDatabase=database),
+        constructions,
+        tracedCalls=1,
+    )
+
+
+def _macs(database: IeeOuiDb, generator: random.Random, count: int) -> list[str]:
+    """Returns MAC addresses, 9 in 10 of them in a random block of the database"""
+    keys = database._store.keys()
+    macs: list[str] = []
+    for _ in range(count):
+        if generator.random() < 0.9:
+            key: int = keys[generator.randrange(len(keys))]
+            bits: int = key >> 48
+            base: int = key & 0xFFFFFFFFFFFF
+            value: int = base | generator.getrandbits(48 - bits)
+        else:
+            value = generator.getrandbits(48)
+        macs.append(":".join(f"{value:012x}"[i : i + 2] for i in range(0, 12, 2)))
+    return macs
+
+
+def _percentile(ordered: Sequence[int], fraction: float) -> float:
+    """Returns the nearest rank percentile of sorted values"""
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+@contextmanager
+def _isolated(directory: str) -> Iterator[None]:
+    """Points every file the database writes to a directory for the duration"""
+    saved: tuple[str, str, str] = (
+        NG_OUI_DB.CSV_FILE_NAME,
+        extractIotManufacturers.IOT_MAN_JSON_FILE,
+        extractIotManufacturers.IOT_MAN_PICKLE_FILE,
+    )
+    NG_OUI_DB.CSV_FILE_NAME = os.path.join(directory, "iee_oui.csv")
+    extractIotManufacturers.IOT_MAN_JSON_FILE = os.path.join(
+        directory, "iot_manufacturers.json"
+    )
+    extractIotManufacturers.IOT_MAN_PICKLE_FILE = os.path.join(
+        directory, "iot_manufacturers.pkl"
+    )
+    try:
+        yield
+    finally:
+        (
+            NG_OUI_DB.CSV_FILE_NAME,
+            extractIotManufacturers.IOT_MAN_JSON_FILE,
+            extractIotManufacturers.IOT_MAN_PICKLE_FILE,
+        ) = saved
@@ -0,0 +1,133 @@
+"""
+Description: Synthetic IEEE registry CSV files for offline benchmarks.
+
+The files have the header, quoting and assignment lengths of the real registries
+and, at scale 1, about as many rows: every assignment is unique, organization
+names repeat across blocks as they do in the real data, and a share of them
+contain IoT keywords so the IoT paths have manufacturers to find. The rows are
+generated from a seeded random generator, so a scale and seed always produce
+the same files.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import os
+import csv
+import random
+
+from ..registries import REGISTRIES, Registry
+
+# the approximate number of rows of each registry at scale 1
+REGISTRY_SIZES: dict[str, int] = {
+    "MA-L": 37_000,
+    "MA-M": 5_900,
+    "MA-S": 6_700,
+    "IAB": 4_600,
+    "CID": 210,
+}
+
+# the number of hex digits of the assignments of each registry
+ASSIGNMENT_DIGITS: dict[str, int] = {
+    "MA-L": 6,
+    "MA-M": 7,
+    "MA-S": 9,
+    "IAB": 9,
+    "CID": 6,
+}
+
+# the share of organizations whose name contains an IoT keyword
+IOT_SHARE = 0.05
+# the number of blocks per organization, on average
+BLOCKS_PER_ORGANIZATION = 1.3
+
+_HEADER = ("Registry", "Assignment", "Organization Name", "Organization Address")
+_SUFFIXES = ("Inc.", "Co., Ltd.", "GmbH", "Corporation", "LLC", "S.A.", "Limited")
+_IOT_WORDS = ("Smart", "Tuya", "Espressif", "Nest", "Ring", "Sonos", "Wyze")
+_COUNTRIES = ("US", "CN", "DE", "JP", "TW", "KR", "GB", "FR", "IN", "SE")
+_SYLLABLES = (
+    "ka", "lo", "mi", "ne", "ra", "to", "vi", "zu", "shi", "tek",
+    "tron", "lan", "net", "cor", "dyn", "sys", "gen", "vo", "xi", "mar",
+)  # fmt: skip
+
+
+def registryRows(scale: float) -> dict[str, int]:
+    """Returns the number of rows of each registry at a scale, at least 1"""
+    return {name: max(1, round(rows * scale)) for name, rows in REGISTRY_SIZES.items()}
+
+
+def writeRegistries(
+    directory: str, scale: float = 1, seed: int = 0
+) -> tuple[Registry, ...]:
+    """Writes a synthetic CSV file for every registry
+
+    Args:
+        directory (str): The directory the files are written to
+        scale (float, optional): The size of the registries relative to the real
+            ones. Defaults to 1.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        tuple[Registry, ...]: The registries, their URLs unreachable so nothing
+        is ever downloaded
+    """
+    os.makedirs(directory, exist_ok=True)
+    generator: random.Random = random.Random(seed)
+    sizes: dict[str, int] = registryRows(scale)
+    organizations: list[tuple[str, str]] = _organizations(
+        generator, max(1, int(sum(sizes.values()) / BLOCKS_PER_ORGANIZATION))
+    )
+
+    # MA-L and CID blocks share the 24 bit space, MA-S and IAB the 36 bit one
+    used: dict[int, set[int]] = {}
+    registries: list[Registry] = []
+    for registry in REGISTRIES:
+        digits: int = ASSIGNMENT_DIGITS[registry.name]
+        taken: set[int] = used.setdefault(digits, set())
+        fileName: str = os.path.join(directory, os.path.basename(registry.fileName))
+        with open(fileName, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(_HEADER)
+            for assignment in _assignments(
+                generator, digits, sizes[registry.name], taken
+            ):
+                name, address = generator.choice(organizations)
+                writer.writerow(
+                    (registry.name, f"{assignment:0{digits}X}", name, address)
+                )
+        registries.append(
+            Registry(registry.name, f"http://127.0.0.1:9/{registry.name}", fileName)
+        )
+    return tuple(registries)
+
+
+def _assignments(
+    generator: random.Random, digits: int, count: int, taken: set[int]
+) -> list[int]:
+    """Returns distinct random assignments of a length, none of them already taken"""
+    space: int = 16**digits
+    assignments: list[int] = []
+    while len(assignments) < count:
+        assignment: int = generator.randrange(space)
+        if assignment not in taken:
+            taken.add(assignment)
+            assignments.append(assignment)
+    return assignments
+
+
+def _organizations(generator: random.Random, count: int) -> list[tuple[str, str]]:
+    """Returns distinct random organization names with an address each"""
+    organizations: dict[str, str] = {}
+    while len(organizations) < count:
+        words: list[str] = [
+            "".join(generator.choices(_SYLLABLES, k=generator.randint(2, 3)))
+            for _ in range(generator.randint(1, 2))
+        ]
+        if generator.random() < IOT_SHARE:
+            words.insert(generator.randint(0, len(words)), generator.choice(_IOT_WORDS))
+        name: str = " ".join(word.capitalize() for word in words)
+        name = f"{name} {generator.choice(_SUFFIXES)}"
+        organizations[name] = (
+            f"{generator.randint(1, 9999)} {generator.choice(words).capitalize()} Road"
+            f"  {generator.choice(_COUNTRIES)} {generator.randint(10000, 99999)}"
+        )
+    return list(organizations.items())
@@ -0,0 +1,102 @@
+"""
+Description: The changes between two versions of the IEEE OUI database.
+
+Blocks are matched by their packed key and compared by the record hash held in
+every store, so two stores are diffed with set operations over (key, hash)
+pairs without decoding any strings. Only the blocks that differ are turned
+into records.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+from typing import Callable, Sequence
+
+from .store import OuiRecord, OuiStore
+
+
+class ChangeSet:
+    """The blocks added, removed and modified between two stores
+
+    Attributes:
+    - added (tuple[OuiRecord, ...]): The records of the new blocks
+    - removed (tuple[OuiRecord, ...]): The records of the blocks that are gone, read
+        from the previous store
+    - modified (tuple[tuple[OuiRecord, OuiRecord], ...]): The previous and new record
+        of every block whose registry, name or address changed
+
+    The records of each attribute are sorted by assignment length, then assignment.
+    """
+
+    __slots__ = ("added", "removed", "modified")
+
+    def __init__(
+        self,
+        added: tuple[OuiRecord, ...] = (),
+        removed: tuple[OuiRecord, ...] = (),
+        modified: tuple[tuple[OuiRecord, OuiRecord], ...] = (),
+    ) -> None:
+        self.added: tuple[OuiRecord, ...] = added
+        self.removed: tuple[OuiRecord, ...] = removed
+        self.modified: tuple[tuple[OuiRecord, OuiRecord], ...] = modified
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return (
+            f"ChangeSet(added={len(self.added)}, removed={len(self.removed)}, "
+            f"modified={len(self.modified)})"
+        )
+
+    def assignments(self) -> dict[str, list[str]]:
+        """Returns the assignments of the changed blocks, keyed by kind of change"""
+        return {
+            "added": [record.assignment for record in self.added],
+            "removed": [record.assignment for record in self.removed],
+            "modified": [after.assignment for _, after in self.modified],
+        }
+
+
+Subscriber = Callable[[ChangeSet], None]
+
+
+def _raw(column: Sequence[int]) -> bytes:
+    return bytes(memoryview(column).cast("B"))
+
+
+def diffStores(previous: OuiStore, current: OuiStore) -> ChangeSet:
+    """Returns the changes from one store to another
+
+    Args:
+        previous (OuiStore): The store before the refresh
+        current (OuiStore): The store after the refresh
+
+    Returns:
+        ChangeSet: The blocks added, removed and modified by the refresh
+    """
+    # the same blocks in the same order, compared as raw bytes
+    sameKeys: bool = _raw(previous.keys()) == _raw(current.keys())
+    if sameKeys and _raw(previous.hashes()) == _raw(current.hashes()):
+        return ChangeSet()
+
+    previousPairs: set[tuple[int, int]] = set(zip(previous.keys(), previous.hashes()))
+    currentPairs: set[tuple[int, int]] = set(zip(current.keys(), current.hashes()))
+
+    # keys of blocks that are gone or changed, and of blocks that are new or changed
+    gone: set[int] = {key for key, _ in previousPairs - currentPairs}
+    came: set[int] = {key for key, _ in currentPairs - previousPairs}
+
+    def records(store: OuiStore, keys: set[int]) -> tuple[OuiRecord, ...]:
+        index = store.prefixIndex()
+        return tuple(store.record(index.find(key)) for key in sorted(keys))
+
+    return ChangeSet(
+        added=records(current, came - gone),
+        removed=records(previous, gone - came),
+        modified=tuple(
+            zip(records(previous, gone & came), records(current, gone & came))
+        ),
+    )
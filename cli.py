@@ -1,9 +1,11 @@
 import os
+import sys
 import time
-import traceback
+import argparse
 
 from NG_OUI_DB import (
     IeeOuiDb,
+    getSharedDb,
     CSV_FILE_NAME,
     NO_UPDATED_NEEDED,
     FAILED_TO_GET_CSV_FILE,
@@ -16,6 +18,7 @@ from .utils import (
     jsonWithProperIndent,
     arrayWithProperIndent,
 )
+from .stream import CSV, FORMATS, readMacs, streamMacs, streamSearch
 
 PROMPT = "Enter your choice: "
 MAC_PROMPT = "Enter the MAC Address: "
@@ -38,12 +41,10 @@ def handleMenuChoice(choice: str, database: IeeOuiDb) -> None:
             print(f"\n  {database.getRegistry(mac=mac)}")
         case "5":
             mac: str = getMacAddress()
-            print(
-                f"\n{jsonWithProperIndent(dict=database.getOrganization(mac=mac),
-                    indent=4,
-                    startingIndent=2
-                )}"
+            organization = jsonWithProperIndent(
+                dict=database.getOrganization(mac=mac), indent=4, startingIndent=2
             )
+            print(f"\n{organization}")
         case "6":
             organization: str = getOrgName()
             print(f"\n{database.getOrganizationsMac(organization=organization)}")
@@ -84,41 +85,34 @@ def handleMenuChoice(choice: str, database: IeeOuiDb) -> None:
         case "16":
             organization = getOrgName()
             assignment = getAssignment()
-            print(
-                f"\n {database.getOrganizationsByOrganizationAndAssignment(
-                        organization=organization,
-                        assignment=assignment
-                    )}"
+            organizations = database.getOrganizationsByOrganizationAndAssignment(
+                organization=organization, assignment=assignment
             )
+            print(f"\n {organizations}")
         case "17":
             organization = getOrgName()
             registry = getRegistry()
-            print(
-                f"\n {database.getOrganizationsByOrganizationAndRegistry(
-                        organization=organization,
-                        registry=registry
-                    )}"
+            organizations = database.getOrganizationsByOrganizationAndRegistry(
+                organization=organization, registry=registry
             )
+            print(f"\n {organizations}")
         case "18":
             assignment = getAssignment()
             registry = getRegistry()
-            print(
-                f"\n {database.getOrganizationsByAssignmentAndRegistry(
-                    assignment=assignment,
-                    registry=registry
-                    )}"
+            organizations = database.getOrganizationsByAssignmentAndRegistry(
+                assignment=assignment, registry=registry
             )
+            print(f"\n {organizations}")
         case "19":
             organization = getOrgName()
             assignment = getAssignment()
             registry = getRegistry()
-            print(
-                f"\n {database.getOrganizationsByOrganizationAssignmentAndRegistry(
-                        organization=organization,
-                        assignment=assignment,
-                        registry=registry
-                    )}"
+            organizations = (
+                database.getOrganizationsByOrganizationAssignmentAndRegistry(
+                    organization=organization, assignment=assignment, registry=registry
+                )
             )
+            print(f"\n {organizations}")
         case "q":
             exitProgram(0)
         case _:
@@ -158,13 +152,49 @@ def exitProgram(code: int) -> None:
     exit(code)
 
 
-def runAsCLI() -> None:
-    """Provides a CLI interface for the IEE OUI Database."""
+def printTimings(database: IeeOuiDb) -> None:
+    """Prints the phases and calls recorded since the last print, then forgets them"""
+    stats: dict = database.stats()
+    print("\nTimings:")
+    for name, phase in stats["phases"].items():
+        if phase["count"]:
+            print(
+                f"  {name:<40} {phase['count']:>6}x {phase['seconds'] * 1000:>12.3f} ms"
+                f"  {phase['rows']:,} rows, {phase['bytes'] / 1024:,.1f} KiB"
+            )
+    for name, call in stats["calls"].items():
+        print(
+            f"  {name:<40} {call['count']:>6}x {call['seconds'] * 1000:>12.3f} ms"
+            f"  p50 <= {call['p50']:,} us, p99 <= {call['p99']:,} us"
+        )
+    database.instrumentation.reset()
+
+
+def printMemory(database: IeeOuiDb) -> None:
+    """Prints the bytes held by every structure of the database"""
+    report: dict = database.memoryReport()
+    print("\nMemory:")
+    structures: dict[str, int] = {**report["columns"], **report["derived"]}
+    structures["lookupCache"] = report["lookupCache"]
+    for name, size in structures.items():
+        print(f"  {name:<40} {size / 1024:>14,.1f} KiB")
+    print(
+        f"  {'total':<40} {report['total'] / 1024:>14,.1f} KiB"
+        f"  ({report['mapped'] / 1024:,.1f} KiB mapped)"
+    )
+
+
+def runAsCLI(timings: bool = False) -> None:
+    """Provides a CLI interface for the IEE OUI Database.
+
+    Args:
+        timings (bool, optional): Print the time spent in every phase and call
+            after startup and after every menu command. Defaults to False.
+    """
     retrievedFromCache = False
     startTime: float = time.time()
 
-    ouiDb = IeeOuiDb()
-    dbDict: dict = ouiDb.getDb()
+    ouiDb = getSharedDb(instrument=timings)
     filename: str = ouiDb.csvFilename
 
     if filename == FAILED_TO_GET_CSV_FILE:
@@ -180,22 +210,129 @@ def runAsCLI() -> None:
 
     print(
         f"\n{'-' * 80}\n\n"
-        f"Number of Records Found: {len(dbDict)}\n"
+        f"Number of Records Found: {ouiDb.getOrganizationsMacCount()}\n"
         f"URL: {ouiDb.getDbUrl()}\n"
         f"Last Updated: {time.ctime(os.path.getmtime(filename))} "
         f"{'(Retrieved from Cache)' if retrievedFromCache else 'DB Created Successfully'}\n"
         f"Elapsed Time: {elapsedTimeInSeconds:.10f} seconds"
     )
+    if timings:
+        printTimings(database=ouiDb)
+        printMemory(database=ouiDb)
 
     try:
         while True:
             showMenu()
             choice: str = input("Enter your choice: ")
             handleMenuChoice(choice=choice, database=ouiDb)
+            if timings:
+                printTimings(database=ouiDb)
             input("\nPress Enter to continue...")
             print("-" * 80)
     except KeyboardInterrupt:
         exitProgram(0)
     except Exception:
+        import traceback
+
         print(f"An error occurred: {traceback.format_exc()}")
         exitProgram(1)
+
+
+def parseArguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parses the command line, no command runs the interactive menu"""
+    parser = argparse.ArgumentParser(
+        prog="python -m NG_OUI_DB", description="The IEEE OUI database"
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the time spent in every phase and call after every command",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    serveParser = commands.add_parser("serve", help="Serve lookups over HTTP")
+    serveParser.add_argument("--host", help="Defaults to 127.0.0.1")
+    serveParser.add_argument("--port", type=int, help="Defaults to 8080")
+    serveParser.add_argument(
+        "--workers", type=int, default=1, help="The number of worker processes"
+    )
+
+    for command, help in (
+        ("lookup", "Write the organization of every MAC address read"),
+        ("isiot", "Write if every MAC address read belongs to an IoT manufacturer"),
+    ):
+        macParser = commands.add_parser(command, help=help)
+        macParser.add_argument(
+            "files", nargs="*", help="Files of one MAC address per line, - for stdin"
+        )
+        macParser.add_argument("--format", choices=FORMATS, default=CSV)
+        macParser.add_argument(
+            "--jobs", type=int, default=1, help="The number of worker processes"
+        )
+
+    searchParser = commands.add_parser(
+        "search", help="Write the organizations matching every filter"
+    )
+    searchParser.add_argument("--organization", help="Part of the organization name")
+    searchParser.add_argument("--registry", help="The name of the registry")
+    searchParser.add_argument(
+        "--iot", action="store_true", help="Only suspected IoT manufacturers"
+    )
+    searchParser.add_argument("--limit", type=int, default=None)
+    searchParser.add_argument("--format", choices=FORMATS, default=CSV)
+
+    arguments: argparse.Namespace = parser.parse_args(argv)
+    if arguments.command == "serve":
+        # http.server is only loaded to serve
+        from .server import DEFAULT_HOST, DEFAULT_PORT
+
+        if arguments.host is None:
+            arguments.host = DEFAULT_HOST
+        if arguments.port is None:
+            arguments.port = DEFAULT_PORT
+    return arguments
+
+
+def runStreaming(arguments: argparse.Namespace) -> None:
+    """Runs the lookup, isiot or search command, writing the results to stdout"""
+    try:
+        if arguments.command == "search":
+            streamSearch(
+                sys.stdout,
+                organization=arguments.organization,
+                registry=arguments.registry,
+                iot=arguments.iot,
+                limit=arguments.limit,
+                format=arguments.format,
+            )
+        else:
+            streamMacs(
+                arguments.command,
+                readMacs(arguments.files),
+                sys.stdout,
+                format=arguments.format,
+                jobs=arguments.jobs,
+            )
+        sys.stdout.flush()
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        exit(2)
+    except BrokenPipeError:
+        # the reader of the results went away, such as head, stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        exit(1)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Runs the command given on the command line, see parseArguments()"""
+    arguments: argparse.Namespace = parseArguments(argv)
+    match arguments.command:
+        case "serve":
+            from .server import serve
+
+            print(f"Serving on http://{arguments.host}:{arguments.port}")
+            serve(host=arguments.host, port=arguments.port, workers=arguments.workers)
+        case "lookup" | "isiot" | "search":
+            runStreaming(arguments)
+        case _:
+            runAsCLI(timings=arguments.timings)
@@ -0,0 +1,124 @@
+"""
+Description: Conditional, streamed downloads of the IEEE registry files.
+
+The ETag and Last-Modified headers of every download are kept next to the file
+in a small JSON metadata file, and sent back as If-None-Match and
+If-Modified-Since on the next download, so an unchanged file costs a 304 with
+no body. Compression is negotiated with the server and the body is decoded and
+streamed to a temporary file in chunks, which is then moved over the previous
+file in one atomic rename. A failed or interrupted download leaves the previous
+file untouched. Every chunk saved can also be handed to a callback, such as a
+CsvIngest parsing the file while it downloads (see ingest.py).
+
+requests is imported on the first download, so processes answering from the
+files already on the filesystem never load the network stack.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import os
+import json
+from typing import TYPE_CHECKING, Callable
+
+from .utils import atomicFile
+
+if TYPE_CHECKING:
+    import requests
+
+DOWNLOADED = "Downloaded"
+NOT_MODIFIED = "Not Modified"
+FAILED = "Failed to download"
+
+# seconds to wait for the connection and between two chunks of the body
+TIMEOUT: tuple[float, float] = (10, 60)
+
+_CHUNK_SIZE = 1 << 16
+
+
+def metadataFileName(fileName: str) -> str:
+    """Returns the path of the metadata file kept next to a downloaded file"""
+    return f"{fileName}.meta"
+
+
+def _readMetadata(url: str, fileName: str) -> dict[str, str]:
+    """Returns the validators saved for a file, if it was downloaded from the url"""
+    if not os.path.exists(fileName):
+        return {}
+    try:
+        with open(metadataFileName(fileName), "r", encoding="utf-8") as file:
+            metadata = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(metadata, dict) or metadata.get("url") != url:
+        return {}
+    return metadata
+
+
+def _writeMetadata(url: str, fileName: str, response: "requests.Response") -> None:
+    metadata: dict[str, str] = {"url": url}
+    if "ETag" in response.headers:
+        metadata["etag"] = response.headers["ETag"]
+    if "Last-Modified" in response.headers:
+        metadata["lastModified"] = response.headers["Last-Modified"]
+    with open(metadataFileName(fileName), "w", encoding="utf-8") as file:
+        json.dump(metadata, file)
+
+
+def downloadFile(
+    url: str,
+    fileName: str,
+    timeout: tuple[float, float] = TIMEOUT,
+    onChunk: Callable[[bytes], None] | None = None,
+) -> str:
+    """Downloads a file unless the copy on the filesystem is still current
+
+    Args:
+        url (str): The URL of the file
+        fileName (str): The path to save the file to
+        timeout (tuple[float, float], optional): The connect and read timeouts in
+            seconds. Defaults to TIMEOUT.
+        onChunk (Callable[[bytes], None] | None, optional): Called with every
+            chunk of the decoded body once it is written to the file. Defaults
+            to None.
+
+    Returns:
+        str: DOWNLOADED if the file was saved, NOT_MODIFIED if the server reported
+        the saved file is current, or FAILED if it could not be downloaded
+
+    Note:
+        A NOT_MODIFIED file has its modification time updated, so its age counts
+        from the last time it was confirmed current. The chunks passed to
+        onChunk make up the whole body only if DOWNLOADED is returned.
+    """
+    import requests
+
+    headers: dict[str, str] = {
+        "User-Agent": "Mozilla/5.0",
+        "Accept-Encoding": "gzip, deflate",
+    }
+    metadata: dict[str, str] = _readMetadata(url, fileName)
+    if "etag" in metadata:
+        headers["If-None-Match"] = metadata["etag"]
+    if "lastModified" in metadata:
+        headers["If-Modified-Since"] = metadata["lastModified"]
+
+    try:
+        with requests.get(
+            url, headers=headers, stream=True, timeout=timeout
+        ) as response:
+            if response.status_code == 304 and metadata:
+                os.utime(fileName)
+                return NOT_MODIFIED
+            if response.status_code != 200:
+                return FAILED
+
+            # the body is decoded as it is read, according to its Content-Encoding
+            with atomicFile(fileName) as file:
+                for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                    file.write(chunk)
+                    if onChunk is not None:
+                        onChunk(chunk)
+            _writeMetadata(url, fileName, response)
+            return DOWNLOADED
+    except (requests.RequestException, OSError):
+        return FAILED
@@ -1,99 +1,52 @@
 import os
-import json
-import pickle
+from typing import Iterable
 
-from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB import ORGANIZATION_NAME, IeeOuiDb, getSharedDb
+from .query import ByIoT
+from .iotClassifier import IOT_KEYWORDS
+from .keywordMatcher import KeywordMatcher
 
 IOT_MAN_JSON_FILE = os.path.expanduser("~/NG_OUI_DB/iot_manufacturers.json")
 IOT_MAN_PICKLE_FILE = IOT_MAN_JSON_FILE.replace(".json", ".pkl")
-IOT_KEYWORDS = [
-    "smart",
-    "iot",
-    "esp",
-    "tuya",
-    "nest",
-    "broadlink",
-    "sonoff",
-    "hue",
-    "wyze",
-    "arlo",
-    "ecobee",
-    "eufy",
-    "philips",
-    "ikea",
-    "fitbit",
-    "xiaomi",
-    "withings",
-    "samsung",
-    "lg",
-    "sony",
-    "media",
-    "netgear",
-    "tp-link",
-    "ubiquiti",
-    "honeywell",
-    "ring",
-    "bose",
-    "logitech",
-    "belkin",
-    "alexa",
-    "google home",
-    "homekit",
-    "lifx",
-    "govee",
-    "wyze cam",
-    "lutron",
-    "eero",
-    "orbi",
-    "linksys",
-    "garmin",
-    "whoop",
-    "polar",
-    "schlage",
-    "august",
-    "kwikset",
-    "zigbee",
-    "z-wave",
-    "tado",
-    "bosch",
-    "sensor",
-    "automation",
-    "hub",
-    "gateway",
-    "tracker",
-]
 
 
-def getIotManufacturers(fromDatabase: IeeOuiDb | None = None) -> set[str]:
+def getIotManufacturers(
+    fromDatabase: IeeOuiDb | None = None, keywords: Iterable[str] | None = None
+) -> set[str]:
     """Get suspected IOT Manufacturers from the IEE OUI DB
 
     Args:
-        fromDatabase (IeeOuiDb | None, optional): Initialized DB. Defaults to None.
+        fromDatabase (IeeOuiDb | None, optional): Initialized DB. Defaults to None,
+            using the database shared by the process.
+        keywords (Iterable[str] | None, optional): The keywords of IoT manufacturers.
+            Defaults to None, using the iotKeywords of the database.
 
     Returns:
          set[str]: The unique set of IOT Manufacturers
 
     Note:
-        The IOT Manufacturers are determined by the IOT_KEYWORDS list.
-        If the organization name contains any of the IOT_KEYWORDS,
-        it is added to the set of IOT Manufacturers.
+        The IOT Manufacturers are determined by the keywords, IOT_KEYWORDS unless
+        the database was given others. If the organization name contains any of
+        the keywords, ignoring case, it is added to the set of IOT Manufacturers.
+        Every name is matched against all the keywords in a single pass.
 
         The IOT Manufacturers are persisted to a JSON file and a pickle file
         for easy loading. The files are saved in the user's home directory in
         a folder called NG_OUI_DB.
     """
-    iotManufacturers = set()
-    ieeOuiDb: IeeOuiDb = IeeOuiDb() if fromDatabase is None else fromDatabase
-
-    # loop over all the IEE OUI DB entries, if the organization name contains
-    # any of the IOT_KEYWORDS, add it to the set of IOT Manufacturers
-    for mac in ieeOuiDb.dbDict:
-        organization = ieeOuiDb.dbDict[mac]["Organization Name"]
-
-        for keyword in IOT_KEYWORDS:
-            if keyword in organization.lower():
-                iotManufacturers.add(organization)
-                break
+    import json
+    import pickle
+
+    ieeOuiDb: IeeOuiDb = getSharedDb() if fromDatabase is None else fromDatabase
+
+    if keywords is None:
+        # the database classifies its organizations once per set of keywords
+        iotManufacturers = {
+            record[ORGANIZATION_NAME] for record in ieeOuiDb.query(ByIoT())
+        }
+    else:
+        matcher: KeywordMatcher = KeywordMatcher(keywords)
+        iotManufacturers = set(filter(matcher.matches, ieeOuiDb.getOrganizations()))
 
     # persist the IOT Manufacturers to a JSON file
     with open(IOT_MAN_JSON_FILE, "w") as f:
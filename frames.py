@@ -0,0 +1,86 @@
+"""
+Description: Vendor lookups straight from the bytes of Ethernet frames.
+
+The destination and source MAC addresses of an Ethernet frame are its first 12
+octets. They are read from the frame's buffer, such as a memoryview of a
+capture, directly into the integer keys of the database, so no string is
+formatted or parsed for either of them.
+
+    vendors = annotateFrame(frame, fromDatabase=db)
+    vendors.source["Organization Name"]
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+from typing import TYPE_CHECKING, Iterable, Iterator, Literal, NamedTuple
+
+from NG_OUI_DB import IeeOuiDb, getSharedDb
+from .store import OuiRecord
+
+if TYPE_CHECKING:
+    # collections.abc.Buffer is only there from Python 3.12
+    from collections.abc import Buffer
+
+# the offsets of the MAC addresses in an Ethernet frame
+DESTINATION_OFFSET = 0
+SOURCE_OFFSET = 6
+
+
+class FrameVendors(NamedTuple):
+    """The organizations of the MAC addresses of a frame
+
+    Attributes:
+    - source (OuiRecord | Literal["Unknown"]): The organization of the source
+    - destination (OuiRecord | Literal["Unknown"]): The organization of the
+        destination, "Unknown" for broadcast and most multicast addresses
+    """
+
+    source: OuiRecord | Literal["Unknown"]
+    destination: OuiRecord | Literal["Unknown"]
+
+
+def annotateFrame(
+    frame: "Buffer", offset: int = 0, fromDatabase: IeeOuiDb | None = None
+) -> FrameVendors:
+    """Look up the organizations of the source and destination of an Ethernet frame
+
+    Args:
+        frame (Buffer): The frame, or a buffer holding it such as a capture
+        offset (int, optional): The offset of the frame in the buffer. Defaults to 0.
+        fromDatabase (IeeOuiDb | None, optional): Initialized DB. Defaults to None,
+            using the database shared by the process.
+
+    Returns:
+        FrameVendors: The organizations of the source and destination MAC addresses
+
+    Raises:
+        struct.error: If the buffer holds fewer than 12 octets from the offset
+    """
+    fromDatabase = getSharedDb() if fromDatabase is None else fromDatabase
+    lookup = fromDatabase.getOrganizationFromBuffer
+    return FrameVendors(
+        source=lookup(frame, offset + SOURCE_OFFSET),
+        destination=lookup(frame, offset + DESTINATION_OFFSET),
+    )
+
+
+def annotateFrames(
+    frames: Iterable["Buffer"], fromDatabase: IeeOuiDb | None = None
+) -> Iterator[FrameVendors]:
+    """Look up the organizations of the source and destination of many frames
+
+    Args:
+        frames (Iterable[Buffer]): The frames, each one starting at offset 0
+        fromDatabase (IeeOuiDb | None, optional): Initialized DB. Defaults to None,
+            using the database shared by the process.
+
+    Yields:
+        FrameVendors: The organizations of the MAC addresses of each frame
+    """
+    fromDatabase = getSharedDb() if fromDatabase is None else fromDatabase
+    lookup = fromDatabase.getOrganizationFromBuffer
+    for frame in frames:
+        yield FrameVendors(
+            source=lookup(frame, SOURCE_OFFSET),
+            destination=lookup(frame, DESTINATION_OFFSET),
+        )
@@ -0,0 +1,250 @@
+"""
+Description: Parses the CSV files of the registries while they are downloaded.
+
+A refresh used to save every CSV file to the filesystem before reading any of
+them back, so it took the time of the downloads plus the time of the parse. A
+CsvIngest is handed every chunk of a body as downloadFile() saves it, and a
+parser thread reads the chunks into an OuiStoreBuilder as they arrive, so a
+refresh takes about the longer of the two. The bytes are still saved to the CSV
+file, for the next process to start from.
+
+At most MAX_CHUNKS chunks wait between the download and the parser. A download
+faster than the parse blocks until the parser catches up, so the memory held in
+between stays the same whatever the size of the files.
+
+The rows of the registries are added in the order of the registries, whether
+a body is streamed or a file is read from the filesystem, as it is when the
+server reports the file has not changed. The rows of a body that is not
+complete, a download failing midway, cannot be taken back: finish() then
+returns None and the caller reads the files on the filesystem instead.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import io
+import os
+import queue
+import threading
+from typing import Any, TextIO
+
+from .store import OuiStoreBuilder
+
+# the chunks of a body waiting for the parser, each of up to 64 KiB
+MAX_CHUNKS = 16
+
+# the markers passed to the parser thread along with the chunks
+_BODY = object()
+_END = object()
+_ABORT = object()
+_STOP = object()
+
+
+def readCsv(file: TextIO, builder: OuiStoreBuilder) -> int:
+    """Adds the rows of the CSV file of a registry to a builder
+
+    Args:
+        file (TextIO): The CSV file, open for reading, its first line the header
+        builder (OuiStoreBuilder): The builder the rows are added to
+
+    Returns:
+        int: The number of rows read
+    """
+    import csv
+
+    reader = csv.reader(file, quotechar='"', delimiter=",")
+    next(reader, None)
+    count: int = 0
+    for line in reader:
+        builder.add(
+            registry=line[0].strip(),
+            assignment=line[1].strip().replace("-", ""),
+            organizationName=line[2].strip(),
+            organizationAddress=line[3].strip(),
+        )
+        count += 1
+    return count
+
+
+class CsvIngest:
+    """Reads CSV files into an OuiStoreBuilder while they are downloaded
+
+    Attributes:
+    - builder (OuiStoreBuilder): The builder every row is added to
+    - bytes (int): The bytes of the bodies and files parsed so far
+
+    Methods:
+    - write(chunk: bytes): Parses a chunk of the body being downloaded
+    - complete(): Marks the body written so far as complete
+    - end(fileName: str | None): Ends the file of a registry
+    - finish(): Waits for the parser and returns the builder
+    - close(): Stops the parser thread, abandoning what it did not parse
+    """
+
+    def __init__(self, maxChunks: int = MAX_CHUNKS) -> None:
+        """Creates an ingest, the parser thread starts with the first chunk
+
+        Args:
+            maxChunks (int, optional): The most chunks waiting for the parser.
+                Defaults to MAX_CHUNKS.
+        """
+        self.builder: OuiStoreBuilder = OuiStoreBuilder()
+        self.bytes: int = 0
+        self._queue: queue.Queue = queue.Queue(maxChunks)
+        self._thread: threading.Thread | None = None
+        # the files read once the parser thread starts, or by finish()
+        self._pending: list[str] = []
+        self._written: bool = False
+        self._complete: bool = False
+        self._broken: bool = False
+        self._error: BaseException | None = None
+
+    def write(self, chunk: bytes) -> None:
+        """Parses a chunk of the body being downloaded, in the order written
+
+        Args:
+            chunk (bytes): The next bytes of the body, decoded from the
+                Content-Encoding
+
+        Note:
+            Blocks while MAX_CHUNKS chunks are waiting for the parser.
+        """
+        if not self._written:
+            self._written = True
+            self._start()
+            self._queue.put(_BODY)
+        if chunk:
+            self._queue.put(bytes(chunk))
+
+    def complete(self) -> None:
+        """Marks the body written so far as complete, see downloadFile()"""
+        if self._written and not self._complete:
+            self._complete = True
+            self._queue.put(_END)
+
+    def end(self, fileName: str | None) -> None:
+        """Ends the file of a registry
+
+        Args:
+            fileName (str | None): The CSV file of the registry, read from the
+                filesystem unless its body was written and completed, or None
+                if the registry has no file
+        """
+        if self._written and not self._complete:
+            # the download failed midway and its rows cannot be taken back
+            self._broken = True
+            self._queue.put(_ABORT)
+        elif not self._written and fileName is not None:
+            if self._thread is None:
+                self._pending.append(fileName)
+            else:
+                self._queue.put(fileName)
+        self._written = self._complete = False
+
+    def finish(self) -> OuiStoreBuilder | None:
+        """Waits for the parser to read every body and file
+
+        Returns:
+            OuiStoreBuilder | None: The builder holding the rows of every
+            registry, or None if a body was not complete
+
+        Raises:
+            ValueError: If a row could not be added, see OuiStoreBuilder.add()
+            UnicodeDecodeError: If a file is not valid UTF-8
+        """
+        self.end(None)
+        if self._thread is None:
+            # nothing was downloaded, the files are read on this thread
+            for fileName in self._pending:
+                self._readFile(fileName)
+            self._pending.clear()
+        else:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        if self._broken:
+            return None
+        if self._error is not None:
+            raise self._error
+        return self.builder
+
+    def close(self) -> None:
+        """Stops the parser thread, abandoning the rows it did not parse"""
+        if self._thread is not None:
+            self._broken = True
+            self._queue.put(_ABORT)
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _start(self) -> None:
+        """Starts the parser thread, handing it the files ended so far"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._parse, name="CsvIngest", daemon=True
+        )
+        self._thread.start()
+        for fileName in self._pending:
+            self._queue.put(fileName)
+        self._pending.clear()
+
+    def _parse(self) -> None:
+        """Parses the bodies and files of the queue until it is stopped
+
+        Note:
+            After an error every item is still taken off the queue, so a
+            download never blocks on a parser that gave up.
+        """
+        while (item := self._queue.get()) is not _STOP:
+            if self._error is not None or isinstance(item, bytes):
+                continue
+            reader: _QueueReader | None = None
+            try:
+                if item is _BODY:
+                    reader = _QueueReader(self._queue)
+                    with io.TextIOWrapper(
+                        io.BufferedReader(reader), encoding="utf-8"
+                    ) as file:
+                        readCsv(file, self.builder)
+                    self.bytes += reader.bytes
+                elif isinstance(item, str):
+                    self._readFile(item)
+            except Exception as error:
+                self._error = error
+            # the body was cut short by close() or finish()
+            if reader is not None and reader.marker is _STOP:
+                return
+
+    def _readFile(self, fileName: str) -> None:
+        # the same decoding and newlines as the bodies read by _parse()
+        with open(fileName, "r", encoding="utf-8") as file:
+            readCsv(file, self.builder)
+            self.bytes += os.fstat(file.fileno()).st_size
+
+
+class _QueueReader(io.RawIOBase):
+    """Reads the chunks of a body off the queue, up to the marker ending it"""
+
+    def __init__(self, chunks: queue.Queue) -> None:
+        self._chunks: queue.Queue = chunks
+        self._chunk: memoryview = memoryview(b"")
+        self.bytes: int = 0
+        self.marker: Any = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._chunk:
+            if self.marker is not None:
+                return 0
+            item: Any = self._chunks.get()
+            if not isinstance(item, bytes):
+                self.marker = item
+                return 0
+            self._chunk = memoryview(item)
+            self.bytes += len(item)
+        size: int = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
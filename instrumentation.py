@@ -0,0 +1,373 @@
+"""
+Description: Timers, counters and memory accounting of a database.
+
+An Instrumentation records two kinds of events:
+
+- phases of getting the database into memory: "fetch" (downloading a CSV
+  file), "parse" (reading the CSV files into a store), "persist" (writing an
+  artifact) and "load" (mapping a snapshot), with the seconds spent and the rows
+  and bytes handled
+- calls of the lookup and search methods, counted into latency histograms
+  with power of two buckets, so recording a call never allocates
+
+Tracers, any function taking a TraceEvent, are called with every event as it
+is recorded, on the thread that recorded it.
+
+memoryReport() breaks down the bytes held by a store: its columns, its lookup
+index and every structure derived from it, such as the search index.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator, NamedTuple
+
+from .store import OuiStore
+
+FETCH = "fetch"
+PARSE = "parse"
+PERSIST = "persist"
+LOAD = "load"
+PHASES: tuple[str, ...] = (FETCH, PARSE, PERSIST, LOAD)
+
+# the kinds of trace events
+PHASE = "phase"
+CALL = "call"
+
+# latencies from 1 microsecond up to about 35 minutes, one bucket per power of 2
+_BUCKETS = 32
+
+
+class TraceEvent(NamedTuple):
+    """A phase or call recorded by an Instrumentation
+
+    Attributes:
+    - kind (str): PHASE or CALL
+    - name (str): The name of the phase, such as PARSE, or of the method called
+    - seconds (float): The time spent
+    - rows (int): The rows handled by a phase, 0 for calls
+    - bytes (int): The bytes read or written by a phase, 0 for calls
+    """
+
+    kind: str
+    name: str
+    seconds: float
+    rows: int = 0
+    bytes: int = 0
+
+
+Tracer = Callable[[TraceEvent], None]
+
+
+class PhaseCounter:
+    """The rows and bytes a phase handled, set by the code it times"""
+
+    __slots__ = ("rows", "bytes")
+
+    def __init__(self) -> None:
+        self.rows: int = 0
+        self.bytes: int = 0
+
+
+class LatencyHistogram:
+    """Counts latencies into power of two microsecond buckets
+
+    Bucket i counts the latencies under 2**i microseconds and at least half of
+    that, so percentiles are upper bounds within a factor of 2.
+
+    Methods:
+    - add(seconds: float): Counts a latency
+    - percentile(percent: float): Returns the upper bound of a percentile
+    - toDict(): Returns the count, the total, the percentiles and the buckets
+    """
+
+    __slots__ = ("count", "seconds", "maxSeconds", "_buckets")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.seconds: float = 0.0
+        self.maxSeconds: float = 0.0
+        self._buckets: list[int] = [0] * _BUCKETS
+
+    def add(self, seconds: float) -> None:
+        """Counts a latency in seconds"""
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.maxSeconds:
+            self.maxSeconds = seconds
+        self._buckets[min(int(seconds * 1e6).bit_length(), _BUCKETS - 1)] += 1
+
+    def percentile(self, percent: float) -> int:
+        """Returns the upper bound of a percentile in microseconds
+
+        Args:
+            percent (float): The percentile, from 0 to 100
+
+        Returns:
+            int: The upper bound of the bucket holding the percentile, 0 if no
+            latency was counted
+        """
+        if not self.count:
+            return 0
+        rank: float = self.count * percent / 100
+        seen: int = 0
+        for bucket, count in enumerate(self._buckets):
+            seen += count
+            if seen >= rank and count:
+                return 1 << bucket
+        return 1 << (_BUCKETS - 1)
+
+    def toDict(self) -> dict[str, Any]:
+        """Returns the histogram as a dictionary
+
+        Returns:
+            dict[str, Any]: The count, the total "seconds", the "mean" and "max"
+            in microseconds, the upper bounds of the "p50", "p95" and "p99" in
+            microseconds, and the non-empty "buckets" keyed by their upper bound
+            in microseconds
+        """
+        return {
+            "count": self.count,
+            "seconds": self.seconds,
+            "mean": self.seconds / self.count * 1e6 if self.count else 0.0,
+            "max": self.maxSeconds * 1e6,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": {
+                1 << bucket: count
+                for bucket, count in enumerate(self._buckets)
+                if count
+            },
+        }
+
+
+class Instrumentation:
+    """Records the phases and calls of a database and passes them to tracers
+
+    Methods:
+    - phase(name: str): Times a phase, a context manager yielding its PhaseCounter
+    - timed(name: str, function: Callable): Returns a function recording its calls
+    - record(event: TraceEvent): Records a phase or call
+    - addTracer(tracer: Tracer): Calls a function with every event recorded
+    - removeTracer(tracer: Tracer): Stops calling a function with the events
+    - stats(): Returns the totals of every phase and the histogram of every call
+    - reset(): Forgets every phase and call recorded so far
+    """
+
+    def __init__(self) -> None:
+        self._phases: dict[str, list] = {}
+        self._calls: dict[str, LatencyHistogram] = {}
+        self._tracers: list[Tracer] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._local: threading.local = threading.local()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseCounter]:
+        """Times a phase, its rows and bytes are set on the counter it yields
+
+        Args:
+            name (str): FETCH, PARSE, PERSIST or LOAD
+
+        Yields:
+            PhaseCounter: The counter of the rows and bytes the phase handled
+
+        Note:
+            A phase that raises is not recorded, such as the load of a snapshot
+            that could not be opened, so the counts are of the phases that did
+            their work.
+        """
+        counter: PhaseCounter = PhaseCounter()
+        start: float = time.perf_counter()
+        yield counter
+        self.record(
+            TraceEvent(
+                PHASE,
+                name,
+                time.perf_counter() - start,
+                counter.rows,
+                counter.bytes,
+            )
+        )
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """Returns a function recording every call of another
+
+        Args:
+            name (str): The name the calls are recorded under
+            function (Callable): The function to time
+
+        Returns:
+            Callable: The function recording its calls
+
+        Note:
+            Calls made while another timed call of the same thread is running,
+            such as the query() behind getOrganizationsByOrganization(), are
+            part of the outer call and not recorded on their own.
+        """
+        local: threading.local = self._local
+
+        @wraps(function)
+        def timedFunction(*args, **kwargs):
+            if getattr(local, "active", False):
+                return function(*args, **kwargs)
+            local.active = True
+            start: float = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                local.active = False
+                self.record(TraceEvent(CALL, name, time.perf_counter() - start))
+
+        return timedFunction
+
+    def record(self, event: TraceEvent) -> None:
+        """Records a phase or call and passes it to the tracers
+
+        Args:
+            event (TraceEvent): The event to record
+        """
+        with self._lock:
+            if event.kind == CALL:
+                histogram: LatencyHistogram | None = self._calls.get(event.name)
+                if histogram is None:
+                    histogram = self._calls[event.name] = LatencyHistogram()
+                histogram.add(event.seconds)
+            else:
+                totals: list = self._phases.setdefault(event.name, [0, 0.0, 0, 0])
+                totals[0] += 1
+                totals[1] += event.seconds
+                totals[2] += event.rows
+                totals[3] += event.bytes
+        for tracer in tuple(self._tracers):
+            tracer(event)
+
+    def addTracer(self, tracer: Tracer) -> None:
+        """Calls a function with every event recorded, see TraceEvent"""
+        self._tracers.append(tracer)
+
+    def removeTracer(self, tracer: Tracer) -> None:
+        """Stops calling a function with the events, see addTracer()"""
+        if tracer in self._tracers:
+            self._tracers.remove(tracer)
+
+    def stats(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Returns the totals of every phase and the histogram of every call
+
+        Returns:
+            dict[str, dict[str, dict[str, Any]]]: The "phases", every one of
+            PHASES with its "count", "seconds", "rows" and "bytes", and the
+            "calls", the histogram of every method called keyed by its name,
+            see LatencyHistogram.toDict()
+        """
+        with self._lock:
+            phases: dict[str, dict[str, Any]] = {}
+            for name in PHASES + tuple(n for n in self._phases if n not in PHASES):
+                count, seconds, rows, size = self._phases.get(name, (0, 0.0, 0, 0))
+                phases[name] = {
+                    "count": count,
+                    "seconds": seconds,
+                    "rows": rows,
+                    "bytes": size,
+                }
+            calls: dict[str, dict[str, Any]] = {
+                name: histogram.toDict() for name, histogram in self._calls.items()
+            }
+        return {"phases": phases, "calls": calls}
+
+    def reset(self) -> None:
+        """Forgets every phase and call recorded so far"""
+        with self._lock:
+            self._phases.clear()
+            self._calls.clear()
+
+
+def memoryReport(store: OuiStore) -> dict[str, Any]:
+    """Returns the bytes held by a store and the structures derived from it
+
+    Args:
+        store (OuiStore): The store
+
+    Returns:
+        dict[str, Any]: The number of "rows", the bytes of every "columns" of
+        the store and of its lookup index, the bytes of every "derived"
+        structure keyed by its name, the "total" bytes allocated and the
+        "mapped" bytes, the columns of a snapshot that are memoryviews over the
+        mapped file rather than allocations
+
+    Note:
+        The sizes are estimated from sys.getsizeof of every object reachable
+        from a structure, each object counted once, in the first structure that
+        holds it. Mapped columns are shared with every process mapping the same
+        snapshot and are counted as "mapped", not in the total.
+    """
+    seen: set[int] = {id(store)}
+    mapped: list[int] = [0]
+    columns: dict[str, int] = {
+        "keys": _sizeOf(store.keys(), seen, mapped),
+        "registries": _sizeOf(store.registryCodes(), seen, mapped),
+        "names": _sizeOf(store.nameIds(), seen, mapped),
+        "nameTable": _sizeOf(store.nameTable(), seen, mapped),
+        "addresses": _sizeOf(store.addressHeap(), seen, mapped),
+        "hashes": _sizeOf(store.hashes(), seen, mapped),
+        "prefixIndex": _sizeOf(store.prefixIndex(), seen, mapped),
+    }
+
+    # keyed structures, such as the IoT flags of several keyword sets, add up
+    derived: dict[str, int] = {}
+    for name, value in list(store._derived.items()):
+        label: str = str(name[0] if isinstance(name, tuple) else name)
+        derived[label] = derived.get(label, 0) + _sizeOf(value, seen, mapped)
+
+    return {
+        "rows": len(store),
+        "columns": columns,
+        "derived": derived,
+        "total": sum(columns.values()) + sum(derived.values()),
+        "mapped": mapped[0],
+    }
+
+
+def sizeOf(value: Any) -> int:
+    """Returns the bytes allocated by an object and every object it references"""
+    return _sizeOf(value, set(), [0])
+
+
+def _sizeOf(value: Any, seen: set[int], mapped: list[int]) -> int:
+    """Returns the bytes of the objects reachable from a value not yet seen"""
+    if id(value) in seen or isinstance(value, type):
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, memoryview):
+        # mapped pages are not allocated by the process
+        mapped[0] += value.nbytes
+        return sys.getsizeof(value)
+
+    size: int = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, bytearray, int, float)):
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += _sizeOf(key, seen, mapped) + _sizeOf(item, seen, mapped)
+        return size
+    if isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += _sizeOf(item, seen, mapped)
+        return size
+    # numpy arrays of objects reference their items, others hold their data
+    if getattr(value, "dtype", None) is not None and value.dtype.hasobject:
+        for item in value.ravel():
+            size += _sizeOf(item, seen, mapped)
+        return size
+
+    for slot in getattr(type(value), "__slots__", ()):
+        if hasattr(value, slot):
+            size += _sizeOf(getattr(value, slot), seen, mapped)
+    if hasattr(value, "__dict__"):
+        size += _sizeOf(vars(value), seen, mapped)
+    return size
@@ -0,0 +1,169 @@
+"""
+Description: Classifies the blocks of an OuiStore as suspected IoT manufacturers.
+
+A block is flagged when its organization name contains one of the IoT keywords,
+ignoring case. Names are classified once per distinct name, in one pass of a
+KeywordMatcher automaton whatever the number of keywords, and the result is
+spread into a table of one flag per row, so classifying a MAC address is a
+single lookup. The table is built once per store and set of keywords, and the
+table of the default keywords is written into the snapshot along with them.
+
+Extending the keywords only classifies the names that no previous keyword
+matched, against the new keywords.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+from .store import OuiStore
+from .keywordMatcher import KeywordMatcher
+
+IOT_KEYWORDS = [
+    "smart",
+    "iot",
+    "esp",
+    "tuya",
+    "nest",
+    "broadlink",
+    "sonoff",
+    "hue",
+    "wyze",
+    "arlo",
+    "ecobee",
+    "eufy",
+    "philips",
+    "ikea",
+    "fitbit",
+    "xiaomi",
+    "withings",
+    "samsung",
+    "lg",
+    "sony",
+    "media",
+    "netgear",
+    "tp-link",
+    "ubiquiti",
+    "honeywell",
+    "ring",
+    "bose",
+    "logitech",
+    "belkin",
+    "alexa",
+    "google home",
+    "homekit",
+    "lifx",
+    "govee",
+    "wyze cam",
+    "lutron",
+    "eero",
+    "orbi",
+    "linksys",
+    "garmin",
+    "whoop",
+    "polar",
+    "schlage",
+    "august",
+    "kwikset",
+    "zigbee",
+    "z-wave",
+    "tado",
+    "bosch",
+    "sensor",
+    "automation",
+    "hub",
+    "gateway",
+    "tracker",
+]
+
+
+def normalizeKeywords(keywords: Iterable[str]) -> tuple[str, ...]:
+    """Returns the distinct lowercased keywords, in order"""
+    return _normalizeKeywords(tuple(keywords))
+
+
+@lru_cache(maxsize=64)
+def _normalizeKeywords(keywords: tuple[str, ...]) -> tuple[str, ...]:
+    # cached, as the same keywords are normalized on every IoT lookup
+    return tuple(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+
+
+def classifyNames(names: Iterable[str], keywords: Iterable[str]) -> bytearray:
+    """Flags the names containing any of the keywords, ignoring case
+
+    Args:
+        names (Iterable[str]): The organization names to classify
+        keywords (Iterable[str]): The keywords to look for
+
+    Returns:
+        bytearray: 1 for every name containing a keyword, 0 otherwise
+    """
+    matcher: KeywordMatcher = KeywordMatcher(keywords)
+    if not matcher:
+        return bytearray(len(list(names)))
+    return bytearray(map(matcher.matches, names))
+
+
+def iotFlags(
+    store: OuiStore, keywords: Iterable[str] = IOT_KEYWORDS
+) -> bytearray | memoryview:
+    """Returns the IoT flag of every row of a store
+
+    Args:
+        store (OuiStore): The store to classify
+        keywords (Iterable[str], optional): The keywords of IoT manufacturers.
+            Defaults to IOT_KEYWORDS.
+
+    Returns:
+        bytearray | memoryview: 1 for every row of a suspected IoT manufacturer, 0
+        otherwise, built once per store and set of keywords
+    """
+    keywords = normalizeKeywords(keywords)
+    return store.derived(("iotFlags", keywords), lambda s: _buildFlags(s, keywords))
+
+
+def _buildFlags(store: OuiStore, keywords: Sequence[str]) -> bytearray:
+    nameFlags: bytearray = classifyNames(store.nameTable(), keywords)
+    return bytearray(nameFlags[nameId] for nameId in store.nameIds())
+
+
+def extendIotFlags(
+    store: OuiStore, keywords: Iterable[str], extraKeywords: Iterable[str]
+) -> bytearray | memoryview:
+    """Returns the IoT flags of a store for more keywords, from those of fewer
+
+    Args:
+        store (OuiStore): The store to classify
+        keywords (Iterable[str]): The keywords the store is classified with
+        extraKeywords (Iterable[str]): The keywords to add
+
+    Returns:
+        bytearray | memoryview: The IoT flags of the store for the keywords and the
+        extra keywords, cached as iotFlags(store, keywords + extraKeywords) is
+
+    Note:
+        Only the names no keyword matched are classified, and only against the
+        extra keywords.
+    """
+    keywords = normalizeKeywords(keywords)
+    extended: tuple[str, ...] = normalizeKeywords((*keywords, *extraKeywords))
+    if extended == keywords:
+        return iotFlags(store, keywords)
+
+    def build(store: OuiStore) -> bytearray:
+        flags: bytearray | memoryview = iotFlags(store, keywords)
+        nameIds: Sequence[int] = store.nameIds()
+        names: Sequence[str] = store.nameTable()
+        nameFlags: bytearray = bytearray(len(names))
+        for row, flag in enumerate(flags):
+            if flag:
+                nameFlags[nameIds[row]] = 1
+
+        matcher: KeywordMatcher = KeywordMatcher(extended[len(keywords) :])
+        for nameId, name in enumerate(names):
+            if not nameFlags[nameId] and matcher.matches(name):
+                nameFlags[nameId] = 1
+        return bytearray(nameFlags[nameId] for nameId in nameIds)
+
+    return store.derived(("iotFlags", extended), build)
@@ -1,32 +1,27 @@
-from NG_OUI_DB import IeeOuiDb
-from .utils import valid, MAC_ADDRESS_REGEX_PATTERN
-from .extractIotManufacturers import getIotManufacturers
+from NG_OUI_DB import IeeOuiDb, getSharedDb
+from .validators import MacAddress, normalizeMac
 
 
-def isIoT(mac: str, fromDatabase: IeeOuiDb | None = None) -> bool | None:
+def isIoT(mac: MacAddress, fromDatabase: IeeOuiDb | None = None) -> bool | None:
     """Determine if the MAC Address belongs to an IOT Manufacturer
 
     Args:
-        mac (str): The MAC Address
-        fromDatabase (IeeOuiDb | None, optional): Initialized DB. Defaults to None.
+        mac (MacAddress): The MAC Address in any of the notations of normalizeMac
+        fromDatabase (IeeOuiDb | None, optional): Initialized DB. Defaults to None,
+            using the database shared by the process.
 
     Returns:
         bool: True if the MAC Address belongs to an IOT Manufacturer, False otherwise
+
+    Note:
+        The IOT Manufacturers are classified once per database, so this is a single
+        lookup in the database's IoT flags and does not read or write any file.
     """
 
-    if not valid(withPattern=MAC_ADDRESS_REGEX_PATTERN, againstValue=mac):
+    try:
+        value: int = normalizeMac(mac)
+    except (ValueError, TypeError):
         return None
 
-    fromDatabase = IeeOuiDb() if fromDatabase is None else fromDatabase
-    IotManufacturers = getIotManufacturers(fromDatabase=fromDatabase)
-
-    organization = fromDatabase.getOrganizationName(mac=mac)
-
-    found = False
-
-    for iotManufacturer in IotManufacturers:
-        if organization.lower() in iotManufacturer.lower():
-            found = True
-            break
-
-    return found
+    fromDatabase = getSharedDb() if fromDatabase is None else fromDatabase
+    return fromDatabase.isIoT(mac=value)
@@ -0,0 +1,122 @@
+"""
+Description: A multi-keyword matcher that finds any of many keywords in one pass.
+
+The keywords are compiled into an Aho-Corasick automaton whose failure links are
+resolved ahead of time, so every state holds its next state for every character
+that can extend a match. Matching a text is one dictionary lookup per character,
+whatever the number of keywords, and stops at the first keyword found.
+
+    matcher = KeywordMatcher(["smart", "iot"])
+    matcher.search("Tuya Smart Inc.")  # "smart"
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+from collections import deque
+from typing import Iterable
+
+
+class KeywordMatcher:
+    """Finds the keywords contained in texts, ignoring case
+
+    Attributes:
+    - keywords (tuple[str, ...]): The distinct lowercased keywords, in order
+
+    Methods:
+    - search(text: str): Returns the first keyword found in a text
+    - matches(text: str): Returns if a text contains any keyword
+    - findAll(text: str): Returns every keyword found in a text
+    """
+
+    __slots__ = ("keywords", "_transitions", "_outputs", "_matched")
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords: tuple[str, ...] = tuple(
+            dict.fromkeys(keyword.lower() for keyword in keywords if keyword)
+        )
+
+        # the trie of the keywords, state 0 is the root
+        transitions: list[dict[str, int]] = [{}]
+        terminals: list[str | None] = [None]
+        for keyword in self.keywords:
+            state: int = 0
+            for character in keyword:
+                nextState: int | None = transitions[state].get(character)
+                if nextState is None:
+                    nextState = transitions[state][character] = len(transitions)
+                    transitions.append({})
+                    terminals.append(None)
+                state = nextState
+            terminals[state] = keyword
+
+        # resolve the failure links breadth first, so the transitions of a state
+        # are complete once those of its failure state are
+        failures: list[int] = [0] * len(transitions)
+        outputs: list[tuple[str, ...]] = [()] * len(transitions)
+        queue: deque[int] = deque(transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            failure: int = failures[state]
+            own: tuple[str, ...] = (terminals[state],) if terminals[state] else ()
+            outputs[state] = own + outputs[failure]
+            for character, nextState in transitions[state].items():
+                failures[nextState] = (
+                    transitions[failure].get(character, 0) if state else 0
+                )
+                queue.append(nextState)
+            # inherit the transitions of the failure state the trie does not have
+            if state:
+                for character, nextState in transitions[failure].items():
+                    transitions[state].setdefault(character, nextState)
+
+        self._transitions: list[dict[str, int]] = transitions
+        self._outputs: list[tuple[str, ...]] = outputs
+        self._matched: bytearray = bytearray(bool(output) for output in outputs)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def __repr__(self) -> str:
+        return f"KeywordMatcher({len(self.keywords)} keywords)"
+
+    def search(self, text: str) -> str | None:
+        """Returns the first keyword found in a text, ignoring case
+
+        Args:
+            text (str): The text to search
+
+        Returns:
+            str | None: The keyword ending first in the text, the longest one if
+            several end at the same character, or None if there is none
+        """
+        transitions: list[dict[str, int]] = self._transitions
+        matched: bytearray = self._matched
+        state: int = 0
+        for character in text.lower():
+            state = transitions[state].get(character, 0)
+            if matched[state]:
+                return self._outputs[state][0]
+        return None
+
+    def matches(self, text: str) -> bool:
+        """Returns if a text contains any of the keywords, ignoring case"""
+        transitions: list[dict[str, int]] = self._transitions
+        matched: bytearray = self._matched
+        state: int = 0
+        for character in text.lower():
+            state = transitions[state].get(character, 0)
+            if matched[state]:
+                return True
+        return False
+
+    def findAll(self, text: str) -> list[str]:
+        """Returns the distinct keywords found in a text, in the order they end"""
+        transitions: list[dict[str, int]] = self._transitions
+        outputs: list[tuple[str, ...]] = self._outputs
+        found: dict[str, None] = {}
+        state: int = 0
+        for character in text.lower():
+            state = transitions[state].get(character, 0)
+            for keyword in outputs[state]:
+                found[keyword] = None
+        return list(found)
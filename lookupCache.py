@@ -0,0 +1,129 @@
+"""
+Description: A bounded cache of the rows MAC address lookups resolve to.
+
+Lookups are keyed on the MAC address exactly as it was given, so a hit skips
+both the parsing and the prefix search. MAC addresses that are not assigned are
+cached too. The cache belongs to one store: once the database swaps in another
+store after a refresh, the next access finds the store changed and empties the
+cache, so a cached row never outlives the store it points into.
+
+The least recently used MAC address is evicted once the cache is full. The
+counters of hits, misses and evictions tell how well a size fits the traffic.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+from .store import OuiStore
+
+# the row cached for a MAC address that is not assigned
+NOT_FOUND = -1
+
+
+class LookupCache:
+    """A least recently used cache of the row of every MAC address looked up
+
+    Attributes:
+    - maxSize (int): The most MAC addresses kept
+    - hits (int): The lookups answered by the cache
+    - misses (int): The lookups that were not cached
+    - evictions (int): The MAC addresses dropped to make room for others
+    - invalidations (int): The times the cache was emptied for a new store
+
+    Methods:
+    - get(store: OuiStore, mac: Hashable): Returns the cached row of a MAC address
+    - put(store: OuiStore, mac: Hashable, row: int): Caches the row of a MAC address
+    - stats(): Returns the counters and the hit rate
+    - clear(): Empties the cache and resets the counters
+    """
+
+    def __init__(self, maxSize: int) -> None:
+        if maxSize < 1:
+            raise ValueError(f"The cache size must be at least 1, got {maxSize}")
+        self.maxSize: int = maxSize
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+        self._rows: OrderedDict[Hashable, int] = OrderedDict()
+        self._store: OuiStore | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __repr__(self) -> str:
+        return f"LookupCache({len(self._rows)} of {self.maxSize} MAC addresses)"
+
+    def get(self, store: OuiStore, mac: Hashable) -> int | None:
+        """Returns the cached row of a MAC address
+
+        Args:
+            store (OuiStore): The store the row must point into
+            mac (Hashable): The MAC address as it was given
+
+        Returns:
+            int | None: The row, NOT_FOUND if the MAC address is not assigned, or
+            None if it is not cached
+        """
+        with self._lock:
+            if store is not self._store:
+                self._invalidate(store)
+            row: int | None = self._rows.get(mac)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(mac)
+            self.hits += 1
+            return row
+
+    def put(self, store: OuiStore, mac: Hashable, row: int) -> None:
+        """Caches the row of a MAC address
+
+        Args:
+            store (OuiStore): The store the row points into
+            mac (Hashable): The MAC address as it was given
+            row (int): The row, or NOT_FOUND if the MAC address is not assigned
+        """
+        with self._lock:
+            if store is not self._store:
+                self._invalidate(store)
+            self._rows[mac] = row
+            if len(self._rows) > self.maxSize:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns the counters of the cache
+
+        Returns:
+            dict[str, int | float]: The size, maxSize, hits, misses, evictions and
+            invalidations, and the hitRate, the share of lookups answered by the
+            cache from 0 to 1
+        """
+        with self._lock:
+            lookups: int = self.hits + self.misses
+            return {
+                "size": len(self._rows),
+                "maxSize": self.maxSize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Empties the cache and resets the counters"""
+        with self._lock:
+            self._rows.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def _invalidate(self, store: OuiStore) -> None:
+        if self._store is not None:
+            self._rows.clear()
+            self.invalidations += 1
+        self._store = store
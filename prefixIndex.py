@@ -0,0 +1,159 @@
+"""
+Description: A longest-prefix-match index over the blocks assigned by the IEEE
+registries. MA-L and CID blocks are 24 bit prefixes, MA-M blocks are 28 bit and
+MA-S and IAB blocks are 36 bit, so a MAC address is resolved with at most one
+probe per prefix length, most specific first.
+
+Blocks are identified by a packed integer key holding the prefix length in the
+bits above 48 and the first address of the block in the lower 48 bits. Keys of
+the same prefix length sort together, so the index is a single sorted array
+that is probed with a binary search.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Sequence
+
+# the prefix lengths assigned by the IEEE registries, most specific first
+PREFIX_LENGTHS: tuple[int, ...] = (36, 28, 24)
+
+# the only characters of an assignment, int(x, 16) alone also accepts a 0x
+# prefix, underscores and whitespace
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+
+_MAC_BITS = 48
+_MAC_MASK = (1 << _MAC_BITS) - 1
+_PREFIX_MASKS: dict[int, int] = {
+    bits: _MAC_MASK ^ ((1 << (_MAC_BITS - bits)) - 1) for bits in PREFIX_LENGTHS
+}
+
+
+def packAssignment(assignment: str) -> int:
+    """Packs an assignment into the integer key of its block
+
+    Args:
+        assignment (str): The assignment in hex without delimiters, its length
+            determines the prefix length of the block
+
+    Returns:
+        int: The packed key of the block
+
+    Raises:
+        ValueError: If the assignment is not a 24, 28 or 36 bit hex prefix, in
+            hex digits only
+    """
+    bits: int = len(assignment) * 4
+    if bits not in _PREFIX_MASKS:
+        raise ValueError(f"Unsupported assignment length: {assignment}")
+    if assignment.strip(_HEX_DIGITS):
+        raise ValueError(f"Invalid assignment, expected hex digits: {assignment}")
+    return bits << _MAC_BITS | int(assignment, 16) << (_MAC_BITS - bits)
+
+
+def unpackAssignment(key: int) -> str:
+    """Returns the assignment of a packed key in uppercase hex
+
+    Args:
+        key (int): The packed key of the block
+
+    Returns:
+        str: The assignment of the block
+    """
+    bits: int = key >> _MAC_BITS
+    return "%0*X" % (bits // 4, (key & _MAC_MASK) >> (_MAC_BITS - bits))
+
+
+class PrefixIndex:
+    """Maps packed block keys to their position in a column of keys
+
+    Methods:
+    - find(key: int): Returns the position of a packed key
+    - lookup(mac: int, knownBits: int): Returns the position of the most specific
+        block containing a MAC address
+    """
+
+    __slots__ = ("_keys", "_positions")
+
+    def __init__(self, keys: Sequence[int]) -> None:
+        order: list[int] = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys: Sequence[int] = array("Q", [keys[i] for i in order])
+        self._positions: Sequence[int] = array("I", order)
+
+    @classmethod
+    def fromSorted(
+        cls, sortedKeys: Sequence[int], positions: Sequence[int]
+    ) -> "PrefixIndex":
+        """Returns an index over keys that are already sorted
+
+        Args:
+            sortedKeys (Sequence[int]): The packed keys in sorted order, such as a
+                memoryview over a snapshot
+            positions (Sequence[int]): The position of each sorted key in the
+                column it was taken from
+
+        Returns:
+            PrefixIndex: The index, sharing the given sequences
+        """
+        index: PrefixIndex = cls.__new__(cls)
+        index._keys = sortedKeys
+        index._positions = positions
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def sortedKeys(self) -> Sequence[int]:
+        """Returns the packed keys in sorted order"""
+        return self._keys
+
+    def positions(self) -> Sequence[int]:
+        """Returns the position of each sorted key in the column it was built from"""
+        return self._positions
+
+    def _position(self, key: int) -> int:
+        i: int = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._positions[i]
+        return -1
+
+    def find(self, key: int) -> int:
+        """Returns the position of a packed key
+
+        Args:
+            key (int): The packed key of the block
+
+        Returns:
+            int: The position of the key in the column the index was built from
+
+        Raises:
+            KeyError: If the key is not in the index
+        """
+        position: int = self._position(key)
+        if position < 0:
+            raise KeyError(key)
+        return position
+
+    def lookup(self, mac: int, knownBits: int = 48) -> int:
+        """Returns the position of the most specific block containing a MAC address
+
+        Args:
+            mac (int): The 48 bit integer value of the MAC address
+            knownBits (int, optional): How many leading bits of the MAC address are
+                known, blocks longer than this are not considered. Defaults to 48.
+
+        Returns:
+            int: The position of the block's key in the column the index was built from
+
+        Raises:
+            KeyError: If no block contains the MAC address
+        """
+        for bits in PREFIX_LENGTHS:
+            if bits <= knownBits:
+                position: int = self._position(
+                    bits << _MAC_BITS | mac & _PREFIX_MASKS[bits]
+                )
+                if position >= 0:
+                    return position
+        raise KeyError(mac)
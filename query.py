@@ -0,0 +1,348 @@
+"""
+Description: A composable filter engine over the rows of an OuiStore.
+
+Every predicate resolves to a bitmap over the rows of the store, held as a
+Python integer where bit r is set when row r matches. Predicates are combined
+with & (and), | (or) and ~ (not) and evaluated with integer set algebra, so any
+combination costs a few word-wise operations over the row count instead of a
+scan of the store per combination.
+
+Bitmaps are cached by the QueryEngine: one per registry, one for the suspected
+IoT manufacturers and a bounded number of organization name searches.
+
+    engine.records(ByOrganization("sony") & ~ByRegistry("MA-L"))
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator
+
+from .store import OuiRecord, OuiStore
+from .aggregates import OuiAggregates
+from .searchIndex import TrigramIndex
+from .iotClassifier import IOT_KEYWORDS, iotFlags, normalizeKeywords
+
+# the row offsets of the set bits of every byte value
+_BYTE_BITS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)
+)
+
+_ORGANIZATION_CACHE_SIZE = 256
+
+
+class Bitmap:
+    """A set of rows held as the bits of an integer
+
+    Methods:
+    - fromRows(rows: Iterable[int], size: int): Returns the bitmap of some rows
+    - rows(): Returns the rows of the bitmap in ascending order
+    """
+
+    __slots__ = ("bits", "size")
+
+    def __init__(self, bits: int, size: int) -> None:
+        self.bits: int = bits
+        self.size: int = size
+
+    @classmethod
+    def fromRows(cls, rows: Iterable[int], size: int) -> "Bitmap":
+        """Returns the bitmap of some rows
+
+        Args:
+            rows (Iterable[int]): The rows to set
+            size (int): The number of rows of the store
+
+        Returns:
+            Bitmap: The bitmap with the rows set
+        """
+        buffer: bytearray = bytearray((size + 7) // 8)
+        for row in rows:
+            buffer[row >> 3] |= 1 << (row & 7)
+        return cls(int.from_bytes(buffer, "little"), size)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits & other.bits, self.size)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits | other.bits, self.size)
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits & ~other.bits, self.size)
+
+    def __invert__(self) -> "Bitmap":
+        return Bitmap(self.bits ^ ((1 << self.size) - 1), self.size)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return self.bits == other.bits and self.size == other.size
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.rows())
+
+    def __repr__(self) -> str:
+        return f"Bitmap({len(self)} of {self.size} rows)"
+
+    def rows(self) -> list[int]:
+        """Returns the rows of the bitmap in ascending order"""
+        rows: list[int] = []
+        data: bytes = self.bits.to_bytes((self.size + 7) // 8, "little")
+        for offset, value in enumerate(data):
+            if value:
+                base: int = offset << 3
+                rows.extend(base + bit for bit in _BYTE_BITS[value])
+        return rows
+
+
+class Predicate:
+    """A filter over the rows of a store, combined with &, | and ~"""
+
+    __slots__ = ()
+
+    def evaluate(self, engine: "QueryEngine") -> Bitmap:
+        """Returns the bitmap of the rows matching the predicate"""
+        raise NotImplementedError
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return Or(self, other)
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+
+class And(Predicate):
+    """Matches the rows matching every predicate"""
+
+    __slots__ = ("predicates",)
+
+    def __init__(self, *predicates: Predicate) -> None:
+        self.predicates: tuple[Predicate, ...] = predicates
+
+    def evaluate(self, engine: "QueryEngine") -> Bitmap:
+        result: Bitmap = engine.all()
+        for predicate in self.predicates:
+            result &= predicate.evaluate(engine)
+            if not result:
+                break
+        return result
+
+    def __repr__(self) -> str:
+        return "(" + " & ".join(map(repr, self.predicates)) + ")"
+
+
+class Or(Predicate):
+    """Matches the rows matching any predicate"""
+
+    __slots__ = ("predicates",)
+
+    def __init__(self, *predicates: Predicate) -> None:
+        self.predicates: tuple[Predicate, ...] = predicates
+
+    def evaluate(self, engine: "QueryEngine") -> Bitmap:
+        result: Bitmap = engine.none()
+        for predicate in self.predicates:
+            result |= predicate.evaluate(engine)
+        return result
+
+    def __repr__(self) -> str:
+        return "(" + " | ".join(map(repr, self.predicates)) + ")"
+
+
+class Not(Predicate):
+    """Matches the rows not matching a predicate"""
+
+    __slots__ = ("predicate",)
+
+    def __init__(self, predicate: Predicate) -> None:
+        self.predicate: Predicate = predicate
+
+    def evaluate(self, engine: "QueryEngine") -> Bitmap:
+        return ~self.predicate.evaluate(engine)
+
+    def __repr__(self) -> str:
+        return f"~{self.predicate!r}"
+
+
+class ByRegistry(Predicate):
+    """Matches the rows of a registry"""
+
+    __slots__ = ("registry",)
+
+    def __init__(self, registry: str) -> None:
+        self.registry: str = registry
+
+    def evaluate(self, engine: "QueryEngine") -> Bitmap:
+        return engine.registryBitmap(self.registry)
+
+    def __repr__(self) -> str:
+        return f"ByRegistry({self.registry!r})"
+
+
+class ByOrganization(Predicate):
+    """Matches the rows whose organization name contains a string, ignoring case"""
+
+    __slots__ = ("organization",)
+
+    def __init__(self, organization: str) -> None:
+        self.organization: str = organization
+
+    def evaluate(self, engine: "QueryEngine") -> Bitmap:
+        return engine.organizationBitmap(self.organization)
+
+    def __repr__(self) -> str:
+        return f"ByOrganization({self.organization!r})"
+
+
+class ByAssignment(Predicate):
+    """Matches the row of an assignment"""
+
+    __slots__ = ("assignment",)
+
+    def __init__(self, assignment: str) -> None:
+        self.assignment: str = assignment
+
+    def evaluate(self, engine: "QueryEngine") -> Bitmap:
+        return engine.assignmentBitmap(self.assignment)
+
+    def __repr__(self) -> str:
+        return f"ByAssignment({self.assignment!r})"
+
+
+class ByIoT(Predicate):
+    """Matches the rows of suspected IoT manufacturers
+
+    A row matches if its organization name contains one of the IoT keywords of
+    the engine, ignoring case, the IOT_KEYWORDS of iotClassifier by default.
+    """
+
+    __slots__ = ()
+
+    def evaluate(self, engine: "QueryEngine") -> Bitmap:
+        return engine.iotBitmap()
+
+    def __repr__(self) -> str:
+        return "ByIoT()"
+
+
+class QueryEngine:
+    """Evaluates predicates over the rows of a store from cached bitmaps
+
+    Methods:
+    - rows(predicate: Predicate): Returns the rows matching a predicate
+    - count(predicate: Predicate): Returns the number of rows matching a predicate
+    - records(predicate: Predicate): Returns the records matching a predicate
+    - registryBitmap(registry: str): Returns the bitmap of a registry
+    - organizationBitmap(organization: str): Returns the bitmap of an organization
+        name search
+    - assignmentBitmap(assignment: str): Returns the bitmap of an assignment
+    - iotBitmap(): Returns the bitmap of the suspected IoT manufacturers
+    """
+
+    __slots__ = (
+        "_store",
+        "_size",
+        "_iotKeywords",
+        "_registries",
+        "_organizations",
+        "_organizationsLock",
+        "_iot",
+    )
+
+    def __init__(
+        self, store: OuiStore, iotKeywords: Iterable[str] = IOT_KEYWORDS
+    ) -> None:
+        self._store: OuiStore = store
+        self._iotKeywords: tuple[str, ...] = normalizeKeywords(iotKeywords)
+        self._size: int = len(store)
+        self._registries: dict[str, Bitmap] = {}
+        self._organizations: OrderedDict[str, Bitmap] = OrderedDict()
+        self._organizationsLock: threading.Lock = threading.Lock()
+        self._iot: Bitmap | None = None
+
+    def rows(self, predicate: Predicate) -> list[int]:
+        """Returns the rows matching a predicate in the order they were read"""
+        return predicate.evaluate(self).rows()
+
+    def count(self, predicate: Predicate) -> int:
+        """Returns the number of rows matching a predicate"""
+        return len(predicate.evaluate(self))
+
+    def records(self, predicate: Predicate) -> list[OuiRecord]:
+        """Returns the records matching a predicate in the order they were read"""
+        return [self._store.record(row) for row in self.rows(predicate)]
+
+    def all(self) -> Bitmap:
+        """Returns the bitmap of every row"""
+        return Bitmap((1 << self._size) - 1, self._size)
+
+    def none(self) -> Bitmap:
+        """Returns the empty bitmap"""
+        return Bitmap(0, self._size)
+
+    def registryBitmap(self, registry: str) -> Bitmap:
+        """Returns the bitmap of the rows of a registry"""
+        bitmap: Bitmap | None = self._registries.get(registry)
+        if bitmap is None:
+            bitmap = self._registries[registry] = Bitmap.fromRows(
+                self._aggregates().registryRows(registry), self._size
+            )
+        return bitmap
+
+    def organizationBitmap(self, organization: str) -> Bitmap:
+        """Returns the bitmap of the rows whose organization name contains a string
+
+        Note:
+            The most recent searches are kept, ignoring case, the least recently
+            used search is dropped once there are more than 256. Searches
+            may run on several threads, such as those of the HTTP service.
+        """
+        organization = organization.lower()
+        with self._organizationsLock:
+            bitmap: Bitmap | None = self._organizations.get(organization)
+            if bitmap is not None:
+                self._organizations.move_to_end(organization)
+                return bitmap
+
+        # searched outside of the lock, so other searches are not held up
+        bitmap = Bitmap.fromRows(self._searchIndex().rows(organization), self._size)
+        with self._organizationsLock:
+            self._organizations[organization] = bitmap
+            self._organizations.move_to_end(organization)
+            if len(self._organizations) > _ORGANIZATION_CACHE_SIZE:
+                self._organizations.popitem(last=False)
+        return bitmap
+
+    def assignmentBitmap(self, assignment: str) -> Bitmap:
+        """Returns the bitmap of the row of an assignment, empty unless the
+        assignment is in hex digits only, see packAssignment()
+        """
+        try:
+            return Bitmap(1 << self._store.find(assignment), self._size)
+        except KeyError:
+            return self.none()
+
+    def iotBitmap(self) -> Bitmap:
+        """Returns the bitmap of the rows of suspected IoT manufacturers"""
+        if self._iot is None:
+            flags: bytearray | memoryview = iotFlags(self._store, self._iotKeywords)
+            self._iot = Bitmap.fromRows(
+                (row for row, flag in enumerate(flags) if flag), self._size
+            )
+        return self._iot
+
+    def _aggregates(self) -> OuiAggregates:
+        return self._store.derived("aggregates", OuiAggregates)
+
+    def _searchIndex(self) -> TrigramIndex:
+        return self._store.derived("searchIndex", TrigramIndex)
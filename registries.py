@@ -0,0 +1,57 @@
+"""
+Description: The IEEE registries ingested by IeeOuiDb. Each registry is published
+as its own CSV file and assigns blocks of a different prefix length:
+
+- MA-L (24 bit), MA-M (28 bit), MA-S (36 bit), IAB (36 bit) and CID (24 bit)
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import os
+from typing import NamedTuple
+
+DATA_DIR = os.path.expanduser("~/NG_OUI_DB")
+
+
+class Registry(NamedTuple):
+    """An IEEE registry and where its CSV file is downloaded to
+
+    Attributes:
+    - name (str): The registry name as it appears in the Registry column
+    - url (str): The URL of the registry's CSV file
+    - fileName (str): The filename the CSV file is saved to
+    """
+
+    name: str
+    url: str
+    fileName: str
+
+
+MA_L = Registry(
+    "MA-L",
+    "https://standards-oui.ieee.org/oui/oui.csv",
+    os.path.join(DATA_DIR, "iee_oui.csv"),
+)
+MA_M = Registry(
+    "MA-M",
+    "https://standards-oui.ieee.org/oui28/mam.csv",
+    os.path.join(DATA_DIR, "iee_mam.csv"),
+)
+MA_S = Registry(
+    "MA-S",
+    "https://standards-oui.ieee.org/oui36/oui36.csv",
+    os.path.join(DATA_DIR, "iee_oui36.csv"),
+)
+IAB = Registry(
+    "IAB",
+    "https://standards-oui.ieee.org/iab/iab.csv",
+    os.path.join(DATA_DIR, "iee_iab.csv"),
+)
+CID = Registry(
+    "CID",
+    "https://standards-oui.ieee.org/cid/cid.csv",
+    os.path.join(DATA_DIR, "iee_cid.csv"),
+)
+
+# every registry known to the module, MA-L first
+REGISTRIES: tuple[Registry, ...] = (MA_L, MA_M, MA_S, IAB, CID)
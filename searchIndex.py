@@ -0,0 +1,118 @@
+"""
+Description: A trigram index for case-insensitive substring searches over the
+organization names of an OuiStore.
+
+Every distinct organization name is lowercased once and each of its three
+character substrings (trigrams) is mapped to a sorted posting list of name ids.
+A query is answered by intersecting the posting lists of its trigrams and then
+verifying only the names that survive, instead of lowercasing and scanning
+every name on every query. Queries shorter than a trigram fall back to a scan
+of the distinct names.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+from array import array
+from bisect import bisect_left
+
+from .store import OuiStore
+from .aggregates import OuiAggregates
+
+_GRAM = 3
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+def _contains(postings: array, nameId: int) -> bool:
+    i: int = bisect_left(postings, nameId)
+    return i < len(postings) and postings[i] == nameId
+
+
+class TrigramIndex:
+    """Case-insensitive substring index over the organization names of a store
+
+    Methods:
+    - nameIds(organization: str): Returns the ids of the names containing a string
+    - rows(organization: str): Returns the rows whose name contains a string
+    - count(organization: str): Returns how many rows have a name containing a string
+    - matches(nameId: int, organization: str): Returns if a name contains a string
+    """
+
+    __slots__ = ("_folded", "_postings", "_aggregates")
+
+    def __init__(self, store: OuiStore) -> None:
+        self._folded: list[str] = [name.lower() for name in store.nameTable()]
+
+        # name ids are visited in order, so every posting list is sorted
+        self._postings: dict[str, array] = {}
+        for nameId, name in enumerate(self._folded):
+            for gram in _grams(name):
+                postings: array | None = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("I")
+                postings.append(nameId)
+
+        # the rows of each name come from the store's materialized group-bys
+        self._aggregates: OuiAggregates = store.derived("aggregates", OuiAggregates)
+
+    def nameIds(self, organization: str) -> list[int]:
+        """Returns the ids of the organization names containing a string
+
+        Args:
+            organization (str): The string to search for, ignoring case
+
+        Returns:
+            list[int]: The matching name ids in ascending order
+        """
+        organization = organization.lower()
+        if len(organization) < _GRAM:
+            return [
+                nameId
+                for nameId, name in enumerate(self._folded)
+                if organization in name
+            ]
+
+        postingLists: list[array] = []
+        for gram in _grams(organization):
+            postings: array | None = self._postings.get(gram)
+            if postings is None:
+                return []
+            postingLists.append(postings)
+        postingLists.sort(key=len)
+
+        # intersect starting from the rarest trigram, probing the longer posting
+        # lists by binary search once the candidates are few, then verify them
+        candidates: set[int] = set(postingLists[0])
+        for postings in postingLists[1:]:
+            if len(postings) > 8 * len(candidates):
+                candidates = {c for c in candidates if _contains(postings, c)}
+            else:
+                candidates.intersection_update(postings)
+        return sorted(c for c in candidates if organization in self._folded[c])
+
+    def rows(self, organization: str) -> list[int]:
+        """Returns the rows whose organization name contains a string
+
+        Args:
+            organization (str): The string to search for, ignoring case
+
+        Returns:
+            list[int]: The matching rows in the order they were read
+        """
+        rows: list[int] = []
+        for nameId in self.nameIds(organization):
+            rows.extend(self._aggregates.nameRows(nameId))
+        rows.sort()
+        return rows
+
+    def count(self, organization: str) -> int:
+        """Returns how many rows have an organization name containing a string"""
+        return sum(
+            self._aggregates.nameCount(nameId) for nameId in self.nameIds(organization)
+        )
+
+    def matches(self, nameId: int, organization: str) -> bool:
+        """Returns if an organization name contains a string, ignoring case"""
+        return organization.lower() in self._folded[nameId]
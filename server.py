@@ -0,0 +1,288 @@
+"""
+Description: A local HTTP service answering lookups from one copy of the database.
+
+The service keeps its connections alive (HTTP/1.1), so a client pays for the
+TCP handshake once and then a few microseconds of lookup per request. The
+endpoints answer in JSON:
+
+    GET  /lookup?mac=d8:ec:5e:12:34:56      the organization of a MAC address
+    GET  /isiot?mac=d8:ec:5e:12:34:56       if it is a suspected IoT manufacturer
+    GET  /search?organization=sony&registry=MA-L&iot=true&limit=100
+    GET  /health                            the number of records served
+    POST /lookup                            one MAC address per line of the body
+
+The batch endpoint answers with one JSON object per line (NDJSON), in the order
+of the MAC addresses, streamed in chunks as they are looked up.
+
+With several workers the database is loaded once, the port is bound once and
+the worker processes are forked from the loaded database: they share its pages
+and accept connections from the same listening socket.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import os
+import json
+import signal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+from urllib.parse import parse_qs, urlsplit
+
+from NG_OUI_DB import IeeOuiDb, getSharedDb, lookupResult
+from .query import ByIoT, ByOrganization, ByRegistry, Predicate
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# the largest batch body read, about 900 thousand MAC addresses
+MAX_BATCH_BYTES = 16 * 1024 * 1024
+# the number of batch results written per chunk of the response
+BATCH_CHUNK_SIZE = 256
+# the number of records a search returns unless a limit is given
+DEFAULT_SEARCH_LIMIT = 1000
+
+
+class OuiHTTPServer(ThreadingHTTPServer):
+    """A threading HTTP server answering lookups from a database
+
+    Attributes:
+    - database (IeeOuiDb): The database the lookups are answered from
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], database: IeeOuiDb) -> None:
+        self.database: IeeOuiDb = database
+        super().__init__(address, OuiRequestHandler)
+
+
+class OuiRequestHandler(BaseHTTPRequestHandler):
+    """Answers the lookup, isiot, search and health endpoints, see server.py"""
+
+    protocol_version = "HTTP/1.1"
+    # the headers and the body are separate writes, with Nagle's algorithm the
+    # body waits for the client's delayed ACK of the headers
+    disable_nagle_algorithm = True
+    server: OuiHTTPServer
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        parameters: dict[str, list[str]] = parse_qs(url.query)
+        database: IeeOuiDb = self.server.database
+        match url.path:
+            case "/lookup":
+                mac: str | None = _parameter(parameters, "mac")
+                if mac is None:
+                    return self._sendJson(400, {"error": "Missing mac parameter"})
+                result: dict[str, Any] = lookupResult(database, mac)
+                self._sendJson(404 if "error" in result else 200, result)
+            case "/isiot":
+                mac = _parameter(parameters, "mac")
+                if mac is None:
+                    return self._sendJson(400, {"error": "Missing mac parameter"})
+                self._sendJson(200, {"mac": mac, "isIoT": database.isIoT(mac)})
+            case "/search":
+                self._search(database, parameters)
+            case "/health":
+                self._sendJson(
+                    200,
+                    {"status": "ok", "records": database.getOrganizationsMacCount()},
+                )
+            case _:
+                self._sendJson(404, {"error": f"Not found: {url.path}"})
+
+    def do_POST(self) -> None:
+        path: str = urlsplit(self.path).path
+        if path != "/lookup":
+            return self._sendJson(404, {"error": f"Not found: {path}"})
+
+        length: str | None = self.headers.get("Content-Length")
+        if length is None:
+            return self._sendJson(411, {"error": "Missing Content-Length"})
+        # isdigit() alone takes digits such as "²" that int() does not
+        if not (length.isascii() and length.isdigit()):
+            self.close_connection = True
+            return self._sendJson(400, {"error": "Invalid Content-Length"})
+        if int(length) > MAX_BATCH_BYTES:
+            self.close_connection = True
+            return self._sendJson(413, {"error": "Batch too large"})
+
+        # the whole body is read before answering, a client still sending it
+        # would otherwise not read the response and both ends could block
+        body: bytes = self.rfile.read(int(length))
+        self._sendLines(
+            json.dumps(lookupResult(self.server.database, mac))
+            for mac in _batchMacs(body)
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # an access log line per lookup would cost more than the lookup
+        pass
+
+    def _search(self, database: IeeOuiDb, parameters: dict[str, list[str]]) -> None:
+        predicates: list[Predicate] = []
+        organization: str | None = _parameter(parameters, "organization")
+        if organization:
+            predicates.append(ByOrganization(organization))
+        registry: str | None = _parameter(parameters, "registry")
+        if registry:
+            predicates.append(ByRegistry(registry))
+        if (_parameter(parameters, "iot") or "").lower() in ("1", "true", "yes"):
+            predicates.append(ByIoT())
+        if not predicates:
+            return self._sendJson(
+                400, {"error": "Expected an organization, registry or iot parameter"}
+            )
+
+        limit: str = _parameter(parameters, "limit") or str(DEFAULT_SEARCH_LIMIT)
+        # isdigit() alone takes digits such as "²" that int() does not
+        if not (limit.isascii() and limit.isdigit()):
+            return self._sendJson(400, {"error": f"Invalid limit: {limit}"})
+
+        predicate: Predicate = predicates[0]
+        for other in predicates[1:]:
+            predicate &= other
+        records = database.query(predicate)[: int(limit)]
+        self._sendJson(200, [dict(record) for record in records])
+
+    def _sendJson(self, status: int, body: Any) -> None:
+        data: bytes = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _sendLines(self, lines: Iterator[str]) -> None:
+        """Streams lines as an NDJSON response in chunks of BATCH_CHUNK_SIZE lines"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        chunk: list[str] = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == BATCH_CHUNK_SIZE:
+                self._writeChunk(chunk)
+                chunk = []
+        if chunk:
+            self._writeChunk(chunk)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _writeChunk(self, lines: list[str]) -> None:
+        data: bytes = ("\n".join(lines) + "\n").encode()
+        self.wfile.write(b"%x\r\n%b\r\n" % (len(data), data))
+
+
+def makeServer(
+    host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, database: IeeOuiDb | None = None
+) -> OuiHTTPServer:
+    """Binds a server answering lookups from a database
+
+    Args:
+        host (str, optional): The address to listen on. Defaults to DEFAULT_HOST.
+        port (int, optional): The port to listen on, 0 for any free port. Defaults
+            to DEFAULT_PORT.
+        database (IeeOuiDb | None, optional): Initialized DB. Defaults to None,
+            using the database shared by the process.
+
+    Returns:
+        OuiHTTPServer: The server, listening but not yet serving
+    """
+    database = getSharedDb() if database is None else database
+    database.load()
+    return OuiHTTPServer((host, port), database)
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = 1,
+    database: IeeOuiDb | None = None,
+) -> None:
+    """Serves lookups over HTTP until interrupted
+
+    Args:
+        host (str, optional): The address to listen on. Defaults to DEFAULT_HOST.
+        port (int, optional): The port to listen on. Defaults to DEFAULT_PORT.
+        workers (int, optional): The number of worker processes. Defaults to 1,
+            serving from this process.
+        database (IeeOuiDb | None, optional): Initialized DB. Defaults to None,
+            using the database shared by the process.
+
+    Raises:
+        ValueError: If several workers are asked for on a platform without fork()
+    """
+    if workers > 1 and not hasattr(os, "fork"):
+        raise ValueError("Several workers need os.fork(), serve with workers=1")
+
+    server: OuiHTTPServer = makeServer(host, port, database)
+    try:
+        if workers > 1:
+            _serveForked(server, workers)
+        else:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _serveForked(server: OuiHTTPServer, workers: int) -> None:
+    """Forks the workers from the loaded database and waits for them
+
+    Note:
+        SIGTERM and SIGINT stop the workers, which are reaped before returning.
+    """
+    # no background writer may be running at the fork, the workers would not
+    # inherit it and the parent would not know when its files are complete
+    server.database.waitForArtifacts()
+    # the workers race for every connection, the losers' accept must not block
+    server.socket.setblocking(False)
+
+    previous = signal.signal(signal.SIGTERM, _terminate)
+    pids: list[int] = []
+    try:
+        for _ in range(workers):
+            pid: int = os.fork()
+            if pid == 0:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                try:
+                    server.serve_forever()
+                finally:
+                    os._exit(0)
+            pids.append(pid)
+        for pid in pids:
+            os.waitpid(pid, 0)
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ChildProcessError, ProcessLookupError):
+                pass
+
+
+def _terminate(signum: int, frame: Any) -> None:
+    raise SystemExit(0)
+
+
+def _parameter(parameters: dict[str, list[str]], name: str) -> str | None:
+    values: list[str] | None = parameters.get(name)
+    return values[0] if values else None
+
+
+def _batchMacs(body: bytes) -> Iterator[str]:
+    """Yields the MAC addresses of a batch body, one per line, bare or JSON strings"""
+    for line in body.decode("utf-8", "replace").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('"'):
+            try:
+                line = json.loads(line)
+            except ValueError:
+                pass
+        yield line
@@ -0,0 +1,178 @@
+"""
+Description: A store built once and shared by every process of a host.
+
+One process publishes its store as a snapshot (see snapshot.py), and the other
+processes attach to it read-only: each maps the snapshot, so the columns and
+the lookup index live once in the page cache whatever the number of processes,
+and none of them downloads or parses anything.
+
+Every publish is a new generation. A generation is a snapshot file of its own,
+named after its number, and the number of the current generation is kept in a
+small counter file that every process maps:
+
+    iee_oui.shared      the current generation, an unsigned 64 bit integer
+    iee_oui.shared.1    the snapshot of generation 1
+    iee_oui.shared.2    the snapshot of generation 2
+
+A snapshot is complete before the counter points to it, so reading the counter
+from the mapped page is all it takes for a process to know it must switch to a
+refreshed store. The snapshot of the previous generation is kept for the
+processes still switching, older ones are removed; a process that still maps a
+removed snapshot keeps reading it undisturbed.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import os
+import mmap
+import struct
+import threading
+
+from .store import OuiStore
+from .snapshot import SnapshotError, openSnapshot, writeSnapshot
+
+# the number of the current generation, 0 until the first publish
+_GENERATION = struct.Struct("<Q")
+
+# the generations a publish keeps, the new one and the previous one
+_KEPT_GENERATIONS = 2
+
+# the attempts to open the current generation while publishes race the reader
+_OPEN_ATTEMPTS = 3
+
+
+def generationFileName(fileName: str, generation: int) -> str:
+    """Returns the path of the snapshot of a generation"""
+    return f"{fileName}.{generation}"
+
+
+class SharedIndex:
+    """The generations of a store shared by the processes of a host
+
+    Attributes:
+    - fileName (str): The path of the counter file, the snapshots are next to it
+
+    Methods:
+    - generation(): Returns the number of the current generation
+    - publish(store: OuiStore): Publishes a store as the next generation
+    - open(): Returns the current generation and its store
+    - close(): Unmaps the counter file
+
+    Note:
+        A single process publishes, any number of processes open.
+    """
+
+    def __init__(self, fileName: str) -> None:
+        self.fileName: str = fileName
+        self._counter: mmap.mmap | None = None
+        self._writable: bool = False
+        self._publishLock: threading.Lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"SharedIndex({self.fileName!r}, generation {self.generation()})"
+
+    def generation(self) -> int:
+        """Returns the number of the current generation, 0 if none was published
+
+        Note:
+            The counter file is mapped on first use, afterwards this reads the
+            mapped page and makes no system call.
+        """
+        counter: mmap.mmap | None = self._counter
+        if counter is None:
+            if not os.path.exists(self.fileName):
+                return 0
+            try:
+                counter = self._map(writable=False)
+            except ValueError:
+                # created by a publisher that has not sized it yet
+                return 0
+        return _GENERATION.unpack_from(counter)[0]
+
+    def publish(self, store: OuiStore) -> int:
+        """Publishes a store as the next generation
+
+        Args:
+            store (OuiStore): The store to share
+
+        Returns:
+            int: The number of the published generation
+        """
+        with self._publishLock:
+            if not self._writable:
+                self._map(writable=True)
+            generation: int = self.generation() + 1
+            writeSnapshot(store, generationFileName(self.fileName, generation))
+            # the snapshot is complete, point the readers to it
+            self._counter[: _GENERATION.size] = _GENERATION.pack(generation)
+            self._counter.flush()
+
+            stale: int = generation - _KEPT_GENERATIONS
+            while stale > 0:
+                try:
+                    os.remove(generationFileName(self.fileName, stale))
+                except FileNotFoundError:
+                    break
+                except OSError:
+                    # a mapped file cannot be removed on Windows, a later
+                    # publish removes it
+                    pass
+                stale -= 1
+            return generation
+
+    def open(self) -> tuple[int, OuiStore]:
+        """Returns the current generation and its store, mapped read-only
+
+        Returns:
+            tuple[int, OuiStore]: The number of the generation and its store
+
+        Raises:
+            FileNotFoundError: If no generation was published
+            SnapshotError: If the snapshot of the generation is not valid
+        """
+        attempts: int = _OPEN_ATTEMPTS
+        while True:
+            generation: int = self.generation()
+            if generation == 0:
+                raise FileNotFoundError(f"No generation published: {self.fileName}")
+            try:
+                return generation, openSnapshot(
+                    generationFileName(self.fileName, generation)
+                )
+            except (FileNotFoundError, SnapshotError):
+                # removed by publishes that happened since reading the counter
+                attempts -= 1
+                if attempts == 0 or self.generation() == generation:
+                    raise
+
+    def close(self) -> None:
+        """Unmaps the counter file, it is mapped again on next use"""
+        if self._counter is not None:
+            self._counter.close()
+            self._counter = None
+            self._writable = False
+
+    def _map(self, writable: bool) -> mmap.mmap:
+        """Maps the counter file, creating it to publish"""
+        if writable:
+            directory: str = os.path.dirname(self.fileName)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            descriptor: int = os.open(self.fileName, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(descriptor).st_size < _GENERATION.size:
+                    os.ftruncate(descriptor, _GENERATION.size)
+                counter = mmap.mmap(descriptor, _GENERATION.size)
+            finally:
+                os.close(descriptor)
+        else:
+            with open(self.fileName, "rb") as file:
+                counter = mmap.mmap(
+                    file.fileno(), _GENERATION.size, access=mmap.ACCESS_READ
+                )
+
+        if self._counter is not None:
+            self._counter.close()
+        self._counter = counter
+        self._writable = writable
+        return counter
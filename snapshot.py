@@ -0,0 +1,276 @@
+"""
+Description: A versioned, checksummed binary snapshot of an OuiStore that is
+opened with mmap.
+
+The snapshot is a fixed header followed by a table of sections, each one a
+column of the store laid out exactly as it is held in memory:
+
+    header    magic, version, flags, crc32 of the section table, crc32 of the
+              payload, row count, section count
+    sections  offset and length of every section
+    payload   the sections, each aligned to 8 bytes
+
+A snapshot is opened by mapping the file and casting memoryviews over its
+sections, so nothing is parsed or copied: lookups read the mapped pages
+directly and every process opening the same snapshot shares one copy of it in
+the page cache. The sorted key table of the PrefixIndex is stored as well, so
+the index does not have to be sorted again either, and neither do the IoT
+flags of every row have to be classified again.
+
+Snapshots are written to a temporary file, read back to check the crc32 of
+their payload and moved into place, so a process that has the previous snapshot
+mapped keeps reading it undisturbed. Opening a snapshot only checks its header
+and section table, so it takes the same time whatever the size of the file;
+the payload is checked again on demand, see openSnapshot().
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import os
+import sys
+import mmap
+import zlib
+import struct
+from array import array
+from typing import Sequence
+
+from .utils import atomicFile
+from .store import OuiStore, StringHeap
+from .prefixIndex import PrefixIndex
+from .iotClassifier import IOT_KEYWORDS, iotFlags, normalizeKeywords
+
+SNAPSHOT_MAGIC = b"NGOUIDB\x00"
+SNAPSHOT_VERSION = 4
+
+# magic, version, flags, crc32 of the section table, crc32 of the payload, rows,
+# sections
+_HEADER = struct.Struct("<8sIIIIII")
+# offset and length of a section
+_SECTION = struct.Struct("<QQ")
+_ALIGNMENT = 8
+
+# the columns are written in native byte order, flagged so a snapshot is not
+# opened on a machine of the other byte order
+_BIG_ENDIAN = 1
+_FLAGS = _BIG_ENDIAN if sys.byteorder == "big" else 0
+
+# sections, in the order they are written
+(
+    _SOURCES,
+    _REGISTRY_NAMES,
+    _REGISTRIES,
+    _KEYS,
+    _NAMES,
+    _NAME_OFFSETS,
+    _NAME_HEAP,
+    _ADDRESS_OFFSETS,
+    _ADDRESS_HEAP,
+    _SORTED_KEYS,
+    _POSITIONS,
+    _HASHES,
+    _IOT_KEYWORDS,
+    _IOT_FLAGS,
+) = range(14)
+_SECTIONS = 14
+# the payload starts after the header and the section table
+_PAYLOAD = _HEADER.size + _SECTION.size * _SECTIONS
+
+# the sections holding one value per row
+_ROW_SECTIONS = (
+    _REGISTRIES,
+    _KEYS,
+    _NAMES,
+    _SORTED_KEYS,
+    _POSITIONS,
+    _HASHES,
+    _IOT_FLAGS,
+)
+
+_FORMATS: dict[int, str] = {
+    _REGISTRIES: "B",
+    _KEYS: "Q",
+    _NAMES: "I",
+    _NAME_OFFSETS: "I",
+    _ADDRESS_OFFSETS: "I",
+    _SORTED_KEYS: "Q",
+    _POSITIONS: "I",
+    _HASHES: "Q",
+    _IOT_FLAGS: "B",
+}
+
+
+class SnapshotError(ValueError):
+    """Raised when a file is not a snapshot this version can open"""
+
+
+def _column(values: Sequence[int], typeCode: str) -> memoryview:
+    """Returns the bytes of a column, converting it to the typecode if needed"""
+    if isinstance(values, memoryview) and values.format == typeCode:
+        return values.cast("B")
+    if isinstance(values, array) and values.typecode == typeCode:
+        return memoryview(values).cast("B")
+    return memoryview(array(typeCode, values)).cast("B")
+
+
+def _nameHeap(nameTable: Sequence[str]) -> StringHeap:
+    if isinstance(nameTable, StringHeap):
+        return nameTable
+    return StringHeap.fromStrings(nameTable)
+
+
+def writeSnapshot(store: OuiStore, fileName: str) -> None:
+    """Writes a store to a snapshot file
+
+    Args:
+        store (OuiStore): The store to write
+        fileName (str): The path of the snapshot, replaced atomically
+    """
+    index: PrefixIndex = store.prefixIndex()
+    names: StringHeap = _nameHeap(store.nameTable())
+    addresses: StringHeap = store.addressHeap()
+
+    sections: list[bytes | memoryview] = [b""] * _SECTIONS
+    sections[_SOURCES] = "\n".join(store.sources).encode("utf-8")
+    sections[_REGISTRY_NAMES] = "\n".join(store.registryNames()).encode("utf-8")
+    sections[_REGISTRIES] = memoryview(store.registryCodes()).cast("B")
+    sections[_KEYS] = _column(store.keys(), "Q")
+    sections[_NAMES] = _column(store.nameIds(), "I")
+    sections[_NAME_OFFSETS] = _column(names.offsets(), "I")
+    sections[_NAME_HEAP] = names.heap()
+    sections[_ADDRESS_OFFSETS] = _column(addresses.offsets(), "I")
+    sections[_ADDRESS_HEAP] = addresses.heap()
+    sections[_SORTED_KEYS] = _column(index.sortedKeys(), "Q")
+    sections[_POSITIONS] = _column(index.positions(), "I")
+    sections[_HASHES] = _column(store.hashes(), "Q")
+    sections[_IOT_KEYWORDS] = "\n".join(normalizeKeywords(IOT_KEYWORDS)).encode()
+    sections[_IOT_FLAGS] = memoryview(iotFlags(store)).cast("B")
+
+    # lay the sections out after the header and section table
+    table: bytearray = bytearray()
+    paddings: list[bytes] = []
+    offset: int = _PAYLOAD
+    for section in sections:
+        table += _SECTION.pack(offset, len(section))
+        offset += len(section)
+        paddings.append(b"\x00" * (-offset % _ALIGNMENT))
+        offset += len(paddings[-1])
+
+    crc: int = 0
+    for section, padding in zip(sections, paddings):
+        crc = zlib.crc32(padding, zlib.crc32(section, crc))
+
+    with atomicFile(fileName, "w+b") as file:
+        file.write(
+            _HEADER.pack(
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_VERSION,
+                _FLAGS,
+                zlib.crc32(table),
+                crc,
+                len(store),
+                _SECTIONS,
+            )
+        )
+        file.write(table)
+        for section, padding in zip(sections, paddings):
+            file.write(section)
+            file.write(padding)
+        file.flush()
+        # read the written file back once, the snapshot is not moved into place
+        # if it does not match
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if zlib.crc32(memoryview(mapped)[_PAYLOAD:]) != crc:
+                raise SnapshotError(f"Corrupt snapshot written: {fileName}")
+
+
+def openSnapshot(fileName: str, verify: bool = False) -> OuiStore:
+    """Opens a snapshot file as a store backed by the mapped file
+
+    Args:
+        fileName (str): The path of the snapshot
+        verify (bool, optional): Also check the crc32 of the payload, which reads
+            every page of it once. Defaults to False, only the header and the
+            section table are checked, the payload was checked when it was
+            written.
+
+    Returns:
+        OuiStore: The store, its columns are memoryviews over the mapped file
+
+    Raises:
+        OSError: If the file cannot be opened or mapped
+        SnapshotError: If the file is not a valid snapshot of this version
+    """
+    with open(fileName, "rb") as file:
+        size: int = os.fstat(file.fileno()).st_size
+        if size < _HEADER.size:
+            raise SnapshotError(f"Truncated snapshot: {fileName}")
+        mapped: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        magic, version, flags, tableCrc, crc, rows, sectionCount = _HEADER.unpack_from(
+            mapped
+        )
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"Not a snapshot: {fileName}")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}: {fileName}")
+        if flags != _FLAGS:
+            raise SnapshotError(f"Snapshot of another byte order: {fileName}")
+        if sectionCount != _SECTIONS:
+            raise SnapshotError(f"Unexpected snapshot sections: {fileName}")
+
+        view: memoryview = memoryview(mapped)
+        if zlib.crc32(view[_HEADER.size : _PAYLOAD]) != tableCrc:
+            raise SnapshotError(f"Corrupt snapshot: {fileName}")
+        bounds: list[tuple[int, int]] = []
+        for i in range(_SECTIONS):
+            offset, length = _SECTION.unpack_from(
+                mapped, _HEADER.size + i * _SECTION.size
+            )
+            if offset < _PAYLOAD or offset % _ALIGNMENT:
+                raise SnapshotError(f"Malformed snapshot: {fileName}")
+            if offset + length > size:
+                raise SnapshotError(f"Truncated snapshot: {fileName}")
+            bounds.append((offset, length))
+
+        if verify and zlib.crc32(view[_PAYLOAD:]) != crc:
+            raise SnapshotError(f"Corrupt snapshot: {fileName}")
+
+        sections: list[memoryview] = []
+        for i, (offset, length) in enumerate(bounds):
+            section: memoryview = view[offset : offset + length]
+            sections.append(section.cast(_FORMATS[i]) if i in _FORMATS else section)
+    except (struct.error, TypeError) as error:
+        raise SnapshotError(f"Malformed snapshot: {fileName}") from error
+
+    # the payload is not checked on open, so a section the lookups index by row
+    # must at least be as long as the rows
+    if (
+        any(len(sections[i]) != rows for i in _ROW_SECTIONS)
+        or len(sections[_ADDRESS_OFFSETS]) != rows + 1
+        or len(sections[_NAME_OFFSETS]) == 0
+        or sections[_NAME_OFFSETS][-1] != len(sections[_NAME_HEAP])
+        or sections[_ADDRESS_OFFSETS][-1] != len(sections[_ADDRESS_HEAP])
+    ):
+        raise SnapshotError(f"Malformed snapshot: {fileName}")
+
+    # the memoryviews keep the mapping alive for as long as the store uses them
+    store: OuiStore = OuiStore(
+        sources=tuple(filter(None, str(sections[_SOURCES], "utf-8").split("\n"))),
+        registryNames=tuple(str(sections[_REGISTRY_NAMES], "utf-8").split("\n")),
+        registries=sections[_REGISTRIES],
+        keys=sections[_KEYS],
+        names=sections[_NAMES],
+        nameTable=StringHeap(sections[_NAME_OFFSETS], sections[_NAME_HEAP]),
+        addressOffsets=sections[_ADDRESS_OFFSETS],
+        addresses=sections[_ADDRESS_HEAP],
+        hashes=sections[_HASHES],
+        index=PrefixIndex.fromSorted(sections[_SORTED_KEYS], sections[_POSITIONS]),
+    )
+
+    # the IoT flags are only valid for the keywords they were built from
+    iotKeywords: tuple[str, ...] = tuple(
+        filter(None, str(sections[_IOT_KEYWORDS], "utf-8").split("\n"))
+    )
+    store.derived(("iotFlags", iotKeywords), lambda _: sections[_IOT_FLAGS])
+    return store
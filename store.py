@@ -0,0 +1,450 @@
+"""
+Description: A compact, columnar in-memory store for the IEEE OUI database.
+
+Instead of one dictionary per assignment, every column is held in a flat array:
+
+- the packed key of each block (see prefixIndex.py) in an array of integers
+- the registry of each block as a one byte code
+- the organization name of each block as an id into a table of interned names
+- the organization address of each block as offsets into a single UTF-8 blob
+- a 64 bit hash of the registry, name and address of each block, to find the
+  blocks that changed between two stores without comparing their strings
+
+Rows are kept in the order they were read from the CSV files and a sorted
+PrefixIndex over the keys resolves MAC addresses to rows. Records are returned
+as lightweight OuiRecord views that read the columns on demand.
+
+The columns are only required to support indexing, so a store built from CSV
+files holds arrays while a store opened from a snapshot (see snapshot.py) holds
+memoryviews over the mapped file.
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import sys
+import hashlib
+import threading
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from .registries import REGISTRIES
+from .prefixIndex import PrefixIndex, packAssignment, unpackAssignment
+
+REGISTRY = "Registry"
+ASSIGNMENT = "Assignment"
+ORGANIZATION_NAME = "Organization Name"
+ORGANIZATION_ADDRESS = "Organization Address"
+FIELDS: tuple[str, ...] = (
+    REGISTRY,
+    ASSIGNMENT,
+    ORGANIZATION_NAME,
+    ORGANIZATION_ADDRESS,
+)
+
+# registry code 0 is reserved so a zero byte never names a registry
+_REGISTRY_NAMES: tuple[str, ...] = ("",) + tuple(r.name for r in REGISTRIES)
+
+
+def recordHash(registry: str, organizationName: str, organizationAddress: str) -> int:
+    """Returns a 64 bit hash of the fields of a block, other than its assignment"""
+    digest: bytes = hashlib.blake2b(
+        f"{registry}\x1f{organizationName}\x1f{organizationAddress}".encode("utf-8"),
+        digest_size=8,
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+class StringHeap(Sequence):
+    """A read-only sequence of strings held as offsets into a single UTF-8 blob
+
+    Strings are decoded when they are read, so the heap can be a memoryview over
+    a mapped file without decoding it up front.
+    """
+
+    __slots__ = ("_offsets", "_heap")
+
+    def __init__(self, offsets: Sequence[int], heap: bytes | memoryview) -> None:
+        self._offsets: Sequence[int] = offsets
+        self._heap: bytes | memoryview = heap
+
+    @classmethod
+    def fromStrings(cls, strings: Iterable[str]) -> "StringHeap":
+        """Returns a heap holding some strings"""
+        offsets: array = array("I", [0])
+        encoded: list[bytes] = []
+        for string in strings:
+            encoded.append(string.encode("utf-8"))
+            offsets.append(offsets[-1] + len(encoded[-1]))
+        return cls(offsets, b"".join(encoded))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return str(self._heap[self._offsets[index] : self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.__getitem__, range(len(self)))
+
+    def offsets(self) -> Sequence[int]:
+        """Returns the offset of every string into the heap, and the heap's length"""
+        return self._offsets
+
+    def heap(self) -> bytes | memoryview:
+        """Returns the UTF-8 blob holding the strings"""
+        return self._heap
+
+
+class OuiStore:
+    """The IEEE OUI database in columnar form
+
+    Attributes:
+    - sources (tuple[str, ...]): The names of the registries the store was built from
+
+    Methods:
+    - lookup(mac: int, knownBits: int): Returns the row of the most specific block
+        containing a MAC address
+    - find(assignment: str): Returns the row of an assignment
+    - registry(row: int): Returns the registry of a row
+    - assignment(row: int): Returns the assignment of a row
+    - organizationName(row: int): Returns the organization name of a row
+    - organizationAddress(row: int): Returns the organization address of a row
+    - record(row: int): Returns a record view of a row
+    - toDict(): Returns the store as a dictionary of dictionaries
+    - derived(name: Hashable, build: Callable): Returns a structure derived from the
+        store, building it on first use
+    """
+
+    __slots__ = (
+        "sources",
+        "_registryNames",
+        "_registries",
+        "_keys",
+        "_names",
+        "_nameTable",
+        "_addressOffsets",
+        "_addresses",
+        "_hashes",
+        "_index",
+        "_derived",
+        "_derivedLock",
+    )
+
+    def __init__(
+        self,
+        sources: tuple[str, ...],
+        registryNames: tuple[str, ...],
+        registries: bytearray | memoryview,
+        keys: Sequence[int],
+        names: Sequence[int],
+        nameTable: Sequence[str],
+        addressOffsets: Sequence[int],
+        addresses: bytes | memoryview,
+        hashes: Sequence[int],
+        index: PrefixIndex | None = None,
+    ) -> None:
+        self.sources: tuple[str, ...] = sources
+        self._registryNames: tuple[str, ...] = registryNames
+        self._registries: bytearray | memoryview = registries
+        self._keys: Sequence[int] = keys
+        self._names: Sequence[int] = names
+        self._nameTable: Sequence[str] = nameTable
+        self._addressOffsets: Sequence[int] = addressOffsets
+        self._addresses: bytes | memoryview = addresses
+        self._hashes: Sequence[int] = hashes
+        self._index: PrefixIndex = PrefixIndex(keys) if index is None else index
+        self._derived: dict[Hashable, Any] = {}
+        # reentrant, a structure may be derived from another one
+        self._derivedLock: threading.RLock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, mac: int, knownBits: int = 48) -> int:
+        """Returns the row of the most specific block containing a MAC address
+
+        Args:
+            mac (int): The 48 bit integer value of the MAC address
+            knownBits (int, optional): How many leading bits of the MAC address are
+                known. Defaults to 48.
+
+        Returns:
+            int: The row of the block
+
+        Raises:
+            KeyError: If no block contains the MAC address
+        """
+        return self._index.lookup(mac=mac, knownBits=knownBits)
+
+    def find(self, assignment: str) -> int:
+        """Returns the row of an assignment
+
+        Args:
+            assignment (str): The assignment in hex without delimiters
+
+        Returns:
+            int: The row of the assignment
+
+        Raises:
+            KeyError: If the assignment is not in the store
+        """
+        try:
+            return self._index.find(packAssignment(assignment))
+        except ValueError:
+            raise KeyError(assignment) from None
+
+    def registry(self, row: int) -> str:
+        """Returns the registry of a row"""
+        return self._registryNames[self._registries[row]]
+
+    def registryCode(self, registry: str) -> int:
+        """Returns the one byte code of a registry, or 0 if no row uses it"""
+        try:
+            return self._registryNames.index(registry, 1)
+        except ValueError:
+            return 0
+
+    def assignment(self, row: int) -> str:
+        """Returns the assignment of a row"""
+        return unpackAssignment(self._keys[row])
+
+    def organizationName(self, row: int) -> str:
+        """Returns the organization name of a row"""
+        return self._nameTable[self._names[row]]
+
+    def organizationAddress(self, row: int) -> str:
+        """Returns the organization address of a row"""
+        offsets: Sequence[int] = self._addressOffsets
+        return str(self._addresses[offsets[row] : offsets[row + 1]], "utf-8")
+
+    def record(self, row: int) -> "OuiRecord":
+        """Returns a record view of a row"""
+        return OuiRecord(self, row)
+
+    def rows(self) -> range:
+        """Returns the rows of the store in the order they were read"""
+        return range(len(self._keys))
+
+    def keys(self) -> Sequence[int]:
+        """Returns the packed key of every row"""
+        return self._keys
+
+    def hashes(self) -> Sequence[int]:
+        """Returns the record hash of every row, see recordHash()"""
+        return self._hashes
+
+    def nameIds(self) -> Sequence[int]:
+        """Returns the organization name id of every row"""
+        return self._names
+
+    def nameTable(self) -> Sequence[str]:
+        """Returns the interned organization names indexed by name id"""
+        return self._nameTable
+
+    def registryCodes(self) -> bytearray | memoryview:
+        """Returns the registry code of every row"""
+        return self._registries
+
+    def registryNames(self) -> tuple[str, ...]:
+        """Returns the registry names indexed by registry code"""
+        return self._registryNames
+
+    def addressHeap(self) -> StringHeap:
+        """Returns the organization addresses indexed by row"""
+        return StringHeap(self._addressOffsets, self._addresses)
+
+    def prefixIndex(self) -> PrefixIndex:
+        """Returns the index resolving packed keys and MAC addresses to rows"""
+        return self._index
+
+    def derived(self, name: Hashable, build: Callable[["OuiStore"], Any]) -> Any:
+        """Returns a structure derived from the store, building it on first use
+
+        Args:
+            name (Hashable): The name the structure is cached under
+            build (Callable[[OuiStore], Any]): Builds the structure from the store
+
+        Returns:
+            Any: The structure, built once for the life of the store
+
+        Note:
+            Threads asking for a structure while it is being built wait for it
+            rather than building it again.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._derivedLock:
+            try:
+                return self._derived[name]
+            except KeyError:
+                value = self._derived[name] = build(self)
+                return value
+
+    def toDict(self) -> dict[str, dict[str, str]]:
+        """Returns the store as a dictionary of dictionaries keyed by assignment"""
+        return {self.assignment(row): dict(self.record(row)) for row in self.rows()}
+
+
+class OuiRecord(Mapping):
+    """A read-only view of one row of an OuiStore
+
+    Behaves like the dictionary previously returned for an assignment, with the
+    keys "Registry", "Assignment", "Organization Name" and "Organization Address".
+    """
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: OuiStore, row: int) -> None:
+        self._store: OuiStore = store
+        self._row: int = row
+
+    def __getitem__(self, field: str) -> str:
+        try:
+            return _FIELD_GETTERS[field](self._store, self._row)
+        except (KeyError, TypeError):
+            raise KeyError(field) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    @property
+    def registry(self) -> str:
+        return self._store.registry(self._row)
+
+    @property
+    def assignment(self) -> str:
+        return self._store.assignment(self._row)
+
+    @property
+    def organizationName(self) -> str:
+        return self._store.organizationName(self._row)
+
+    @property
+    def organizationAddress(self) -> str:
+        return self._store.organizationAddress(self._row)
+
+
+_FIELD_GETTERS = {
+    REGISTRY: OuiStore.registry,
+    ASSIGNMENT: OuiStore.assignment,
+    ORGANIZATION_NAME: OuiStore.organizationName,
+    ORGANIZATION_ADDRESS: OuiStore.organizationAddress,
+}
+
+
+class OuiStoreBuilder:
+    """Builds an OuiStore one CSV row at a time
+
+    Methods:
+    - add(registry: str, assignment: str, organizationName: str,
+        organizationAddress: str): Adds a row, replacing an earlier row with the
+        same assignment
+    - build(sources: tuple[str, ...]): Returns the OuiStore
+    """
+
+    def __init__(self) -> None:
+        self._registryNames: list[str] = list(_REGISTRY_NAMES)
+        self._registries: bytearray = bytearray()
+        self._keys: array = array("Q")
+        self._names: array = array("I")
+        self._nameIds: dict[str, int] = {}
+        self._nameTable: list[str] = []
+        self._addresses: list[bytes] = []
+        self._hashes: array = array("Q")
+        self._rowOfKey: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(
+        self,
+        registry: str,
+        assignment: str,
+        organizationName: str,
+        organizationAddress: str,
+    ) -> None:
+        """Adds a row to the store
+
+        Args:
+            registry (str): The registry of the block
+            assignment (str): The assignment of the block in hex without delimiters
+            organizationName (str): The name of the organization
+            organizationAddress (str): The address of the organization
+
+        Raises:
+            ValueError: If the assignment is not a 24, 28 or 36 bit hex prefix
+        """
+        key: int = packAssignment(assignment)
+
+        if registry not in self._registryNames:
+            if len(self._registryNames) > 255:
+                raise ValueError(f"Too many registries to add: {registry}")
+            self._registryNames.append(registry)
+        registryCode: int = self._registryNames.index(registry)
+
+        nameId: int | None = self._nameIds.get(organizationName)
+        if nameId is None:
+            nameId = self._nameIds[organizationName] = len(self._nameTable)
+            self._nameTable.append(sys.intern(organizationName))
+
+        address: bytes = organizationAddress.encode("utf-8")
+        rowHash: int = recordHash(registry, organizationName, organizationAddress)
+
+        # a repeated assignment replaces the earlier row in place
+        row: int | None = self._rowOfKey.get(key)
+        if row is not None:
+            self._registries[row] = registryCode
+            self._names[row] = nameId
+            self._addresses[row] = address
+            self._hashes[row] = rowHash
+            return
+
+        self._rowOfKey[key] = len(self._keys)
+        self._registries.append(registryCode)
+        self._keys.append(key)
+        self._names.append(nameId)
+        self._addresses.append(address)
+        self._hashes.append(rowHash)
+
+    def build(self, sources: tuple[str, ...] = ()) -> OuiStore:
+        """Returns the OuiStore holding every row added so far
+
+        Args:
+            sources (tuple[str, ...], optional): The names of the registries the rows
+                were read from. Defaults to ().
+
+        Returns:
+            OuiStore: The columnar store
+        """
+        addressOffsets: array = array("I", [0])
+        offset: int = 0
+        for address in self._addresses:
+            offset += len(address)
+            addressOffsets.append(offset)
+
+        return OuiStore(
+            sources=tuple(sources),
+            registryNames=tuple(self._registryNames),
+            registries=self._registries,
+            keys=self._keys,
+            names=self._names,
+            nameTable=self._nameTable,
+            addressOffsets=addressOffsets,
+            addresses=b"".join(self._addresses),
+            hashes=self._hashes,
+        )
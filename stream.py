@@ -0,0 +1,279 @@
+"""
+Description: Streams the lookups of MAC addresses read from files or stdin.
+
+The lookup, isiot and search commands of the command line write one result per
+line as CSV, TSV or NDJSON. MAC addresses are read, answered and written in
+chunks of CHUNK_SIZE lines, so memory stays bounded whatever the size of the
+input and the first results are written before the input is read to the end.
+
+With several jobs the chunks are answered and formatted by worker processes
+forked from the loaded database, so they share its pages and load nothing.
+At most two chunks per worker are in flight and the results are written in the
+order of the input.
+
+    python -m NG_OUI_DB lookup macs.txt --format ndjson --jobs 8 > vendors.ndjson
+
+Copyright: (c) 2024 Anthony Tropeano
+"""
+
+import io
+import os
+import fileinput
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence, TextIO
+
+from NG_OUI_DB import UNKNOWN, IeeOuiDb, getSharedDb, lookupResult
+from .store import FIELDS
+from .query import And, ByIoT, ByOrganization, ByRegistry, Predicate
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import AsyncResult
+
+CSV = "csv"
+TSV = "tsv"
+NDJSON = "ndjson"
+FORMATS: tuple[str, ...] = (CSV, TSV, NDJSON)
+
+LOOKUP = "lookup"
+ISIOT = "isiot"
+
+# the columns written by each command
+LOOKUP_COLUMNS: tuple[str, ...] = ("mac",) + FIELDS + ("isIoT",)
+ISIOT_COLUMNS: tuple[str, ...] = ("mac", "isIoT")
+SEARCH_COLUMNS: tuple[str, ...] = FIELDS
+
+# the number of MAC addresses answered and written at a time
+CHUNK_SIZE = 10_000
+
+_DELIMITERS: dict[str, str] = {CSV: ",", TSV: "\t"}
+
+# the database of a worker process, inherited from the parent at the fork
+_workerDatabase: IeeOuiDb | None = None
+
+
+def readMacs(fileNames: Sequence[str] = ()) -> Iterator[str]:
+    """Yields the MAC addresses of files, one per line
+
+    Args:
+        fileNames (Sequence[str], optional): The files to read in order, "-" for
+            stdin. Defaults to (), reading stdin.
+
+    Yields:
+        str: Every line that is not blank, stripped
+    """
+    with fileinput.input(
+        fileNames or ("-",), encoding="utf-8", errors="replace"
+    ) as lines:
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def streamMacs(
+    command: str,
+    macs: Iterable[str],
+    output: TextIO,
+    format: str = CSV,
+    jobs: int = 1,
+    database: IeeOuiDb | None = None,
+    chunkSize: int = CHUNK_SIZE,
+) -> int:
+    """Writes the answer of a command for every MAC address
+
+    Args:
+        command (str): LOOKUP for the organization of every MAC address, or
+            ISIOT for whether it belongs to a suspected IoT manufacturer
+        macs (Iterable[str]): The MAC addresses, such as readMacs() yields
+        output (TextIO): The stream the results are written to
+        format (str, optional): CSV, TSV or NDJSON. Defaults to CSV.
+        jobs (int, optional): The number of worker processes. Defaults to 1,
+            answering in this process.
+        database (IeeOuiDb | None, optional): Initialized DB. Defaults to None,
+            using the database shared by the process.
+        chunkSize (int, optional): The MAC addresses answered and written at a
+            time. Defaults to CHUNK_SIZE.
+
+    Returns:
+        int: The number of MAC addresses answered
+
+    Raises:
+        ValueError: If the command or format is unknown, or several jobs are
+            asked for on a platform without fork()
+
+    Note:
+        A MAC address that is invalid or not assigned is written with every
+        field "Unknown" in CSV and TSV, and with an "error" in NDJSON, as the
+        batch endpoint of the HTTP service answers it.
+    """
+    if command not in (LOOKUP, ISIOT):
+        raise ValueError(f"Unknown command {command!r}, expected {LOOKUP} or {ISIOT}")
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}, expected one of {FORMATS}")
+    if jobs > 1 and not hasattr(os, "fork"):
+        raise ValueError("Several jobs need os.fork(), run with jobs=1")
+
+    database = getSharedDb() if database is None else database
+    database.load()
+    if format != NDJSON:
+        columns = LOOKUP_COLUMNS if command == LOOKUP else ISIOT_COLUMNS
+        output.write(_formatRows([columns], format))
+
+    chunks: Iterator[list[str]] = _chunks(macs, chunkSize)
+    count: int = 0
+    if jobs <= 1:
+        for chunk in chunks:
+            output.write(_answerChunk(database, command, format, chunk))
+            count += len(chunk)
+        return count
+
+    # no background writer may be running at the fork, the workers would not
+    # inherit it and the parent would not know when its files are complete
+    database.waitForArtifacts()
+    import multiprocessing
+
+    context = multiprocessing.get_context("fork")
+    with context.Pool(jobs, initializer=_initWorker, initargs=(database,)) as pool:
+        pending: deque[tuple[int, "AsyncResult"]] = deque()
+        for chunk in chunks:
+            pending.append(
+                (
+                    len(chunk),
+                    pool.apply_async(_answerInWorker, (command, format, chunk)),
+                )
+            )
+            if len(pending) >= 2 * jobs:
+                count += _writeOldest(pending, output)
+        while pending:
+            count += _writeOldest(pending, output)
+    return count
+
+
+def streamSearch(
+    output: TextIO,
+    organization: str | None = None,
+    registry: str | None = None,
+    iot: bool = False,
+    limit: int | None = None,
+    format: str = CSV,
+    database: IeeOuiDb | None = None,
+) -> int:
+    """Writes the organizations matching every given filter
+
+    Args:
+        output (TextIO): The stream the results are written to
+        organization (str | None, optional): A string the organization name
+            contains, ignoring case. Defaults to None.
+        registry (str | None, optional): The name of the registry. Defaults to
+            None.
+        iot (bool, optional): Only suspected IoT manufacturers. Defaults to
+            False.
+        limit (int | None, optional): The most organizations written. Defaults
+            to None, every one.
+        format (str, optional): CSV, TSV or NDJSON. Defaults to CSV.
+        database (IeeOuiDb | None, optional): Initialized DB. Defaults to None,
+            using the database shared by the process.
+
+    Returns:
+        int: The number of organizations written
+
+    Raises:
+        ValueError: If no filter is given or the format is unknown
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}, expected one of {FORMATS}")
+    predicates: list[Predicate] = []
+    if organization:
+        predicates.append(ByOrganization(organization))
+    if registry:
+        predicates.append(ByRegistry(registry))
+    if iot:
+        predicates.append(ByIoT())
+    if not predicates:
+        raise ValueError("Expected an organization, registry or iot filter")
+
+    import json
+
+    database = getSharedDb() if database is None else database
+    records = database.query(And(*predicates))[:limit]
+    if format != NDJSON:
+        output.write(_formatRows([SEARCH_COLUMNS], format))
+    for start in range(0, len(records), CHUNK_SIZE):
+        chunk = records[start : start + CHUNK_SIZE]
+        if format == NDJSON:
+            output.write("".join(json.dumps(dict(record)) + "\n" for record in chunk))
+        else:
+            output.write(
+                _formatRows(([record[f] for f in FIELDS] for record in chunk), format)
+            )
+    return len(records)
+
+
+def _chunks(macs: Iterable[str], chunkSize: int) -> Iterator[list[str]]:
+    """Yields the MAC addresses in lists of at most chunkSize"""
+    iterator: Iterator[str] = iter(macs)
+    while chunk := list(islice(iterator, max(chunkSize, 1))):
+        yield chunk
+
+
+def _writeOldest(pending: deque[tuple[int, "AsyncResult"]], output: TextIO) -> int:
+    """Writes the answer of the oldest chunk in flight, waiting for it if needed"""
+    count, result = pending.popleft()
+    output.write(result.get())
+    return count
+
+
+def _initWorker(database: IeeOuiDb) -> None:
+    global _workerDatabase
+    _workerDatabase = database
+
+
+def _answerInWorker(command: str, format: str, chunk: list[str]) -> str:
+    return _answerChunk(_workerDatabase, command, format, chunk)
+
+
+def _answerChunk(
+    database: IeeOuiDb, command: str, format: str, chunk: list[str]
+) -> str:
+    """Returns the formatted answers of a chunk of MAC addresses"""
+    if command == ISIOT:
+        results: list[dict[str, Any]] = [
+            {"mac": mac, "isIoT": database.isIoT(mac)} for mac in chunk
+        ]
+    else:
+        results = [lookupResult(database, mac) for mac in chunk]
+
+    if format == NDJSON:
+        import json
+
+        return "".join(json.dumps(result) + "\n" for result in results)
+    columns = LOOKUP_COLUMNS if command == LOOKUP else ISIOT_COLUMNS
+    return _formatRows(
+        (
+            [
+                _cell(result.get(column, False if column == "isIoT" else UNKNOWN))
+                for column in columns
+            ]
+            for result in results
+        ),
+        format,
+    )
+
+
+def _cell(value: Any) -> Any:
+    """Returns a value as written to CSV, booleans as in JSON"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _formatRows(rows: Iterable[Sequence[Any]], format: str) -> str:
+    """Returns rows as CSV or TSV lines"""
+    import csv
+
+    buffer: io.StringIO = io.StringIO()
+    csv.writer(buffer, delimiter=_DELIMITERS[format], lineterminator="\n").writerows(
+        rows
+    )
+    return buffer.getvalue()
@@ -0,0 +1,78 @@
+import pytest
+
+import NG_OUI_DB
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.registries import Registry
+from NG_OUI_DB.store import OuiStoreBuilder
+
+HEADER = "Registry,Assignment,Organization Name,Organization Address\n"
+ROWS = (
+    'MA-L,D8EC5E,Belkin International Inc.,"Playa Vista CA US 90094"\n'
+    'MA-L,0055DA,IEEE Registration Authority,"Piscataway NJ US 08554"\n'
+    'MA-M,0055DA1,Shinko Technos co.,ltd.,"Osaka JP 550-0012"\n'
+    'MA-L,D4F547,Tuya Smart Inc.,"Hangzhou CN 310000"\n'
+)
+
+
+@pytest.fixture
+def cacheFile(tmp_path, monkeypatch):
+    """Keeps the cache files of the test away from the real database"""
+    fileName = str(tmp_path / "cache.csv")
+    monkeypatch.setattr(NG_OUI_DB, "CSV_FILE_NAME", fileName)
+    return fileName
+
+
+@pytest.fixture
+def csvRows():
+    """The rows of the CSV file of the registry, a module or test may override it"""
+    return ROWS
+
+
+@pytest.fixture
+def registry(tmp_path, cacheFile, csvRows):
+    """A registry whose CSV file holds the csvRows, its URL is never reachable"""
+    fileName = tmp_path / "oui.csv"
+    fileName.write_text(HEADER + csvRows)
+    return Registry("MA-L", "http://127.0.0.1:9/oui.csv", str(fileName))
+
+
+@pytest.fixture
+def db(registry):
+    """The database of the registry, without artifacts"""
+    return IeeOuiDb(registries=(registry,), artifacts=())
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Returns a function answering every later download: with a status, with
+    rows written to the CSV file in place of its own, or by default with the CSV
+    file as it is, as if it was downloaded again
+    """
+
+    def answer(rows=None, status=None):
+        def download(self, url, fileName, ingest=None):
+            if status is not None:
+                return status
+            if rows is not None:
+                with open(fileName, "w") as file:
+                    file.write(HEADER + rows)
+            return fileName
+
+        monkeypatch.setattr(IeeOuiDb, "_getIeeOuiDbAsCsv", download)
+
+    return answer
+
+
+@pytest.fixture
+def buildStore():
+    """Returns a function building a store from (registry, assignment, name,
+    address) rows
+    """
+
+    def build(rows, sources=()):
+        builder = OuiStoreBuilder()
+        for registry, assignment, name, address in rows:
+            builder.add(registry, assignment, name, address)
+        return builder.build(sources=sources)
+
+    return build
@@ -48,6 +48,12 @@ def test_getDb():
     assert type(_db) is dict
 
 
+def test_dbDictIsBuiltOncePerStore():
+    assert db.dbDict is db.dbDict
+    assert db.dbDict == db.getDb()
+    assert db.getDb() is not db.dbDict
+
+
 def test_getDbUrl():
     _url: str = db.getDbUrl()
 
@@ -76,6 +82,14 @@ def test_getRegistry():
         assert db.getRegistry(key) == sampleData[key]["Registry"]
 
 
+def test_getRegistryLongestPrefix():
+    # 70-B3-D5 is split into MA-S blocks, so the MA-L entry must not be returned
+    assert db.getRegistry("70:B3:D5:00:10:00") == "MA-S"
+    assert db.getOrganizationName("70:B3:D5:00:10:00") != "IEEE Registration Authority"
+    # when only the OUI is given the MA-L entry is the most specific match
+    assert db.getRegistry("70:B3:D5") == "MA-L"
+
+
 def test_getOrganization():
     for key in sampleData:
         assert db.getOrganization(key) == {
@@ -117,6 +131,7 @@ def test_getOrganizationsMacCountByAssignment():
     assert db.getOrganizationsMacCountByAssignment("000000") == 1
     assert db.getOrganizationsMacCountByAssignment("501AC5") == 1
     assert db.getOrganizationsMacCountByAssignment("709E29") == 1
+    assert db.getOrganizationsMacCountByAssignment(" 00000") == 0
 
 
 def test_getOrganizationsMacCountByRegistry():
@@ -126,6 +141,8 @@ def test_getOrganizationsMacCountByRegistry():
 def test_getOrganizationsByAssignment():
     assert db.getOrganizationsByAssignment("000000") == ["XEROX CORPORATION"]
     assert db.getOrganizationsByAssignment("501AC5") == ["Microsoft"]
+    assert db.getOrganizationsByAssignment("0x0000") == []
+    assert db.getOrganizationsByAssignment("0_0000") == []
     assert db.getOrganizationsByAssignment("709E29") == [
         "Sony Interactive Entertainment Inc."
     ]
@@ -185,3 +202,11 @@ def test_getOrganizationsByOrganizationAssignmentAndRegistry():
     for org in orgs:
         assert org["Assignment"] == "000000"
         assert org["Organization Name"].lower() == "XEROX CORPORATION".lower()
+
+
+def test_summary():
+    summary = db.summary()
+    assert summary["Records"] == db.getOrganizationsMacCount()
+    assert summary["Organizations"] == db.getOrganizationsCount()
+    assert summary["Registry"]["MA-L"] == db.getOrganizationsMacCountByRegistry("MA-L")
+    assert summary["Organization Name"]["XEROX CORPORATION"] >= 1
@@ -0,0 +1,59 @@
+import pytest
+
+from NG_OUI_DB.aggregates import OuiAggregates
+
+rows = [
+    ("MA-L", "000000", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("MA-M", "0055DA1", "Shinko Technos co.,ltd.", "Osaka JP"),
+    ("MA-L", "000001", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("IAB", "0050C2000", "T.L.S. Corp.", "Cleveland OH US 44122"),
+    ("MA-L", "0055DA", "IEEE Registration Authority", "Piscataway NJ US 08554"),
+]
+
+
+@pytest.fixture
+def aggregates(buildStore):
+    return OuiAggregates(buildStore(rows))
+
+
+def test_registryRows(aggregates):
+
+    assert list(aggregates.registryRows("MA-L")) == [0, 2, 4]
+    assert list(aggregates.registryRows("MA-M")) == [1]
+    assert list(aggregates.registryRows("MA-S")) == []
+    assert list(aggregates.registryRows("Unknown")) == []
+    assert aggregates.registryCount("MA-L") == 3
+    assert aggregates.registryCount("Unknown") == 0
+
+
+def test_nameRows(aggregates):
+
+    # XEROX CORPORATION is the first interned name
+    assert list(aggregates.nameRows(0)) == [0, 2]
+    assert aggregates.nameCount(0) == 2
+    assert aggregates.organizations() == (
+        "IEEE Registration Authority",
+        "Shinko Technos co.,ltd.",
+        "T.L.S. Corp.",
+        "XEROX CORPORATION",
+    )
+
+
+def test_replacedNameIsNotAnOrganization(buildStore):
+    aggregates = OuiAggregates(
+        buildStore(
+            [("MA-L", "000000", "Old Name", ""), ("MA-L", "000000", "New Name", "")]
+        )
+    )
+
+    assert aggregates.organizations() == ("New Name",)
+
+
+def test_summary(aggregates):
+    summary = aggregates.summary()
+
+    assert summary["Records"] == 5
+    assert summary["Organizations"] == 4
+    assert summary["Registry"] == {"MA-L": 3, "MA-M": 1, "MA-S": 0, "IAB": 1, "CID": 0}
+    assert summary["Organization Name"]["XEROX CORPORATION"] == 2
+    assert "Old Name" not in summary["Organization Name"]
@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.artifacts import (
+    ArtifactWriter,
+    artifactFileName,
+    writeJson,
+    writeNdjson,
+)
+
+rows = [
+    ("MA-L", "000000", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("MA-M", "0055DA1", "Shinko Technos co.,ltd.", 'Ōsaka "JP"'),
+]
+
+
+@pytest.fixture
+def store(buildStore):
+    return buildStore(rows)
+
+
+def test_artifactFileName():
+    assert artifactFileName("/data/iee_oui.csv", "binary") == "/data/iee_oui.snapshot"
+    assert artifactFileName("/data/iee_oui.csv", "json") == "/data/iee_oui.json"
+    assert artifactFileName("/data/iee_oui.csv", "ndjson") == "/data/iee_oui.ndjson"
+
+
+@pytest.mark.parametrize("storeRows", [rows, []])
+def test_writeJson(tmp_path, buildStore, storeRows):
+    store = buildStore(storeRows)
+    fileName = str(tmp_path / "iee_oui.json")
+    writeJson(store, fileName)
+
+    # streamed record by record, the file is the same as dumping the dictionary
+    with open(fileName, encoding="utf-8") as file:
+        assert file.read() == json.dumps(store.toDict(), indent=4)
+
+
+def test_writeNdjson(tmp_path, store):
+    fileName = str(tmp_path / "iee_oui.ndjson")
+    writeNdjson(store, fileName)
+
+    with open(fileName, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert records == list(store.toDict().values())
+
+
+def test_artifactWriter(tmp_path, store):
+    baseFileName = str(tmp_path / "iee_oui.csv")
+    writer = ArtifactWriter(["ndjson", "binary", "ndjson"])
+    assert writer.artifacts == ("ndjson", "binary")
+
+    futures = writer.submit(store, baseFileName)
+    assert writer.wait(timeout=10)
+    assert all(future.exception() is None for future in futures)
+    assert sorted(os.listdir(tmp_path)) == ["iee_oui.ndjson", "iee_oui.snapshot"]
+
+
+def test_noArtifacts(tmp_path, store):
+    writer = ArtifactWriter(())
+    assert writer.submit(store, str(tmp_path / "iee_oui.csv")) == []
+    assert writer.wait(timeout=0)
+    assert os.listdir(tmp_path) == []
+
+
+def test_unknownArtifact():
+    with pytest.raises(ValueError):
+        ArtifactWriter(["xml"])
+
+
+@pytest.mark.parametrize(
+    "csvRows", ['MA-L,000000,XEROX CORPORATION,"M/S 105-50C WEBSTER NY US 14580"\n']
+)
+def test_configuredArtifacts(tmp_path, registry):
+    db = IeeOuiDb(registries=(registry,), artifacts=("ndjson",))
+    assert db.getOrganizationName("00:00:00") == "XEROX CORPORATION"
+    assert db.waitForArtifacts(timeout=10)
+    assert sorted(os.listdir(tmp_path)) == ["cache.ndjson", "oui.csv"]
@@ -0,0 +1,145 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.asyncIeeOuiDb import AsyncIeeOuiDb
+from NG_OUI_DB.query import ByIoT, ByRegistry
+
+TELINK = 'MA-L,A4C138,Telink Smart Co.,"Shanghai CN"\n'
+
+
+def test_open_buildsInExecutor(registry):
+    async def main():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(1) as executor:
+            database = await AsyncIeeOuiDb.open(
+                registries=(registry,), artifacts=(), executor=executor
+            )
+            # the database was built off the loop and is ready for lookups
+            assert isinstance(database.database, IeeOuiDb)
+            assert executor._threads
+            assert loop.is_running()
+            return database
+
+    database = asyncio.run(main())
+    assert database.database.getOrganizationsCount() == 4
+
+
+def test_lookups(registry):
+    async def main():
+        database = await AsyncIeeOuiDb.open(registries=(registry,), artifacts=())
+        assert await database.getOrganizationName("d8:ec:5e:12:34:56") == (
+            "Belkin International Inc."
+        )
+        assert await database.getRegistry("0055.da12.3456") == "MA-M"
+        assert await database.getAssignment(0xD4F547000001) == "D4F547"
+        assert await database.getOrganizationAddress("ff:ff:ff:ff:ff:ff") == ("Unknown")
+        assert (await database.getOrganization("D8EC5E"))["Registry"] == "MA-L"
+        assert await database.isIoT("d4:f5:47:00:00:01")
+        assert not await database.isIoT("0055.da12.3456")
+
+    asyncio.run(main())
+
+
+def test_batchLookups_yieldBetweenChunks(registry):
+    macs = ["d8:ec:5e:12:34:56", "0055da123456", "not a mac", "d4f547000001"] * 5
+
+    async def main():
+        database = await AsyncIeeOuiDb.open(
+            registries=(registry,), artifacts=(), chunkSize=4
+        )
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        names = await database.getOrganizationNames(macs)
+        task.cancel()
+
+        assert names[:4] == [
+            "Belkin International Inc.",
+            "Shinko Technos co.",
+            "Unknown",
+            "Tuya Smart Inc.",
+        ]
+        assert len(names) == 20
+        # the loop ran the ticker between every chunk of 4 MAC addresses
+        assert ticks >= 5
+
+        assert await database.getRegistries(macs[:3]) == ["MA-L", "MA-M", "Unknown"]
+        assert await database.areIoT(macs[:4]) == [True, False, False, True]
+        records = await database.getOrganizationRecords(iter(macs[:2]))
+        assert [record["Assignment"] for record in records] == ["D8EC5E", "0055DA1"]
+
+    asyncio.run(main())
+
+
+def test_chunkSize_mustBePositive(db):
+    with pytest.raises(ValueError):
+        AsyncIeeOuiDb(db, chunkSize=0)
+
+
+def test_refresh_isAwaitable(registry, csvRows, downloads):
+    async def main():
+        database = await AsyncIeeOuiDb.open(registries=(registry,), artifacts=())
+        assert await database.isIoT("d4:f5:47:00:00:01")
+
+        downloads(rows=csvRows + TELINK)
+        changes = await database.refresh()
+
+        assert len(changes.added) == 1
+        assert await database.getOrganizationName("a4:c1:38:00:00:01") == (
+            "Telink Smart Co."
+        )
+        # the new database was classified by the refresh, not by the lookup
+        store = database.database._current
+        assert ("iotFlags", database.database.iotKeywords) in store._derived
+        assert await database.isIoT("a4:c1:38:00:00:01")
+
+    asyncio.run(main())
+
+
+def test_refresh_classifiesBeforeSwapping(db, csvRows, downloads):
+    downloads(rows=csvRows + TELINK)
+    classified = []
+    db.subscribe(
+        lambda changes: classified.append(
+            ("iotFlags", db.iotKeywords) in db._current._derived
+        )
+    )
+
+    assert db.refresh()
+    assert classified == [True]
+
+
+def test_queries_runInExecutor(registry):
+    async def main():
+        database = await AsyncIeeOuiDb.open(registries=(registry,), artifacts=())
+        records = await database.query(ByIoT() & ByRegistry("MA-L"))
+        assert [record["Assignment"] for record in records] == ["D8EC5E", "D4F547"]
+        assert await database.queryCount(ByRegistry("MA-M")) == 1
+        assert (await database.summary())["Records"] == 4
+        assert await database.run(database.database.getOrganizationsByRegistry, "MA-M")
+
+    asyncio.run(main())
+
+
+def test_lazy_loadsOffTheLoop(registry):
+    async def main():
+        database = AsyncIeeOuiDb(
+            IeeOuiDb(registries=(registry,), lazy=True, artifacts=())
+        )
+        assert database.database._current is None
+        await database.load()
+        assert database.database._current is not None
+        assert await database.waitForRefresh(timeout=5)
+        assert await database.getOrganizationName("d4f547000001") == ("Tuya Smart Inc.")
+
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from NG_OUI_DB import IeeOuiDb
+
+db = IeeOuiDb()
+
+macs = [
+    "00:00:00:00:00:00",
+    "50-1A-C5-12-34-56",
+    "709e.2912.3456",
+    "70:B3:D5:00:10:00",
+    "00:00:00",
+    "Not a MAC Address",
+    "",
+]
+
+
+def test_getOrganizationNames():
+    names = db.getOrganizationNames(macs)
+
+    assert len(names) == len(macs)
+    assert list(names) == [db.getOrganizationName(mac) for mac in macs]
+
+
+def test_getOrganizationNamesFromIntegers():
+    names = db.getOrganizationNames(np.array([0x000000000000, 0x501AC5123456]))
+
+    assert list(names) == ["XEROX CORPORATION", "Microsoft"]
+
+
+def test_getBatchFields():
+    assert list(db.getRegistries(macs)) == [db.getRegistry(mac) for mac in macs]
+    assert list(db.getAssignments(macs)) == [db.getAssignment(mac) for mac in macs]
+    assert list(db.getOrganizationAddresses(macs)) == [
+        db.getOrganizationAddress(mac) for mac in macs
+    ]
+    assert list(db.getOrganizationRecords(macs)) == [
+        db.getOrganization(mac) for mac in macs
+    ]
+
+
+def test_mixedNotations():
+    mixed = np.array(["00:00:00:00:00:00", "501AC5123456", "00-00-00-00-00-00"])
+
+    assert list(db.getOrganizationNames(mixed)) == [
+        "XEROX CORPORATION",
+        "Microsoft",
+        "XEROX CORPORATION",
+    ]
+
+
+def test_integersOutsideOf48BitsAreInvalid():
+    from NG_OUI_DB.batch import lookupRows, parseMacs
+
+    for macs in ([-1, 2**48 + 5], np.array([2**48, 2**64 - 1], dtype=np.uint64)):
+        values, knownBits = parseMacs(macs)
+        assert list(knownBits) == [0, 0]
+        assert list(lookupRows(db._store, macs)) == [-1, -1]
+
+
+def test_mixedObjectArrays():
+    from NG_OUI_DB.batch import parseMacs
+
+    integer, string = 0x501AC5123456, "50:1A:C5:12:34:56"
+    for macs in ([integer, string], [string, integer]):
+        values, knownBits = parseMacs(np.array(macs + [2**70, None], dtype=object))
+        assert list(values[:2]) == [integer, integer]
+        assert list(knownBits) == [48, 48, 0, 0]
+
+    names = db.getOrganizationNames(
+        np.array([string, integer, b"50:1A:C5:12:34:56"], dtype=object)
+    )
+    assert list(names) == ["Microsoft", "Microsoft", "Microsoft"]
+
+
+# every notation of normalizeMac() and getMacPrefix(), and some that are not
+NOTATIONS = [
+    "14:86:7b:00:00:00",
+    "14-86-7B-00-00-00",
+    "14.86.7b.00.00.00",
+    "14 86 7b 00 00 00",
+    "14867b000000",
+    "0x14867b000000",
+    "0X14867B000000",
+    "1486.7b00.0000",
+    "14867b-000000",
+    "14867b:000000",
+    "14:86:7b:0:0:0",
+    "0:0:0:12:34:56",
+    "0-0-0-12-34-56",
+    " 14:86:7b:00:00:00\n",
+    "14:86:7B:00:00:00:12",
+    "14:86:7b",
+    "14867b",
+    "14 86 7b",
+    "0x14867b",
+    "14:86:7b:00:00:0g",
+    "14_86_7b_00_00_00",
+    "\uff11\uff14867b000000",
+    "14867b\x00000000",
+    "",
+    b"14:86:7b:00:00:00",
+    b"14:86:7b",
+    b"\x14\x86\x7b\x00\x00\x00",
+    bytearray(b"14-86-7b-00-00-00"),
+    0x14867B000000,
+    np.uint64(0x501AC5123456),
+    True,
+    -1,
+    2**48,
+    1.5,
+    None,
+]
+
+
+@pytest.mark.parametrize("mac", NOTATIONS, ids=repr)
+def test_batchParsesAsTheScalarLookup(mac):
+    from NG_OUI_DB.batch import parseMacs
+    from NG_OUI_DB.utils import getMacPrefix
+
+    try:
+        expected = getMacPrefix(mac)
+    except (ValueError, TypeError):
+        expected = None
+    values, knownBits = parseMacs([mac])
+    assert (int(values[0]), int(knownBits[0])) == expected or (
+        expected is None and knownBits[0] == 0
+    )
+
+
+def test_batchAnswersAsTheScalarLookups():
+    strings = [mac for mac in NOTATIONS if isinstance(mac, str)]
+    for macs in (NOTATIONS, strings, np.array(strings), NOTATIONS[::-1] * 3):
+        assert list(db.getOrganizationNames(macs)) == [
+            db.getOrganizationName(mac) for mac in macs
+        ]
+        assert list(db.getAssignments(macs)) == [db.getAssignment(mac) for mac in macs]
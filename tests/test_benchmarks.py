@@ -0,0 +1,76 @@
+import csv
+
+import NG_OUI_DB
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.benchmarks.suite import (
+    BenchmarkResult,
+    compare,
+    loadBaseline,
+    measure,
+    runSuite,
+    saveBaseline,
+)
+from NG_OUI_DB.benchmarks.synthetic import registryRows, writeRegistries
+
+
+def test_writeRegistries(tmp_path):
+    registries = writeRegistries(str(tmp_path), scale=0.05)
+
+    assert [registry.name for registry in registries] == [
+        "MA-L",
+        "MA-M",
+        "MA-S",
+        "IAB",
+        "CID",
+    ]
+    with open(registries[1].fileName, newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0][0] == "Registry"
+    assert len(rows) - 1 == registryRows(0.05)["MA-M"]
+    assert all(len(row[1]) == 7 for row in rows[1:])
+
+    # the same scale and seed write the same files
+    again = writeRegistries(str(tmp_path / "again"), scale=0.05)
+    with open(again[1].fileName, newline="") as file:
+        assert list(csv.reader(file)) == rows
+
+    database = IeeOuiDb(registries=registries, artifacts=())
+    assert database.getOrganizationsMacCount() == sum(registryRows(0.05).values())
+
+
+def test_measure():
+    result = measure("sum", sum, [range(100)] * 50, operationsPerCall=100)
+
+    assert result.name == "sum"
+    assert result.calls == 50
+    assert 0 < result.p50 <= result.p95 <= result.p99
+    assert result.throughput > 0
+
+
+def test_runSuite_isOffline(tmp_path):
+    csvFileName = NG_OUI_DB.CSV_FILE_NAME
+    results = runSuite(scales=(0.02,), directory=str(tmp_path))
+
+    names = [result.name for result in results]
+    assert "0.02x/construction.cold" in names
+    assert "0.02x/search.getOrganizationsByOrganizationAssignmentAndRegistry" in names
+    assert "0.02x/iot.getIotManufacturers" in names
+    assert (tmp_path / "0.02x" / "iot_manufacturers.json").exists()
+    assert NG_OUI_DB.CSV_FILE_NAME == csvFileName
+
+
+def test_compare_withBaseline(tmp_path):
+    fileName = str(tmp_path / "baseline.json")
+    assert loadBaseline(fileName) == {}
+
+    before = BenchmarkResult("1x/lookup.single", 10, 1000.0, 8.0, 9.0, 10.0, 4096)
+    saveBaseline([before], fileName)
+    baseline = loadBaseline(fileName)
+    assert baseline["1x/lookup.single"]["p50"] == 8.0
+
+    assert compare([before._replace(p50=9.0)], baseline) == []
+    regressions = compare([before._replace(p50=12.0, peakMemory=8192)], baseline)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("1x/lookup.single p50")
+    # benchmarks missing from the baseline are not compared
+    assert compare([before._replace(name="10x/lookup.single")], baseline) == []
@@ -0,0 +1,62 @@
+import pytest
+
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.changes import diffStores
+
+XEROX = ("MA-L", "000000", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580")
+SHINKO = ("MA-M", "0055DA1", "Shinko Technos co.,ltd.", "Osaka JP")
+TLS = ("IAB", "0050C2000", "T.L.S. Corp.", "Cleveland OH US 44122")
+
+
+def test_noChanges(buildStore):
+    changes = diffStores(buildStore([XEROX, SHINKO]), buildStore([SHINKO, XEROX]))
+
+    assert not changes
+    assert len(changes) == 0
+
+
+def test_changes(buildStore):
+    moved = ("MA-M", "0055DA1", "Shinko Technos co.,ltd.", "Kyoto JP")
+    changes = diffStores(buildStore([XEROX, SHINKO]), buildStore([moved, TLS]))
+
+    assert len(changes) == 3
+    assert changes.assignments() == {
+        "added": ["0050C2000"],
+        "removed": ["000000"],
+        "modified": ["0055DA1"],
+    }
+    assert changes.removed[0]["Organization Name"] == "XEROX CORPORATION"
+    before, after = changes.modified[0]
+    assert before.organizationAddress == "Osaka JP"
+    assert after.organizationAddress == "Kyoto JP"
+
+
+@pytest.mark.parametrize("csvRows", ["MA-L,000000,XEROX CORPORATION,Webster\n"])
+def test_refresh(registry, downloads):
+
+    db = IeeOuiDb(registries=(registry,))
+    db.waitForArtifacts(timeout=10)
+    received = []
+    db.subscribe(received.append)
+
+    # nothing is due, the database and its indexes are kept
+    store = db._store
+    db.getOrganizationsCount()
+    assert not db.refresh()
+    assert db._store is store
+    assert received == []
+
+    downloads(rows="MA-L,000000,XEROX,Webster\nMA-L,501AC5,Microsoft,\n")
+    changes = db.refresh()
+
+    assert changes.assignments() == {
+        "added": ["501AC5"],
+        "removed": [],
+        "modified": ["000000"],
+    }
+    assert received == [changes]
+    assert db.getOrganizationName("50:1A:C5") == "Microsoft"
+
+    db.unsubscribe(received.append)
+    assert not db.refresh()
+    assert received == [changes]
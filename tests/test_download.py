@@ -0,0 +1,119 @@
+import gzip
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from NG_OUI_DB import IeeOuiDb, NO_UPDATED_NEEDED, FAILED_TO_GET_CSV_FILE
+from NG_OUI_DB.download import (
+    DOWNLOADED,
+    FAILED,
+    NOT_MODIFIED,
+    downloadFile,
+    metadataFileName,
+)
+
+BODY = b"Registry,Assignment,Organization Name,Organization Address\n" * 100
+ETAG = '"v1"'
+LAST_MODIFIED = "Tue, 24 Dec 2024 00:00:00 GMT"
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        Handler.requests.append(dict(self.headers))
+        if self.path == "/error":
+            self.send_response(500)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = BODY
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(BODY)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_downloadIsStreamedAndDecompressed(server, tmp_path):
+    fileName = str(tmp_path / "oui.csv")
+
+    assert downloadFile(f"{server}/oui.csv", fileName) == DOWNLOADED
+    with open(fileName, "rb") as file:
+        assert file.read() == BODY
+    assert "gzip" in Handler.requests[0]["Accept-Encoding"]
+    assert os.path.exists(metadataFileName(fileName))
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_unchangedFileIsNotModified(server, tmp_path):
+    fileName = str(tmp_path / "oui.csv")
+    downloadFile(f"{server}/oui.csv", fileName)
+    os.utime(fileName, (0, 0))
+
+    assert downloadFile(f"{server}/oui.csv", fileName) == NOT_MODIFIED
+    assert Handler.requests[1]["If-None-Match"] == ETAG
+    assert Handler.requests[1]["If-Modified-Since"] == LAST_MODIFIED
+    # the file is kept and its age restarts
+    with open(fileName, "rb") as file:
+        assert file.read() == BODY
+    assert time.time() - os.path.getmtime(fileName) < 60
+
+
+def test_validatorsOfAnotherUrlAreNotSent(server, tmp_path):
+    fileName = str(tmp_path / "oui.csv")
+    downloadFile(f"{server}/oui.csv", fileName)
+
+    assert downloadFile(f"{server}/other.csv", fileName) == DOWNLOADED
+    assert "If-None-Match" not in Handler.requests[1]
+
+
+def test_failedDownloadKeepsTheFile(server, tmp_path):
+    fileName = str(tmp_path / "oui.csv")
+    downloadFile(f"{server}/oui.csv", fileName)
+
+    assert downloadFile(f"{server}/error", fileName) == FAILED
+    assert downloadFile("http://127.0.0.1:9/oui.csv", fileName) == FAILED
+    with open(fileName, "rb") as file:
+        assert file.read() == BODY
+
+
+def test_getIeeOuiDbAsCsv(server, tmp_path):
+    fileName = str(tmp_path / "oui.csv")
+    db = IeeOuiDb.__new__(IeeOuiDb)
+
+    assert db._getIeeOuiDbAsCsv(f"{server}/oui.csv", fileName) == fileName
+    assert db._getIeeOuiDbAsCsv(f"{server}/oui.csv", fileName) == NO_UPDATED_NEEDED
+    assert len(Handler.requests) == 1
+
+    # an expired file that has not changed needs no update
+    os.utime(fileName, (0, 0))
+    assert db._getIeeOuiDbAsCsv(f"{server}/oui.csv", fileName) == NO_UPDATED_NEEDED
+
+    missing = str(tmp_path / "missing.csv")
+    assert db._getIeeOuiDbAsCsv(f"{server}/error", missing) == FAILED_TO_GET_CSV_FILE
@@ -0,0 +1,53 @@
+import struct
+
+import pytest
+
+from NG_OUI_DB.frames import FrameVendors, annotateFrame, annotateFrames
+from NG_OUI_DB.utils import macFromBuffer
+
+BROADCAST = bytes.fromhex("ffffffffffff")
+BELKIN = bytes.fromhex("d8ec5e123456")
+SHINKO = bytes.fromhex("0055da123456")
+
+
+def test_macFromBuffer():
+    assert macFromBuffer(SHINKO) == 0x0055DA123456
+    assert macFromBuffer(memoryview(b"\x00" + SHINKO), 1) == 0x0055DA123456
+    assert macFromBuffer(bytearray(BROADCAST)) == 0xFFFFFFFFFFFF
+
+    with pytest.raises(struct.error):
+        macFromBuffer(SHINKO, 1)
+
+
+def test_getOrganizationFromBuffer(db):
+    capture = memoryview(b"\x00\x00" + BELKIN + SHINKO)
+
+    assert db.getOrganizationFromBuffer(capture, 2)["Organization Name"] == (
+        "Belkin International Inc."
+    )
+    # the most specific block, not the MA-L block enclosing it
+    assert db.getOrganizationFromBuffer(capture, 8)["Registry"] == "MA-M"
+    assert db.getOrganizationFromBuffer(BROADCAST) == "Unknown"
+
+
+def test_annotateFrame(db):
+    frame = memoryview(BROADCAST + BELKIN + b"\x08\x00" + bytes(46))
+
+    vendors = annotateFrame(frame, fromDatabase=db)
+    assert isinstance(vendors, FrameVendors)
+    assert vendors.source["Assignment"] == "D8EC5E"
+    assert vendors.destination == "Unknown"
+
+    # a frame after a 4 octet capture header
+    vendors = annotateFrame(b"\x00" * 4 + SHINKO + BELKIN, offset=4, fromDatabase=db)
+    assert vendors.destination["Assignment"] == "0055DA1"
+    assert vendors.source["Assignment"] == "D8EC5E"
+
+
+def test_annotateFrames(db):
+    frames = [BELKIN + SHINKO, SHINKO + BROADCAST]
+
+    vendors = list(annotateFrames(frames, fromDatabase=db))
+    assert [v.destination["Assignment"] for v in vendors] == ["D8EC5E", "0055DA1"]
+    assert vendors[0].source["Assignment"] == "0055DA1"
+    assert vendors[1].source == "Unknown"
@@ -0,0 +1,97 @@
+import subprocess
+import sys
+
+import pytest
+
+import NG_OUI_DB
+
+# modules only needed to download, parse, serve or fork
+HEAVY_MODULES = (
+    "requests",
+    "urllib3",
+    "charset_normalizer",
+    "idna",
+    "csv",
+    "json",
+    "pickle",
+    "asyncio",
+    "http.server",
+    "multiprocessing",
+    "concurrent.futures",
+    "numpy",
+)
+
+
+def importTimes(code: str) -> dict[str, int]:
+    """Returns the cumulative microseconds of every module imported by code"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["NG_OUI_DB", "NG_OUI_DB.cli"])
+def test_import_loadsNoHeavyModule(module):
+    times = importTimes(f"import {module}")
+    assert module in times
+    assert [name for name in HEAVY_MODULES if name in times] == []
+    # generous enough for a cold bytecode cache, a heavy import breaks it
+    assert times[module] < 500_000
+
+
+def test_cacheHit_loadsNoNetworkStackOrParser(registry, cacheFile):
+    code = (
+        "import sys, NG_OUI_DB\n"
+        "from NG_OUI_DB.registries import Registry\n"
+        f"NG_OUI_DB.CSV_FILE_NAME = {cacheFile!r}\n"
+        f"registry = Registry{tuple(registry)!r}\n"
+        "db = NG_OUI_DB.IeeOuiDb(registries=(registry,), artifacts=('binary',))\n"
+        "db.waitForArtifacts(timeout=10)\n"
+        "print(db.getOrganizationName('d8:ec:5e:12:34:56'))\n"
+        f"print(*[m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+
+    def run() -> list[str]:
+        return subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout.splitlines()
+
+    # the first run parses the CSV file and writes the snapshot
+    assert run()[0] == "Belkin International Inc."
+    # the next one maps the snapshot without importing csv or requests
+    assert run() == ["Belkin International Inc.", ""]
+
+
+def test_streamedLookup_loadsNoHttpServer(registry, cacheFile):
+    code = (
+        "import sys, NG_OUI_DB\n"
+        "from NG_OUI_DB.registries import Registry\n"
+        "from NG_OUI_DB.stream import LOOKUP, streamMacs\n"
+        f"NG_OUI_DB.CSV_FILE_NAME = {cacheFile!r}\n"
+        f"registry = Registry{tuple(registry)!r}\n"
+        "db = NG_OUI_DB.IeeOuiDb(registries=(registry,), artifacts=())\n"
+        "streamMacs(LOOKUP, ['d8:ec:5e:12:34:56'], sys.stdout, database=db)\n"
+        "print('http.server' in sys.modules)\n"
+    )
+    lines = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+
+    assert "Belkin International Inc." in lines[-2]
+    assert lines[-1] == "False"
+
+
+def test_lazySubmodules():
+    assert "server" in dir(NG_OUI_DB)
+    assert NG_OUI_DB.batch.lookupRows is not None
+    with pytest.raises(AttributeError):
+        NG_OUI_DB.notASubmodule
@@ -0,0 +1,129 @@
+import gzip
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.ingest import CsvIngest, readCsv
+from NG_OUI_DB.registries import Registry
+from NG_OUI_DB.store import OuiStoreBuilder
+
+HEADER = "Registry,Assignment,Organization Name,Organization Address\r\n"
+ROWS = (
+    'MA-L,D8EC5E,Belkin International Inc.,"Playa Vista CA US 90094"\r\n'
+    'MA-L,00-00-00,XEROX CORPORATION,"M/S 105-50C\r\nWEBSTER NY US 14580"\r\n'
+    'MA-L,0055DA,"Société Générale, Paris","29 Boulevard Haussmann FR 75009"\r\n'
+)
+BODY = (HEADER + ROWS).encode("utf-8")
+OLD = HEADER + 'MA-L,D4F547,Tuya Smart Inc.,"Hangzhou CN 310000"\r\n'
+
+
+def parsed(fileName):
+    builder = OuiStoreBuilder()
+    with open(fileName, "r", encoding="utf-8") as file:
+        readCsv(file, builder)
+    return builder.build().toDict()
+
+
+def test_ingest_streamedBodyMatchesTheFile(tmp_path):
+    fileName = tmp_path / "oui.csv"
+    fileName.write_bytes(BODY)
+    other = tmp_path / "other.csv"
+    other.write_text(OLD)
+
+    ingest = CsvIngest(maxChunks=2)
+    # a file ended before the first chunk is parsed first
+    ingest.end(str(other))
+    # chunks split lines, quoted newlines and multi-byte characters
+    for start in range(0, len(BODY), 7):
+        ingest.write(BODY[start : start + 7])
+    ingest.complete()
+    ingest.end(str(fileName))
+    builder = ingest.finish()
+
+    records = builder.build().toDict()
+    assert list(records) == ["D4F547", "D8EC5E", "000000", "0055DA"]
+    assert {k: records[k] for k in parsed(fileName)} == parsed(fileName)
+    assert (
+        records["000000"]["Organization Address"] == "M/S 105-50C\nWEBSTER NY US 14580"
+    )
+    assert ingest.bytes == len(BODY) + os.path.getsize(other)
+
+
+def test_ingest_incompleteBodyIsNotUsed(tmp_path):
+    fileName = tmp_path / "oui.csv"
+    fileName.write_text(OLD)
+
+    ingest = CsvIngest()
+    ingest.write(BODY[:50])
+    # the download failed, the previous file is kept
+    ingest.end(str(fileName))
+    assert ingest.finish() is None
+    ingest.close()
+
+
+def test_ingest_raisesTheErrorsOfTheParser():
+    ingest = CsvIngest(maxChunks=1)
+    ingest.write((HEADER + "MA-L,NOTHEX,Name,Address\r\n").encode())
+    # the parser keeps taking the chunks off the queue once it gave up
+    for _ in range(100):
+        ingest.write(BODY)
+    ingest.complete()
+    with pytest.raises(ValueError):
+        ingest.finish()
+
+
+class Handler(BaseHTTPRequestHandler):
+    truncate = False
+
+    def do_GET(self):
+        body = gzip.compress(BODY)
+        self.send_response(200)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body[: len(body) // 2] if Handler.truncate else body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servedRegistry(tmp_path, cacheFile):
+    """A registry downloaded from a local server answering the BODY"""
+    Handler.truncate = False
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/oui.csv"
+    yield Registry("MA-L", url, str(tmp_path / "oui.csv"))
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_refresh_parsesTheBodyWhileDownloading(servedRegistry, monkeypatch):
+    def fail(self, fileName):
+        raise AssertionError("the downloaded file was read back")
+
+    monkeypatch.setattr(CsvIngest, "_readFile", fail)
+    db = IeeOuiDb(registries=(servedRegistry,), artifacts=())
+
+    assert db.getOrganizationName("00:55:da:00:00:01") == "Société Générale, Paris"
+    with open(servedRegistry.fileName, "rb") as file:
+        assert file.read() == BODY
+    assert db.stats()["phases"]["parse"]["bytes"] == len(BODY)
+
+
+def test_refresh_failingMidwayKeepsThePreviousFile(servedRegistry):
+    with open(servedRegistry.fileName, "w", encoding="utf-8", newline="") as file:
+        file.write(OLD)
+    expired = time.time() - 2 * 24 * 60 * 60
+    os.utime(servedRegistry.fileName, (expired, expired))
+    Handler.truncate = True
+
+    db = IeeOuiDb(registries=(servedRegistry,), artifacts=())
+    assert db.getOrganizationName("d4:f5:47:00:00:01") == "Tuya Smart Inc."
+    assert db.getOrganizationName("d8:ec:5e:00:00:01") == "Unknown"
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+import NG_OUI_DB
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.cli import parseArguments
+from NG_OUI_DB.instrumentation import CALL, LatencyHistogram
+
+
+def test_stats_timesEveryPhase(registry, downloads):
+    downloads()
+    db = IeeOuiDb(registries=(registry,), artifacts=("binary",))
+    assert db.waitForArtifacts(timeout=10)
+
+    phases = db.stats()["phases"]
+    size = os.path.getsize(registry.fileName)
+    assert list(phases) == ["fetch", "parse", "persist", "load"]
+    assert phases["fetch"]["bytes"] == size
+    assert phases["parse"]["count"] == 1
+    assert phases["parse"]["rows"] == 4
+    assert phases["parse"]["bytes"] == size
+    assert phases["persist"]["rows"] == 4
+    assert phases["load"]["count"] == 0
+    assert db.stats()["calls"] == {}
+
+    # the next database maps the snapshot the first one persisted
+    downloads(status=NG_OUI_DB.NO_UPDATED_NEEDED)
+    mapped = IeeOuiDb(registries=(registry,), artifacts=("binary",))
+    phases = mapped.stats()["phases"]
+    assert phases["parse"]["count"] == 0
+    assert phases["load"]["rows"] == 4
+
+
+def test_stats_failedLoadIsNotCounted(registry, downloads):
+    downloads(status=NG_OUI_DB.NO_UPDATED_NEEDED)
+    # no snapshot was written yet, the CSV file is parsed instead
+    db = IeeOuiDb(registries=(registry,), artifacts=("binary",))
+    assert db.waitForArtifacts(timeout=10)
+
+    phases = db.stats()["phases"]
+    assert phases["load"]["count"] == 0
+    assert phases["parse"]["count"] == 1
+
+
+def test_instrument_recordsCallsAndTraces(registry):
+    db = IeeOuiDb(registries=(registry,), artifacts=(), instrument=True)
+    events = []
+    db.addTracer(events.append)
+
+    for _ in range(3):
+        db.getOrganizationName("d8:ec:5e:12:34:56")
+    assert len(db.getOrganizationsByOrganization("shinko")) == 1
+
+    calls = db.stats()["calls"]
+    assert calls["getOrganizationName"]["count"] == 3
+    assert calls["getOrganizationsByOrganization"]["count"] == 1
+    # the query() behind the search is part of it, not a call of its own
+    assert "query" not in calls
+    assert [(event.kind, event.name) for event in events[-2:]] == [
+        (CALL, "getOrganizationName"),
+        (CALL, "getOrganizationsByOrganization"),
+    ]
+
+    db.removeTracer(events.append)
+    db.instrumentation.reset()
+    db.refresh()
+    assert db.stats()["calls"] == {}
+    assert len(events) == 4
+    assert db.stats()["phases"]["parse"]["count"] == 1
+
+
+def test_latencyHistogram_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+
+    for _ in range(98):
+        histogram.add(0.000003)  # 3 us
+    histogram.add(0.0001)  # 100 us
+    histogram.add(0.002)  # 2 ms
+
+    summary = histogram.toDict()
+    assert summary["count"] == 100
+    assert summary["p50"] == 4
+    assert summary["p99"] == 128
+    assert summary["buckets"] == {4: 98, 128: 1, 2048: 1}
+    assert summary["max"] == pytest.approx(2000)
+
+
+def test_memoryReport_breaksDownTheStructures(registry):
+    db = IeeOuiDb(registries=(registry,), artifacts=(), cacheSize=8)
+    db.getOrganizationsByOrganization("belkin")
+    db.getOrganizationName("d8:ec:5e:12:34:56")
+
+    report = db.memoryReport()
+    assert report["rows"] == 4
+    assert set(report["columns"]) >= {"keys", "nameTable", "addresses"}
+    assert "searchIndex" in report["derived"]
+    assert report["lookupCache"] > 0
+    assert report["mapped"] == 0
+    assert report["total"] == (
+        sum(report["columns"].values())
+        + sum(report["derived"].values())
+        + report["lookupCache"]
+    )
+
+
+def test_parseArguments_timings():
+    assert parseArguments(["--timings"]).timings
+    assert not parseArguments([]).timings
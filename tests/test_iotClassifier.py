@@ -0,0 +1,89 @@
+import pytest
+
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.iotClassifier import (
+    IOT_KEYWORDS,
+    classifyNames,
+    extendIotFlags,
+    iotFlags,
+    normalizeKeywords,
+)
+from NG_OUI_DB.query import ByIoT
+from NG_OUI_DB.keywordMatcher import KeywordMatcher
+
+rows = [
+    ("MA-L", "000000", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("MA-L", "D8EC5E", "Belkin International Inc.", "Playa Vista CA US 90094"),
+    ("MA-L", "000001", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("MA-S", "70B3D5001", "SOREDI touch systems GmbH", "Olching DE 82140"),
+]
+
+
+@pytest.fixture
+def store(buildStore):
+    return buildStore(rows)
+
+
+@pytest.fixture
+def csvRows():
+    return "".join(f'{row[0]},{row[1]},{row[2]},"{row[3]}"\n' for row in rows)
+
+
+def test_normalizeKeywords():
+    assert normalizeKeywords(["Smart", "smart", "", "IoT"]) == ("smart", "iot")
+    assert "smart" in IOT_KEYWORDS
+
+
+def test_classifyNames():
+    names = ["Smart Labs", "XEROX", "Tuya Smart Inc.", "Espressif Inc."]
+
+    assert classifyNames(names, IOT_KEYWORDS) == bytearray([1, 0, 1, 1])
+    assert classifyNames(names, ["XEROX"]) == bytearray([0, 1, 0, 0])
+    assert classifyNames(names, []) == bytearray(4)
+
+
+def test_iotFlags(store):
+
+    assert list(iotFlags(store)) == [0, 1, 0, 0]
+    assert list(iotFlags(store, ["xerox", "touch"])) == [1, 0, 1, 1]
+    # built once per store and set of keywords
+    assert iotFlags(store) is iotFlags(store)
+    assert iotFlags(store, ["Belkin"]) is iotFlags(store, ["belkin"])
+
+
+def test_extendIotFlags(store, monkeypatch):
+    flags = iotFlags(store, ["belkin"])
+    classified = []
+    matches = KeywordMatcher.matches
+
+    def countedMatches(self, text):
+        classified.append(text)
+        return matches(self, text)
+
+    monkeypatch.setattr(KeywordMatcher, "matches", countedMatches)
+    extended = extendIotFlags(store, ["belkin"], ["Touch", "inc"])
+
+    assert list(extended) == [0, 1, 0, 1]
+    assert list(flags) == [0, 1, 0, 0]
+    # only the names no previous keyword matched are classified again
+    assert sorted(classified) == ["SOREDI touch systems GmbH", "XEROX CORPORATION"]
+    assert iotFlags(store, ["belkin", "touch", "inc"]) is extended
+    assert extendIotFlags(store, ["belkin"], ["BELKIN"]) is flags
+
+
+def test_iotKeywordsOfDatabase(registry):
+    db = IeeOuiDb(registries=(registry,), artifacts=(), iotKeywords=["Belkin"])
+
+    assert db.isIoT("D8:EC:5E") is True
+    assert db.isIoT("00:00:00") is False
+    assert db.queryCount(ByIoT()) == 1
+
+    db.addIotKeywords(["xerox"])
+    assert db.iotKeywords == ("belkin", "xerox")
+    assert db.isIoT("00:00:00") is True
+    assert db.queryCount(ByIoT()) == 3
+
+    db.setIotKeywords(["Touch"])
+    assert db.isIoT("D8:EC:5E") is False
+    assert db.isIoT("70:B3:D5:00:10:00") is True
+    assert db.queryCount(ByIoT()) == 1
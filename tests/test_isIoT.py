@@ -8,3 +8,22 @@ def test_isIoT():
     assert isIoT("00:00:00:00:00:00", fromDatabase=db) is False
     # Belkin International Inc.
     assert isIoT("D8:EC:5E:00:00:00", fromDatabase=db) is True
+    # Belkin International Inc. in the other notations
+    assert isIoT("d8ec.5e00.0000", fromDatabase=db) is True
+    assert isIoT("D8EC5E000000", fromDatabase=db) is True
+    assert isIoT(0xD8EC5E000000, fromDatabase=db) is True
+    assert isIoT(b"\xd8\xec\x5e\x00\x00\x00", fromDatabase=db) is True
+
+
+def test_isIoTIsALookup(monkeypatch):
+    db = IeeOuiDb()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file I/O in isIoT")
+
+    monkeypatch.setattr("builtins.open", fail)
+    assert isIoT("D8:EC:5E:00:00:00", fromDatabase=db) is True
+    assert isIoT("00:00:00:00:00:00", fromDatabase=db) is False
+    assert isIoT("not a mac", fromDatabase=db) is None
+    assert db.isIoT("D8:EC:5E") is True
+    assert db.isIoT("FF:FF:FF:FF:FF:FF") is False
@@ -0,0 +1,47 @@
+import random
+
+from NG_OUI_DB.keywordMatcher import KeywordMatcher
+
+
+def test_search():
+    matcher = KeywordMatcher(["Smart", "art", "iot", "smart"])
+
+    assert matcher.keywords == ("smart", "art", "iot")
+    assert len(matcher) == 3
+    assert matcher.search("Tuya SMART Inc.") == "smart"
+    assert matcher.search("Patriot Memory") == "iot"
+    assert matcher.search("XEROX CORPORATION") is None
+    assert matcher.search("") is None
+
+
+def test_matches():
+    matcher = KeywordMatcher(["he", "she", "his", "hers"])
+
+    assert matcher.matches("ushers")
+    assert matcher.matches("HIS")
+    assert not matcher.matches("hi s")
+    assert not KeywordMatcher([]).matches("anything")
+
+
+def test_findAll():
+    matcher = KeywordMatcher(["he", "she", "his", "hers"])
+
+    assert matcher.findAll("ushers") == ["she", "he", "hers"]
+    assert matcher.findAll("xyz") == []
+
+
+def test_sameAsSubstringSearch():
+    random.seed(3)
+    alphabet = "abc -"
+    keywords = [
+        "".join(random.choices(alphabet, k=random.randint(1, 5))) for _ in range(40)
+    ]
+    matcher = KeywordMatcher(keywords)
+
+    for _ in range(500):
+        text = "".join(
+            random.choices(alphabet.upper() + alphabet, k=random.randint(0, 20))
+        )
+        expected = {keyword for keyword in matcher.keywords if keyword in text.lower()}
+        assert matcher.matches(text) is bool(expected)
+        assert set(matcher.findAll(text)) == expected
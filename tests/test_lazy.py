@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+import pytest
+
+from NG_OUI_DB import IeeOuiDb
+
+XEROX = 'MA-L,000000,XEROX CORPORATION,"M/S 105-50C WEBSTER NY US 14580"\n'
+MICROSOFT = 'MA-L,501AC5,Microsoft,"1 Microsoft Way Redmond Washington US 98052"\n'
+
+
+@pytest.fixture
+def csvRows():
+    return XEROX
+
+
+def test_lazyConstructionDoesNoIo(registry, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("I/O during construction")
+
+    monkeypatch.setattr(IeeOuiDb, "_getIeeOuiDbAsCsv", fail)
+    monkeypatch.setattr(IeeOuiDb, "_convertCsvToStore", fail)
+    IeeOuiDb(registries=(registry,), lazy=True)
+
+
+def test_lazyFreshFilesAreNotRefreshed(registry, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("fresh files were downloaded")
+
+    monkeypatch.setattr(IeeOuiDb, "_getIeeOuiDbAsCsv", fail)
+    db = IeeOuiDb(registries=(registry,), lazy=True)
+
+    assert db.getOrganizationName("00:00:00") == "XEROX CORPORATION"
+    assert db.waitForRefresh(timeout=0)
+
+
+def test_lazyServesStaleWhileRefreshing(registry, downloads, monkeypatch):
+    expired = time.time() - 2 * 24 * 60 * 60
+    os.utime(registry.fileName, (expired, expired))
+
+    downloaded = threading.Event()
+    downloads(rows=XEROX + MICROSOFT)
+    answer = IeeOuiDb._getIeeOuiDbAsCsv
+
+    def download(self, url, fileName, ingest=None):
+        downloaded.wait(timeout=10)
+        return answer(self, url, fileName, ingest)
+
+    monkeypatch.setattr(IeeOuiDb, "_getIeeOuiDbAsCsv", download)
+    db = IeeOuiDb(registries=(registry,), lazy=True)
+
+    # the expired file is served while the download is still running
+    assert db.getOrganizationName("00:00:00") == "XEROX CORPORATION"
+    assert db.getOrganizationName("50:1A:C5") == "Unknown"
+    assert not db.waitForRefresh(timeout=0)
+
+    downloaded.set()
+    assert db.waitForRefresh(timeout=10)
+    assert db.getOrganizationName("50:1A:C5") == "Microsoft"
+
+
+def test_aLookupReadsTheStoreOnce(registry, buildStore, monkeypatch):
+    xerox = ("MA-L", "000000", "XEROX CORPORATION", "Webster")
+    old = buildStore([xerox])
+    new = buildStore([("MA-L", "D4F547", "Tuya Smart Inc.", "Hangzhou"), xerox])
+    db = IeeOuiDb(registries=(registry,), lazy=True, artifacts=())
+
+    # a refresh swaps the store in right after every read of it
+    def store(self):
+        current, self._current = self._current, new
+        return current
+
+    monkeypatch.setattr(IeeOuiDb, "_store", property(store))
+    for method, expected in (
+        (db.getOrganizationName, "XEROX CORPORATION"),
+        (db.getAssignment, "000000"),
+        (db.isIoT, False),
+    ):
+        db._current = old
+        assert method("00:00:00:12:34:56") == expected
@@ -0,0 +1,79 @@
+import pytest
+
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.lookupCache import NOT_FOUND, LookupCache
+
+XEROX = ("MA-L", "000000", "XEROX CORPORATION", "Webster")
+
+
+@pytest.fixture
+def csvRows():
+    return "MA-L,000000,XEROX CORPORATION,Webster\n"
+
+
+def test_lookupCache(buildStore):
+    store = buildStore([XEROX])
+    cache = LookupCache(2)
+
+    assert cache.get(store, "00:00:00") is None
+    cache.put(store, "00:00:00", 0)
+    cache.put(store, "FF:FF:FF", NOT_FOUND)
+    assert cache.get(store, "00:00:00") == 0
+    assert cache.get(store, "FF:FF:FF") == NOT_FOUND
+
+    # the least recently used MAC address is evicted
+    cache.get(store, "00:00:00")
+    cache.put(store, "0x000000000000", 0)
+    assert cache.get(store, "FF:FF:FF") is None
+    assert len(cache) == 2
+
+    assert cache.stats() == {
+        "size": 2,
+        "maxSize": 2,
+        "hits": 3,
+        "misses": 2,
+        "evictions": 1,
+        "invalidations": 0,
+        "hitRate": 0.6,
+    }
+
+
+def test_lookupCacheInvalidation(buildStore):
+    cache = LookupCache(8)
+    store = buildStore([XEROX])
+    cache.put(store, "00:00:00", 0)
+
+    # another store empties the cache
+    assert cache.get(buildStore([XEROX]), "00:00:00") is None
+    assert cache.stats()["invalidations"] == 1
+    assert len(cache) == 0
+
+    cache.clear()
+    assert cache.stats()["misses"] == 0
+
+
+def test_lookupCacheSize():
+    with pytest.raises(ValueError):
+        LookupCache(0)
+
+
+def test_cachedLookups(registry, downloads):
+    assert IeeOuiDb(registries=(registry,), artifacts=()).lookupCache is None
+    db = IeeOuiDb(registries=(registry,), artifacts=(), cacheSize=16)
+
+    for _ in range(3):
+        assert db.getOrganizationName("00:00:00:12:34:56") == "XEROX CORPORATION"
+        assert db.getRegistry("50:1A:C5:00:00:00") == "Unknown"
+        assert db.getAssignment("not a mac") == "Unknown"
+    # unhashable MAC addresses are looked up without the cache
+    assert db.getAssignment(bytearray(b"\x00" * 6)) == "000000"
+
+    stats = db.lookupCache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (3, 6, 3)
+
+    # a refresh that swaps in a new database empties the cache
+    downloads(rows="MA-L,501AC5,Microsoft,Redmond\n")
+    assert db.refresh()
+    assert db.getRegistry("50:1A:C5:00:00:00") == "MA-L"
+    assert db.getOrganizationName("00:00:00:12:34:56") == "Unknown"
+    assert db.lookupCache.stats()["invalidations"] == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from NG_OUI_DB.utils import getMacPrefix, getOuiFromMac
+from NG_OUI_DB.prefixIndex import PrefixIndex, packAssignment, unpackAssignment
+
+
+def test_getMacPrefix():
+    assert getMacPrefix("00:55:DA:12:34:56") == (0x0055DA123456, 48)
+    assert getMacPrefix("00-55-da-12-34-56") == (0x0055DA123456, 48)
+    assert getMacPrefix("0055.DA12.3456") == (0x0055DA123456, 48)
+    assert getMacPrefix("00:55:DA") == (0x0055DA000000, 24)
+    assert getMacPrefix("0:55:da:12:34:56") == (0x0055DA123456, 48)
+    assert getMacPrefix(0x0055DA123456) == (0x0055DA123456, 48)
+    assert getMacPrefix(b"\x00\x55\xda\x12\x34\x56") == (0x0055DA123456, 48)
+
+    for mac in ["00:55:XX:12:34:56", "0x0055DA", "00_55", "", None, 1 << 48]:
+        with pytest.raises(ValueError):
+            getMacPrefix(mac)
+
+
+def test_getOuiFromMac():
+    for mac in ["00:55:da:12:34:56", "0055.DA12.3456", "0055DA123456", 0x0055DA123456]:
+        assert getOuiFromMac(mac) == "0055DA"
+    assert getOuiFromMac("00:55:da") == "0055DA"
+
+
+def test_packAssignment():
+    for assignment in ["0055DA", "0055DA1", "0055DA1AB"]:
+        assert unpackAssignment(packAssignment(assignment)) == assignment
+
+    with pytest.raises(ValueError):
+        packAssignment("0055D")
+    # int(x, 16) alone accepts all of these
+    for assignment in ["0x0000", "0_0000", " 00000", "00000\n", "+00000"]:
+        with pytest.raises(ValueError):
+            packAssignment(assignment)
+
+
+def test_lookupLongestPrefix():
+    index = PrefixIndex([packAssignment(a) for a in ["0055DA", "0055DA1", "0055DA1AB"]])
+
+    assert len(index) == 3
+    assert index.lookup(0x0055DA1AB123) == 2
+    assert index.lookup(0x0055DA1FF123) == 1
+    assert index.lookup(0x0055DA200000) == 0
+
+
+def test_lookupKnownBits():
+    index = PrefixIndex([packAssignment(a) for a in ["0055DA", "0055DA0"]])
+
+    # only the OUI is known, so the 28 bit block must not be considered
+    assert index.lookup(0x0055DA000000, knownBits=24) == 0
+    assert index.lookup(0x0055DA000000, knownBits=28) == 1
+
+
+def test_lookupUnknown():
+    index = PrefixIndex([packAssignment("0055DA")])
+
+    assert index.find(packAssignment("0055DA")) == 0
+
+    with pytest.raises(KeyError):
+        index.lookup(0x0055DB000000)
+
+    with pytest.raises(KeyError):
+        index.find(packAssignment("0055DB"))
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from NG_OUI_DB import query
+from NG_OUI_DB.query import (
+    And,
+    Bitmap,
+    ByAssignment,
+    ByIoT,
+    ByOrganization,
+    ByRegistry,
+    Not,
+    Or,
+    QueryEngine,
+)
+
+rows = [
+    ("MA-L", "000000", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("MA-M", "0055DA1", "Shinko Technos co.,ltd.", "Osaka JP"),
+    ("MA-L", "000001", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("IAB", "0050C2000", "T.L.S. Corp.", "Cleveland OH US 44122"),
+    ("MA-L", "709E29", "Sony Interactive Entertainment Inc.", "Tokyo JP"),
+    ("MA-S", "70B3D5001", "Sony Corporation", "Tokyo JP"),
+]
+
+
+@pytest.fixture
+def engine(buildStore):
+    return QueryEngine(buildStore(rows))
+
+
+def test_bitmap():
+    bitmap = Bitmap.fromRows([0, 9, 3], size=10)
+
+    assert bitmap.rows() == [0, 3, 9]
+    assert len(bitmap) == 3
+    assert (~bitmap).rows() == [1, 2, 4, 5, 6, 7, 8]
+    assert (bitmap & Bitmap.fromRows([3, 4], 10)).rows() == [3]
+    assert (bitmap | Bitmap.fromRows([4], 10)).rows() == [0, 3, 4, 9]
+    assert (bitmap - Bitmap.fromRows([0], 10)).rows() == [3, 9]
+    assert not Bitmap.fromRows([], 10)
+
+
+def test_predicates(engine):
+
+    assert engine.rows(ByRegistry("MA-L")) == [0, 2, 4]
+    assert engine.rows(ByOrganization("xerox")) == [0, 2]
+    assert engine.rows(ByAssignment("0050C2000")) == [3]
+    assert engine.rows(ByAssignment("FFFFFF")) == []
+    # int(x, 16) alone would find 000001 for these
+    assert engine.rows(ByAssignment("0x0001")) == []
+    assert engine.rows(ByAssignment(" 00001")) == []
+    assert engine.rows(ByRegistry("Unknown")) == []
+
+
+def test_combinations(engine):
+
+    assert engine.rows(ByOrganization("sony") & ByRegistry("MA-L")) == [4]
+    assert engine.rows(ByOrganization("sony") & ~ByRegistry("MA-L")) == [5]
+    assert engine.rows(ByRegistry("MA-M") | ByRegistry("IAB")) == [1, 3]
+    assert engine.rows(Not(ByRegistry("MA-L"))) == [1, 3, 5]
+    assert engine.rows(And()) == [0, 1, 2, 3, 4, 5]
+    assert engine.rows(Or()) == []
+    assert engine.count(ByOrganization("o") & ~ByOrganization("sony")) == 4
+    assert engine.records(ByAssignment("000001"))[0]["Registry"] == "MA-L"
+
+
+def test_iot(engine):
+
+    # "sony" is an IoT keyword, "corp" of T.L.S. Corp. is not
+    assert engine.rows(ByIoT()) == [4, 5]
+    assert engine.rows(ByIoT() & ByRegistry("MA-S")) == [5]
+
+
+def test_organizationSearchesFromSeveralThreads(buildStore, monkeypatch):
+    monkeypatch.setattr(query, "_ORGANIZATION_CACHE_SIZE", 4)
+    engine = QueryEngine(buildStore(rows))
+    searches = ["xerox", "sony", "corp", "tokyo", "o", "inc", "tls", "shinko"]
+    errors = []
+
+    def search(offset):
+        try:
+            for i in range(500):
+                term = searches[(i + offset) % len(searches)]
+                engine.rows(ByOrganization(term))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=search, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(engine._organizations) <= 4
+    assert engine.rows(ByOrganization("sony")) == [4, 5]
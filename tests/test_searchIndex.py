@@ -0,0 +1,43 @@
+import pytest
+
+from NG_OUI_DB.searchIndex import TrigramIndex
+
+rows = [
+    ("MA-L", "000000", "XEROX CORPORATION"),
+    ("MA-L", "501AC5", "Microsoft"),
+    ("MA-L", "000001", "XEROX CORPORATION"),
+    ("MA-L", "28183C", "Microsoft Corporation"),
+    ("MA-L", "709E29", "Sony Interactive Entertainment Inc."),
+]
+
+
+@pytest.fixture
+def index(buildStore):
+    return TrigramIndex(buildStore([row + ("",) for row in rows]))
+
+
+def scan(organization):
+    return [
+        row
+        for row, (_, _, name) in enumerate(rows)
+        if organization.lower() in name.lower()
+    ]
+
+
+def test_rows(index):
+
+    for organization in ["XEROX", "microsoft", "soft corp", "Inc.", "xerox sony"]:
+        assert index.rows(organization) == scan(organization)
+        assert index.count(organization) == len(scan(organization))
+
+
+def test_shortQueries(index):
+
+    for organization in ["", "x", "so"]:
+        assert index.rows(organization) == scan(organization)
+
+
+def test_matches(index):
+
+    assert index.matches(0, "corporation")
+    assert not index.matches(0, "microsoft")
@@ -0,0 +1,116 @@
+import json
+import threading
+from http.client import HTTPConnection
+
+import pytest
+
+from NG_OUI_DB import lookupResult
+from NG_OUI_DB.cli import parseArguments
+from NG_OUI_DB.server import BATCH_CHUNK_SIZE, makeServer
+
+
+@pytest.fixture
+def connection(db):
+    server = makeServer(port=0, database=db)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    connection = HTTPConnection(*server.server_address, timeout=5)
+    yield connection
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def get(connection, path):
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_lookupResult(db):
+    result = lookupResult(db, "d4:f5:47:00:00:01")
+    assert result["mac"] == "d4:f5:47:00:00:01"
+    assert result["Organization Name"] == "Tuya Smart Inc."
+    assert result["isIoT"] is True
+    assert lookupResult(db, "ff:ff:ff:ff:ff:ff") == {
+        "mac": "ff:ff:ff:ff:ff:ff",
+        "error": "Unknown",
+    }
+
+
+def test_get_keepsTheConnectionAlive(connection):
+    status, body = get(connection, "/lookup?mac=0055.da12.3456")
+    assert status == 200
+    assert body["Registry"] == "MA-M"
+    sock = connection.sock
+
+    assert get(connection, "/isiot?mac=d8ec5e123456") == (
+        200,
+        {"mac": "d8ec5e123456", "isIoT": True},
+    )
+    assert get(connection, "/lookup?mac=ff:ff:ff:ff:ff:ff")[0] == 404
+    assert get(connection, "/lookup")[0] == 400
+    assert get(connection, "/health") == (200, {"status": "ok", "records": 4})
+    # every request was answered on the first connection
+    assert connection.sock is sock
+
+
+def test_search(connection):
+    status, records = get(connection, "/search?organization=inc&registry=MA-L")
+    assert status == 200
+    assert [record["Assignment"] for record in records] == ["D8EC5E", "D4F547"]
+
+    status, records = get(connection, "/search?iot=true&limit=1")
+    assert [record["Assignment"] for record in records] == ["D8EC5E"]
+
+    assert get(connection, "/search")[0] == 400
+    assert get(connection, "/search?registry=MA-L&limit=many")[0] == 400
+    assert get(connection, "/unknown")[0] == 404
+
+
+def test_batch_streamsNdjson(connection):
+    macs = ["d8:ec:5e:12:34:56", '"0055DA123456"', "", "not a mac"] * 1000
+    connection.request("POST", "/lookup", body="\n".join(macs).encode())
+    response = connection.getresponse()
+
+    assert response.status == 200
+    assert response.getheader("Transfer-Encoding") == "chunked"
+    results = [json.loads(line) for line in response.read().splitlines()]
+    assert len(results) == 3000 > BATCH_CHUNK_SIZE
+    assert results[0]["Organization Name"] == "Belkin International Inc."
+    assert results[1]["mac"] == "0055DA123456"
+    assert results[1]["Assignment"] == "0055DA1"
+    assert results[2] == {"mac": "not a mac", "error": "Unknown"}
+
+    # the connection is kept alive after a batch
+    assert get(connection, "/health")[0] == 200
+
+
+@pytest.mark.parametrize("limit", ["many", "%C2%B2", "-1"])
+def test_search_rejectsBadLimit(connection, limit):
+    status, body = get(connection, f"/search?registry=MA-L&limit={limit}")
+
+    assert status == 400
+    assert "limit" in body["error"]
+    # the connection is kept alive after the error
+    assert get(connection, "/health")[0] == 200
+
+
+@pytest.mark.parametrize(
+    "length, status", [("abc", 400), ("\u00b2", 400), ("-1", 400), ("99999999", 413)]
+)
+def test_batch_rejectsBadContentLength(connection, length, status):
+    connection.putrequest("POST", "/lookup")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+    response = connection.getresponse()
+
+    assert response.status == status
+    response.read()
+
+
+def test_parseArguments():
+    arguments = parseArguments(["serve", "--port", "9000", "--workers", "4"])
+    assert (arguments.command, arguments.port, arguments.workers) == ("serve", 9000, 4)
+    assert arguments.host == "127.0.0.1"
+    assert parseArguments([]).command is None
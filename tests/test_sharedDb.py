@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+import NG_OUI_DB
+from NG_OUI_DB import IeeOuiDb, clearSharedDbs, getSharedDb
+from NG_OUI_DB.isIoT import isIoT
+
+
+@pytest.fixture(autouse=True)
+def sharedDbs():
+    clearSharedDbs()
+    yield
+    clearSharedDbs()
+
+
+def test_sharedDbIsBuiltOnce(registry, monkeypatch):
+    builds = []
+    refresh = IeeOuiDb._refresh
+
+    def countedRefresh(self):
+        builds.append(self)
+        return refresh(self)
+
+    monkeypatch.setattr(IeeOuiDb, "_refresh", countedRefresh)
+
+    databases = []
+    barrier = threading.Barrier(8)
+
+    def get():
+        barrier.wait()
+        databases.append(getSharedDb(registries=(registry,), artifacts=()))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert all(database is databases[0] for database in databases)
+    assert getSharedDb(registries=[registry], artifacts=[]) is databases[0]
+
+
+def test_sharedDbIsKeyedByConfiguration(registry):
+    eager = getSharedDb(registries=(registry,), artifacts=())
+    assert getSharedDb(registries=(registry,), lazy=True, artifacts=()) is not eager
+    assert getSharedDb(registries=(registry,), artifacts=("ndjson",)) is not eager
+
+    clearSharedDbs()
+    assert getSharedDb(registries=(registry,), artifacts=()) is not eager
+
+
+def test_helpersUseTheSharedDb(registry, monkeypatch):
+    shared = IeeOuiDb(registries=(registry,), artifacts=())
+    monkeypatch.setattr(NG_OUI_DB.isIoT, "getSharedDb", lambda: shared)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a new database was built")
+
+    monkeypatch.setattr(IeeOuiDb, "__init__", fail)
+
+    assert isIoT("D8:EC:5E:00:00:00") is True
+    assert isIoT("00:00:00:00:00:00") is False
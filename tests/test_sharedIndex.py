@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from NG_OUI_DB import IeeOuiDb
+from NG_OUI_DB.sharedIndex import SharedIndex, generationFileName
+
+TELINK = 'MA-L,A4C138,Telink Smart Co.,"Shanghai CN"\n'
+
+
+def test_publish_keepsTwoGenerations(db, tmp_path):
+    fileName = str(tmp_path / "shared" / "iee_oui.shared")
+    sharedIndex = SharedIndex(fileName)
+    assert sharedIndex.generation() == 0
+    with pytest.raises(FileNotFoundError):
+        sharedIndex.open()
+
+    assert [sharedIndex.publish(db._store) for _ in range(3)] == [1, 2, 3]
+    assert not os.path.exists(generationFileName(fileName, 1))
+    assert os.path.exists(generationFileName(fileName, 2))
+
+    reader = SharedIndex(fileName)
+    generation, store = reader.open()
+    assert generation == 3
+    assert store.organizationName(store.find("D8EC5E")) == "Belkin International Inc."
+    reader.close()
+
+
+def test_attach_readsTheSharedDatabase(db, tmp_path):
+    fileName = str(tmp_path / "iee_oui.shared")
+    with pytest.raises(FileNotFoundError):
+        IeeOuiDb.attach(fileName)
+
+    db.shareIndex(fileName)
+    attached = IeeOuiDb.attach(fileName, cacheSize=16)
+
+    assert attached.generation == 1
+    assert attached.getOrganizationName("0055.da12.3456") == "Shinko Technos co."
+    assert attached.isIoT("d8:ec:5e:12:34:56")
+    # the store is mapped from the shared snapshot, not parsed
+    assert isinstance(attached._store.keys(), memoryview)
+
+
+def test_attached_switchesToRefreshedGenerations(db, csvRows, downloads, tmp_path):
+    fileName = str(tmp_path / "iee_oui.shared")
+    db.shareIndex(fileName)
+    attached = IeeOuiDb.attach(fileName)
+    assert attached.getOrganizationName("a4:c1:38:00:00:01") == "Unknown"
+    received = []
+    attached.subscribe(received.append)
+
+    downloads(rows=csvRows + TELINK)
+    db.refresh()
+
+    # the next query switches to the generation the refresh published
+    assert attached.getOrganizationName("a4:c1:38:00:00:01") == "Telink Smart Co."
+    assert attached.generation == 2
+    assert [record.assignment for record in received[0].added] == ["A4C138"]
+    assert not attached.refresh()
+
+
+def test_attached_keepsItsGenerationIfTheNextIsInvalid(db, tmp_path):
+    fileName = str(tmp_path / "iee_oui.shared")
+    sharedIndex = db.shareIndex(fileName)
+    attached = IeeOuiDb.attach(fileName)
+
+    sharedIndex.publish(db._store)
+    with open(generationFileName(fileName, 2), "r+b") as file:
+        file.write(b"garbage!")
+
+    assert attached.getAssignment("d8:ec:5e:12:34:56") == "D8EC5E"
+    assert attached.generation == 2
+
+
+def test_attach_fromAnotherProcess(db, csvRows, downloads, tmp_path):
+    fileName = str(tmp_path / "iee_oui.shared")
+    db.shareIndex(fileName)
+    downloads(rows=csvRows + TELINK)
+    db.refresh()
+
+    script = (
+        "import sys\n"
+        "from NG_OUI_DB import IeeOuiDb\n"
+        "db = IeeOuiDb.attach(sys.argv[1])\n"
+        "print(db.generation, db.getOrganizationName('a4:c1:38:00:00:01'))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script, fileName],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == "2 Telink Smart Co."
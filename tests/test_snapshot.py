@@ -0,0 +1,129 @@
+import zlib
+
+import pytest
+
+from NG_OUI_DB import snapshot
+from NG_OUI_DB.iotClassifier import iotFlags
+from NG_OUI_DB.snapshot import SnapshotError, openSnapshot, writeSnapshot
+
+rows = [
+    (
+        "MA-L",
+        "0055DA",
+        "IEEE Registration Authority",
+        "445 Hoes Lane Piscataway NJ US 08554",
+    ),
+    ("MA-L", "000000", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("MA-M", "0055DA1", "Shinko Technos co.,ltd.", "Ōsaka JP"),
+    ("MA-L", "000001", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+]
+
+
+@pytest.fixture
+def store(buildStore):
+    return buildStore(rows, sources=("MA-L", "MA-M"))
+
+
+def test_roundTrip(tmp_path, store):
+    fileName = str(tmp_path / "iee_oui.snapshot")
+    writeSnapshot(store, fileName)
+    mapped = openSnapshot(fileName)
+
+    assert len(mapped) == len(store)
+    assert mapped.sources == ("MA-L", "MA-M")
+    assert mapped.registryNames() == store.registryNames()
+    assert list(mapped.nameTable()) == list(store.nameTable())
+    assert mapped.toDict() == store.toDict()
+    assert list(mapped.hashes()) == list(store.hashes())
+
+    # the IoT flags are read from the snapshot rather than classified again
+    assert isinstance(iotFlags(mapped), memoryview)
+    assert list(iotFlags(mapped)) == list(iotFlags(store))
+
+    # the columns are read from the mapped file
+    assert isinstance(mapped.keys(), memoryview)
+    assert mapped.lookup(0x0055DA1FFFFF) == 2
+    assert mapped.lookup(0x0055DA2FFFFF) == 0
+    assert mapped.find("000001") == 3
+    assert mapped.organizationAddress(2) == "Ōsaka JP"
+
+
+def test_rewriteMappedStore(tmp_path, store):
+    fileName = str(tmp_path / "iee_oui.snapshot")
+    writeSnapshot(store, fileName)
+    mapped = openSnapshot(fileName)
+
+    # replacing the file leaves the store mapped from the old file readable
+    writeSnapshot(mapped, fileName)
+    assert mapped.organizationName(1) == "XEROX CORPORATION"
+    assert openSnapshot(fileName).toDict() == store.toDict()
+
+
+def test_emptyStore(tmp_path, buildStore):
+    fileName = str(tmp_path / "iee_oui.snapshot")
+    writeSnapshot(buildStore([]), fileName)
+
+    mapped = openSnapshot(fileName)
+    assert len(mapped) == 0
+    assert mapped.sources == ()
+    with pytest.raises(KeyError):
+        mapped.lookup(0)
+
+
+def test_invalidSnapshots(tmp_path, store):
+    fileName = str(tmp_path / "iee_oui.snapshot")
+    writeSnapshot(store, fileName)
+    with open(fileName, "rb") as file:
+        data = bytearray(file.read())
+
+    table = bytearray(data)
+    table[40] ^= 0xFF
+    for content in (b"", b"not a snapshot" * 4, data[:40], data[:-8], table):
+        with open(fileName, "wb") as file:
+            file.write(content)
+        with pytest.raises(SnapshotError):
+            openSnapshot(fileName)
+
+    # the payload is only read when asked to, opening stays O(1)
+    corrupt = bytearray(data)
+    corrupt[-1] ^= 0xFF
+    with open(fileName, "wb") as file:
+        file.write(corrupt)
+    assert len(openSnapshot(fileName)) == len(rows)
+    with pytest.raises(SnapshotError):
+        openSnapshot(fileName, verify=True)
+
+    with pytest.raises(OSError):
+        openSnapshot(str(tmp_path / "missing.snapshot"))
+
+
+@pytest.mark.parametrize(
+    "section, itemSize",
+    [
+        (snapshot._REGISTRIES, 1),
+        (snapshot._NAMES, 4),
+        (snapshot._SORTED_KEYS, 8),
+        (snapshot._POSITIONS, 4),
+        (snapshot._ADDRESS_OFFSETS, 4),
+        (snapshot._NAME_OFFSETS, 4),
+        (snapshot._ADDRESS_HEAP, 1),
+    ],
+)
+def test_shortSectionIsNotOpened(tmp_path, store, section, itemSize):
+    fileName = str(tmp_path / "iee_oui.snapshot")
+    writeSnapshot(store, fileName)
+    with open(fileName, "rb") as file:
+        data = bytearray(file.read())
+
+    # drop the last item of the section, with a section table that is valid
+    entry = snapshot._HEADER.size + section * snapshot._SECTION.size
+    offset, length = snapshot._SECTION.unpack_from(data, entry)
+    snapshot._SECTION.pack_into(data, entry, offset, length - itemSize)
+    header = list(snapshot._HEADER.unpack_from(data))
+    header[3] = zlib.crc32(data[snapshot._HEADER.size : snapshot._PAYLOAD])
+    snapshot._HEADER.pack_into(data, 0, *header)
+    with open(fileName, "wb") as file:
+        file.write(data)
+
+    with pytest.raises(SnapshotError):
+        openSnapshot(fileName)
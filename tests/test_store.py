@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from NG_OUI_DB.store import OuiStoreBuilder, StringHeap
+
+rows = [
+    (
+        "MA-L",
+        "0055DA",
+        "IEEE Registration Authority",
+        "445 Hoes Lane Piscataway NJ US 08554",
+    ),
+    ("MA-L", "000000", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+    ("MA-M", "0055DA1", "Shinko Technos co.,ltd.", "Osaka JP"),
+    ("MA-L", "000001", "XEROX CORPORATION", "M/S 105-50C WEBSTER NY US 14580"),
+]
+
+
+@pytest.fixture
+def store(buildStore):
+    return buildStore(rows, sources=("MA-L", "MA-M"))
+
+
+def test_columns(store):
+
+    assert len(store) == len(rows)
+    assert store.sources == ("MA-L", "MA-M")
+    for row, (registry, assignment, name, address) in enumerate(rows):
+        assert store.registry(row) == registry
+        assert store.assignment(row) == assignment
+        assert store.organizationName(row) == name
+        assert store.organizationAddress(row) == address
+
+    # organization names are stored once and shared by id
+    assert len(store.nameTable()) == 3
+    assert store.nameIds()[1] == store.nameIds()[3]
+
+
+def test_lookup(store):
+
+    assert store.lookup(0x0055DA1FFFFF) == 2
+    assert store.lookup(0x0055DA2FFFFF) == 0
+    assert store.find("000001") == 3
+    assert store.registryCode("MA-M") != 0
+    assert store.registryCode("NOT-A-REGISTRY") == 0
+
+    with pytest.raises(KeyError):
+        store.find("000002")
+
+
+def test_record(store):
+    record = store.record(1)
+
+    assert record == {
+        "Registry": "MA-L",
+        "Assignment": "000000",
+        "Organization Name": "XEROX CORPORATION",
+        "Organization Address": "M/S 105-50C WEBSTER NY US 14580",
+    }
+    assert record.organizationName == "XEROX CORPORATION"
+    assert store.toDict()["000000"] == dict(record)
+
+    with pytest.raises(KeyError):
+        record["Unknown Field"]
+
+
+def test_repeatedAssignment():
+    builder = OuiStoreBuilder()
+    builder.add("MA-L", "000000", "Old Name", "Old Address")
+    builder.add("MA-L", "000000", "New Name", "New Address")
+    store = builder.build()
+
+    assert len(store) == 1
+    assert store.organizationName(0) == "New Name"
+    assert store.organizationAddress(0) == "New Address"
+
+
+def test_stringHeap():
+    heap = StringHeap.fromStrings(["", "Zürich", "abc"])
+
+    assert len(heap) == 3
+    assert list(heap) == ["", "Zürich", "abc"]
+    assert heap[-1] == "abc"
+    assert heap[1:] == ["Zürich", "abc"]
+    with pytest.raises(IndexError):
+        heap[3]
+
+
+def test_derivedIsBuiltOnce(store):
+    builds = []
+
+    def build(store):
+        builds.append(store)
+        time.sleep(0.05)
+        # a structure may be derived from another one
+        return store.derived("inner", len)
+
+    threads = [
+        threading.Thread(target=store.derived, args=("outer", build)) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert store.derived("outer", build) == 4
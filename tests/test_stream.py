@@ -0,0 +1,92 @@
+import io
+import json
+import os
+
+import pytest
+
+from NG_OUI_DB import lookupResult
+from NG_OUI_DB.cli import parseArguments
+from NG_OUI_DB.stream import (
+    ISIOT,
+    LOOKUP,
+    NDJSON,
+    TSV,
+    readMacs,
+    streamMacs,
+    streamSearch,
+)
+
+MACS = ["d8:ec:5e:12:34:56", "0055.da12.3456", "not a mac", "d4f547000001"]
+
+
+def test_streamMacs_lookupAsCsv(db):
+    output = io.StringIO()
+    assert streamMacs(LOOKUP, MACS, output, database=db, chunkSize=3) == 4
+
+    lines = output.getvalue().splitlines()
+    assert lines[0] == (
+        "mac,Registry,Assignment,Organization Name,Organization Address,isIoT"
+    )
+    assert lines[2] == "0055.da12.3456,MA-M,0055DA1,Shinko Technos co.,ltd.,false"
+    assert lines[3] == "not a mac,Unknown,Unknown,Unknown,Unknown,false"
+    assert lines[4].endswith(",true")
+
+
+def test_streamMacs_ndjsonAndTsv(db):
+    output = io.StringIO()
+    streamMacs(LOOKUP, MACS, output, format=NDJSON, database=db)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    # the same answers as the batch endpoint of the HTTP service
+    assert results == [lookupResult(db, mac) for mac in MACS]
+
+    output = io.StringIO()
+    streamMacs(ISIOT, MACS[:2], output, format=TSV, database=db)
+    assert output.getvalue() == (
+        "mac\tisIoT\nd8:ec:5e:12:34:56\ttrue\n0055.da12.3456\tfalse\n"
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="jobs need os.fork()")
+def test_streamMacs_jobsKeepTheInputOrder(db):
+    macs = [f"d8:ec:5e:00:00:{i:02x}" for i in range(50)] + MACS * 10
+
+    single = io.StringIO()
+    streamMacs(LOOKUP, macs, single, database=db, chunkSize=7)
+    forked = io.StringIO()
+    assert streamMacs(LOOKUP, macs, forked, jobs=3, database=db, chunkSize=7) == 90
+
+    assert forked.getvalue() == single.getvalue()
+
+
+def test_streamSearch(db):
+    output = io.StringIO()
+    assert streamSearch(output, registry="MA-L", limit=2, database=db) == 2
+    assert output.getvalue().splitlines()[1:] == [
+        "MA-L,D8EC5E,Belkin International Inc.,Playa Vista CA US 90094",
+        "MA-L,0055DA,IEEE Registration Authority,Piscataway NJ US 08554",
+    ]
+
+    output = io.StringIO()
+    streamSearch(output, organization="tuya", iot=True, format=NDJSON, database=db)
+    assert json.loads(output.getvalue())["Assignment"] == "D4F547"
+
+    with pytest.raises(ValueError):
+        streamSearch(io.StringIO(), database=db)
+
+
+def test_readMacs_andArguments(tmp_path):
+    first = tmp_path / "first.txt"
+    first.write_text("d8:ec:5e:12:34:56\n\n  0055da  \n")
+    second = tmp_path / "second.txt"
+    second.write_text("d4f547000001")
+    assert list(readMacs([str(first), str(second)])) == [
+        "d8:ec:5e:12:34:56",
+        "0055da",
+        "d4f547000001",
+    ]
+
+    arguments = parseArguments(["lookup", "a.txt", "-", "--format", "ndjson"])
+    assert arguments.files == ["a.txt", "-"]
+    assert (arguments.format, arguments.jobs) == ("ndjson", 1)
+    arguments = parseArguments(["search", "--organization", "sony", "--iot"])
+    assert (arguments.organization, arguments.iot) == ("sony", True)
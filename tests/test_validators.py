@@ -1,6 +1,14 @@
+import re
+
+import pytest
+
+from NG_OUI_DB import validators
 from NG_OUI_DB.validators import (
     ALPHANUMERIC_ASCII_REGEX_PATTERN,
     MAC_ADDRESS_REGEX_PATTERN,
+    isValidMac,
+    normalizeMac,
+    normalizeMacs,
     valid,
 )
 
@@ -22,3 +30,76 @@ def test_MacAddressRegexPattern() -> None:
     assert valid(MAC_ADDRESS_REGEX_PATTERN, "00:00:00:00:00:00:") is None
     assert valid(MAC_ADDRESS_REGEX_PATTERN, "00-00-00-00-00-00-") is None
     assert valid(MAC_ADDRESS_REGEX_PATTERN, "00:00:00:00:00:00:") is None
+
+
+def test_validCompiledPattern() -> None:
+    pattern = re.compile(MAC_ADDRESS_REGEX_PATTERN)
+    assert valid(pattern, "00:00:00:00:00:00") is not None
+    assert valid(MAC_ADDRESS_REGEX_PATTERN, None) is None
+    assert valid(MAC_ADDRESS_REGEX_PATTERN, 0) is None
+
+
+def test_validKeepsABoundedNumberOfPatterns() -> None:
+    for i in range(1000):
+        assert valid(f"^{i}$", str(i)) is not None
+    assert validators._compile.cache_info().currsize == 64
+
+
+@pytest.mark.parametrize(
+    "mac",
+    [
+        "00:55:DA:12:34:56",
+        "00-55-da-12-34-56",
+        "00.55.DA.12.34.56",
+        "00 55 DA 12 34 56",
+        "0055.DA12.3456",
+        "0055DA-123456",
+        "0055DA123456",
+        "0x0055da123456",
+        "0:55:da:12:34:56",
+        " 00:55:DA:12:34:56\n",
+        b"\x00\x55\xda\x12\x34\x56",
+        bytearray(b"\x00\x55\xda\x12\x34\x56"),
+        b"0055.da12.3456",
+        0x0055DA123456,
+    ],
+)
+def test_normalizeMac(mac) -> None:
+    assert normalizeMac(mac) == 0x0055DA123456
+    assert isValidMac(mac)
+
+
+@pytest.mark.parametrize(
+    "mac",
+    [
+        "",
+        "00:55:DA:12:34",
+        "00:55:DA:12:34:56:78",
+        "00:55-DA:12:34:56",
+        "00:55:DA:12:34:5G",
+        "0x:55:DA:12:34:56",
+        "00:5_:DA:12:34:56",
+        "00:55:DA:12:34:٥٦",
+        "0055DA12345",
+        b"\x00\x55\xda",
+        -1,
+        1 << 48,
+    ],
+)
+def test_normalizeMacInvalid(mac) -> None:
+    with pytest.raises(ValueError):
+        normalizeMac(mac)
+    assert not isValidMac(mac)
+
+
+def test_normalizeMacs() -> None:
+    macs = ["00:55:DA:12:34:56", "0055.da12.3456", "not a mac", None, 0xFF, b"\xff" * 6]
+    assert normalizeMacs(macs) == [
+        0x0055DA123456,
+        0x0055DA123456,
+        None,
+        None,
+        0xFF,
+        0xFFFFFFFFFFFF,
+    ]
+    assert normalizeMacs(iter([])) == []
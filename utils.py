@@ -1,15 +1,27 @@
-import traceback
-from typing import LiteralString
+import os
+import struct
+from contextlib import contextmanager
+from typing import IO, TYPE_CHECKING, Iterator
 
 from .validators import (
     valid,
-    MAC_ADDRESS_REGEX_PATTERN,
+    isValidMac,
+    normalizeMac,
+    MacAddress,
     ALPHANUMERIC_ASCII_REGEX_PATTERN,
 )
 
+if TYPE_CHECKING:
+    # collections.abc.Buffer is only there from Python 3.12, LiteralString 3.11
+    from collections.abc import Buffer
+    from typing import LiteralString
+
 PROMPT = "Enter your choice: "
 MAC_PROMPT = "Enter the MAC Address: "
 
+# the 6 octets of a MAC address in network byte order, as 16 and 32 bit halves
+_MAC_STRUCT = struct.Struct(">HI")
+
 
 def getMacAddress() -> str:
     """Get the MAC Address from the user
@@ -18,8 +30,8 @@ def getMacAddress() -> str:
         str: MAC Address
     """
     mac = input(MAC_PROMPT)
-    # validate the input
-    while not valid(withPattern=MAC_ADDRESS_REGEX_PATTERN, againstValue=mac):
+    # validate the input, in any of the notations of normalizeMac
+    while not isValidMac(mac):
         print("Invalid MAC Address")
         mac = input(MAC_PROMPT)
     return mac
@@ -69,17 +81,122 @@ def getRegistry() -> str:
     return getAlphaNumericString(msg="\nEnter the Registry: ")
 
 
-def getOuiFromMac(mac: str) -> str:
+def getOuiFromMac(mac: MacAddress) -> str:
     """Get the OUI from the MAC Address
 
     Args:
-        mac (str): The MAC Address
+        mac (MacAddress): The MAC Address in any of the notations of normalizeMac,
+            or a leading part of it
 
     Returns:
         str: The OUI of the MAC Address with any delimiters removed in uppercase
     """
-    mac = mac.replace(":", "").replace("-", "")
-    return mac[:6].upper()
+    try:
+        return f"{normalizeMac(mac) >> 24:06X}"
+    except (ValueError, TypeError):
+        mac = str(mac).replace(":", "").replace("-", "").replace(".", "")
+        return mac[:6].upper()
+
+
+def getMacPrefix(mac: MacAddress) -> tuple[int, int]:
+    """Get the MAC Address as an integer along with how many of its bits are known
+
+    Args:
+        mac (MacAddress): The MAC Address in any of the notations of normalizeMac,
+            or a leading part of it such as an OUI
+
+    Returns:
+        tuple[int, int]: The 48 bit integer value of the MAC Address, padded with
+        zeros if only part of it was given, and the number of bits that were given
+
+    Raises:
+        ValueError: If the MAC Address contains characters that are not hex digits
+    """
+    if isinstance(mac, str):
+        digits = mac.replace(":", "").replace("-", "").replace(".", "")
+        # a whole MAC Address in colon, dash or dot notation, the guards keep out
+        # the "_", "0x" and non ASCII digits int() would otherwise accept
+        if (
+            len(digits) == 12
+            and digits.isalnum()
+            and digits.isascii()
+            and digits[1] not in "xX"
+        ):
+            return int(digits, 16), 48
+
+    try:
+        return normalizeMac(mac), 48
+    except ValueError:
+        if not isinstance(mac, str):
+            raise
+    except TypeError as error:
+        raise ValueError(f"Invalid MAC address: {mac!r}") from error
+
+    # a leading part of a MAC Address
+    digits = digits[:12]
+    if not (digits.isascii() and digits.isalnum() and "x" not in digits.lower()):
+        raise ValueError(f"Invalid MAC address: {mac!r}")
+    return int(digits.ljust(12, "0"), 16), len(digits) * 4
+
+
+def macFromBuffer(buffer: "Buffer", offset: int = 0) -> int:
+    """Get the MAC Address stored in a buffer as an integer
+
+    Args:
+        buffer (Buffer): A buffer holding the 6 octets of the MAC Address in network
+            byte order, such as a memoryview of an Ethernet frame
+        offset (int, optional): The offset of the first octet. Defaults to 0.
+
+    Returns:
+        int: The 48 bit integer value of the MAC Address, read without copying the
+        buffer or creating any string
+
+    Raises:
+        struct.error: If the buffer holds fewer than 6 octets from the offset
+    """
+    high, low = _MAC_STRUCT.unpack_from(buffer, offset)
+    return high << 32 | low
+
+
+@contextmanager
+def atomicFile(fileName: str, mode: str = "wb", **kwargs) -> Iterator[IO]:
+    """Open a temporary file that is renamed over a file once it is written
+
+    Args:
+        fileName (str): The path of the file to write
+        mode (str, optional): The mode to open the file with. Defaults to "wb".
+        **kwargs: Passed on to open(), such as encoding
+
+    Yields:
+        IO: The temporary file, in the same directory as the file
+
+    Note:
+        Readers see either the previous file or the complete new one, never a
+        partially written file. If writing fails the temporary file is removed
+        and the previous file is left untouched.
+    """
+    directory = os.path.dirname(fileName)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    import tempfile
+
+    descriptor, temporaryFileName = tempfile.mkstemp(
+        dir=directory or None, prefix=os.path.basename(fileName) + ".", suffix=".tmp"
+    )
+    try:
+        with open(descriptor, mode, **kwargs) as file:
+            yield file
+        # keep the permissions of the previous file, temporary files are private
+        os.chmod(
+            temporaryFileName,
+            os.stat(fileName).st_mode & 0o7777 if os.path.exists(fileName) else 0o644,
+        )
+        os.replace(temporaryFileName, fileName)
+    except BaseException:
+        if os.path.exists(temporaryFileName):
+            os.remove(temporaryFileName)
+        raise
 
 
 def jsonWithProperIndent(dict: dict, indent: int, startingIndent=0) -> str:
@@ -113,6 +230,8 @@ def jsonWithProperIndent(dict: dict, indent: int, startingIndent=0) -> str:
 
         return s
     except Exception:
+        import traceback
+
         print(traceback.format_exc())
         return ""
 
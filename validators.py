@@ -1,4 +1,8 @@
-from re import Match, match
+import re
+from functools import lru_cache
+from operator import index
+from re import Match, Pattern
+from typing import Any, Iterable
 
 # The regex pattern for an Alphanumeric ASCII string
 ALPHANUMERIC_ASCII_REGEX_PATTERN = r"^[a-zA-Z0-9\s]+$"
@@ -6,15 +10,134 @@ ALPHANUMERIC_ASCII_REGEX_PATTERN = r"^[a-zA-Z0-9\s]+$"
 # The regex pattern for a device's MAC address
 MAC_ADDRESS_REGEX_PATTERN = r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$"
 
+# A MAC address in any of the notations normalizeMac accepts
+MacAddress = str | bytes | bytearray | memoryview | int
 
-def valid(withPattern: str, againstValue: any) -> Match[str] | None:
+# The notations of a MAC address string, each one a named group:
+# - bare: 001122334455 or 0x001122334455
+# - cisco: 0011.2233.4455
+# - halves: 001122-334455 or 001122:334455
+# - pairs: 00:11:22:33:44:55, 00-11-22-33-44-55, 00.11.22.33.44.55 or
+#   00 11 22 33 44 55, with leading zeros optional as in 0:11:22:3:44:55
+_MAC_NOTATIONS: Pattern[str] = re.compile(
+    r"(?:0[xX])?(?P<bare>[0-9A-Fa-f]{12})"
+    r"|(?P<cisco>[0-9A-Fa-f]{4}\.[0-9A-Fa-f]{4}\.[0-9A-Fa-f]{4})"
+    r"|(?P<halves>[0-9A-Fa-f]{6}[-:][0-9A-Fa-f]{6})"
+    r"|(?P<pairs>[0-9A-Fa-f]{1,2}(?P<separator>[-:. ])"
+    r"(?:[0-9A-Fa-f]{1,2}(?P=separator)){4}[0-9A-Fa-f]{1,2})"
+)
+
+_SEPARATORS = frozenset(":-. ")
+
+_MAX_MAC = (1 << 48) - 1
+
+
+def _compiled(pattern: str | Pattern[str]) -> Pattern[str]:
+    if isinstance(pattern, Pattern):
+        return pattern
+    return _compile(pattern)
+
+
+@lru_cache(maxsize=64)
+def _compile(pattern: str) -> Pattern[str]:
+    # bounded, as any pattern a caller passes to valid() is cached
+    return re.compile(pattern)
+
+
+def valid(withPattern: str | Pattern[str], againstValue: Any) -> Match[str] | None:
     """Validate a value against a pattern
 
     Args:
-        withPattern (str): A regex pattern to validate against
+        withPattern (str | Pattern[str]): A regex pattern to validate against, it is
+            compiled once and reused while it is among the most recently used
         againstValue (any): The value to validate
 
     Returns:
         re.Match[str] | None: A match object if the value is valid, None otherwise
     """
-    return match(withPattern, againstValue)
+    if not isinstance(againstValue, str):
+        return None
+    return _compiled(withPattern).match(againstValue)
+
+
+def normalizeMac(mac: MacAddress) -> int:
+    """Normalize a MAC address in any common notation to its 48 bit integer value
+
+    Args:
+        mac (MacAddress): The MAC address as a string in colon, dash, dot, space,
+            Cisco dotted (0011.2233.4455) or bare hex notation, 6 raw bytes, an
+            ASCII encoded string as bytes, or an integer
+
+    Returns:
+        int: The 48 bit integer value of the MAC address
+
+    Raises:
+        ValueError: If the value is not a MAC address in any of the notations
+        TypeError: If the value is of another type
+    """
+    if isinstance(mac, str):
+        # the common 00:11:22:33:44:55 notations without the regex, the guards keep
+        # out the "_", "0x" and non ASCII digits int() would otherwise accept
+        if len(mac) == 17:
+            separator: str = mac[2]
+            if (
+                separator in _SEPARATORS
+                and mac[5] == mac[8] == mac[11] == mac[14] == separator
+                and mac[1] not in "xX"
+            ):
+                digits: str = mac.replace(separator, "")
+                if len(digits) == 12 and digits.isalnum() and digits.isascii():
+                    return int(digits, 16)
+
+        text: str = mac.strip()
+        notation: Match[str] | None = _MAC_NOTATIONS.fullmatch(text)
+        if notation is None:
+            raise ValueError(f"Invalid MAC address: {mac!r}")
+        kind: str | None = notation.lastgroup
+        if kind == "bare":
+            return int(notation["bare"], 16)
+        if kind == "pairs":
+            separator = notation["separator"]
+            if len(text) != 17:
+                return int("".join(p.zfill(2) for p in text.split(separator)), 16)
+            return int(text.replace(separator, ""), 16)
+        return int(text.replace(".", "").replace("-", "").replace(":", ""), 16)
+
+    if isinstance(mac, (bytes, bytearray, memoryview)):
+        if len(mac) == 6:
+            return int.from_bytes(mac, "big")
+        return normalizeMac(bytes(mac).decode("ascii"))
+
+    value: int = index(mac)
+    if not 0 <= value <= _MAX_MAC:
+        raise ValueError(f"Invalid MAC address: {mac!r} is not a 48 bit value")
+    return value
+
+
+def normalizeMacs(macs: Iterable[MacAddress]) -> list[int | None]:
+    """Normalize a batch of MAC addresses in any mix of notations
+
+    Args:
+        macs (Iterable[MacAddress]): The MAC addresses, see normalizeMac
+
+    Returns:
+        list[int | None]: The 48 bit integer value of each MAC address, or None for
+        the values that are not MAC addresses
+    """
+    values: list[int | None] = []
+    append = values.append
+    for mac in macs:
+        try:
+            append(normalizeMac(mac))
+        except (ValueError, TypeError):
+            append(None)
+    return values
+
+
+def isValidMac(mac: Any) -> bool:
+    """Returns if a value is a MAC address in any of the notations of normalizeMac"""
+    try:
+        normalizeMac(mac)
+    except (ValueError, TypeError):
+        return False
+    return True